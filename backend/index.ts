@@ -60,49 +60,90 @@ const db = new sqliteVerbose.Database(
 
 // Routes
 
-app.get('/api/visa', (req: Request, res: Response) => {
-  db.all('SELECT * FROM visa_info', [], (err, rows) => {
-    if (err) return res.status(500).json({ error: err.message });
+// country_visa_types and country_visa_json are precomputed lookup tables maintained by the
+// scraper's SQLite writer (utils/db_utils.py); until it has written to this database, the
+// handlers fall back to querying visa_info directly.
 
-    const processedRows = rows.map((row: any) => ({
-      ...row,
-      requirements: row.requirements ? JSON.parse(row.requirements) : []
-    }));
+const parseRequirements = (row: any) => ({
+  ...row,
+  requirements: row.requirements ? JSON.parse(row.requirements) : []
+});
 
-    res.json({ data: processedRows });
+// Read-through cache of serialized responses. PRAGMA data_version changes whenever another
+// connection (the scraper) commits, which drops the whole cache.
+const responseCache = new Map<string, string>();
+let cachedDataVersion: number | null = null;
+
+type BodyCallback = (err: Error | null, body?: string) => void;
+
+const readThrough = (key: string, load: (done: BodyCallback) => void, send: BodyCallback) => {
+  db.get('PRAGMA data_version', [], (err, row: any) => {
+    if (!err && row.data_version !== cachedDataVersion) {
+      responseCache.clear();
+      cachedDataVersion = row.data_version;
+    }
+
+    const cached = responseCache.get(key);
+    if (cached !== undefined) return send(null, cached);
+
+    load((loadErr, body) => {
+      // Misses (404s) are not cached
+      if (!loadErr && body !== undefined) responseCache.set(key, body);
+      send(loadErr, body);
+    });
   });
+};
+
+const sendBody = (res: Response, notFound: string) => (err: Error | null, body?: string) => {
+  if (err) return res.status(500).json({ error: err.message });
+  if (body === undefined) return res.status(404).json({ message: notFound });
+  res.type('json').send(body);
+};
+
+app.get('/api/visa', (req: Request, res: Response) => {
+  readThrough(
+    'all',
+    (done) => {
+      db.all('SELECT data FROM country_visa_json ORDER BY country', [], (err, rows: any[]) => {
+        if (!err) {
+          // Every blob is a JSON array; splice their items into one array
+          const items = rows.map((row) => row.data.slice(1, -1)).filter((data) => data.length > 0);
+          return done(null, `{"data":[${items.join(',')}]}`);
+        }
+        db.all('SELECT * FROM visa_info', [], (fallbackErr, fallbackRows) => {
+          if (fallbackErr) return done(fallbackErr);
+          done(null, JSON.stringify({ data: fallbackRows.map(parseRequirements) }));
+        });
+      });
+    },
+    sendBody(res, 'No visa information found')
+  );
 });
 
 app.get('/api/visa/country/:country', (req: Request, res: Response) => {
   const country = req.params.country;
 
-  db.all(
-    'SELECT * FROM visa_info WHERE LOWER(country) = LOWER(?)',
-    [country],
-    (err, rows) => {
-      if (err) return res.status(500).json({ error: err.message });
-
-      if (rows.length === 0) {
-        return res
-          .status(404)
-          .json({ message: `No visa information found for ${country}` });
-      }
-
-      const processedRows = rows.map((row: any) => ({
-        ...row,
-        requirements: row.requirements ? JSON.parse(row.requirements) : []
-      }));
-
-      res.json({ data: processedRows });
-    }
+  readThrough(
+    `country:${country.toLowerCase()}`,
+    (done) => {
+      db.get('SELECT data FROM country_visa_json WHERE country = ?', [country], (err, row: any) => {
+        if (!err) return done(null, row ? `{"data":${row.data}}` : undefined);
+        db.all('SELECT * FROM visa_info WHERE country = ? COLLATE NOCASE', [country], (fallbackErr, rows) => {
+          if (fallbackErr) return done(fallbackErr);
+          done(null, rows.length ? JSON.stringify({ data: rows.map(parseRequirements) }) : undefined);
+        });
+      });
+    },
+    sendBody(res, `No visa information found for ${country}`)
   );
 });
 
 app.get('/api/visa/country/:country/type/:type', (req: Request, res: Response) => {
   const { country, type } = req.params;
 
+  // Served by the COLLATE NOCASE index on (country, visa_type)
   db.get(
-    'SELECT * FROM visa_info WHERE LOWER(country) = LOWER(?) AND LOWER(visa_type) = LOWER(?)',
+    'SELECT * FROM visa_info WHERE country = ? COLLATE NOCASE AND visa_type = ? COLLATE NOCASE',
     [country, type],
     (err, row: any) => {
       if (err) return res.status(500).json({ error: err.message });
@@ -113,55 +154,70 @@ app.get('/api/visa/country/:country/type/:type', (req: Request, res: Response) =
         });
       }
 
-      const processedRow = {
-        ...row,
-        requirements: row.requirements ? JSON.parse(row.requirements) : []
-      };
-
-      res.json({ data: processedRow });
+      res.json({ data: parseRequirements(row) });
     }
   );
 });
 
 app.get('/api/countries', (req: Request, res: Response) => {
-  db.all(
-    'SELECT DISTINCT country FROM visa_info ORDER BY country',
-    [],
-    (err, rows) => {
-      if (err) return res.status(500).json({ error: err.message });
-
-      const countries = rows.map((row: any) => row.country);
-      res.json({ data: countries });
-    }
+  readThrough(
+    'countries',
+    (done) => {
+      const sendCountries = (err: Error | null, rows: any[]) => {
+        if (err) return done(err);
+        done(null, JSON.stringify({ data: rows.map((row: any) => row.country) }));
+      };
+      db.all('SELECT country FROM country_visa_types ORDER BY country', [], (err, rows) => {
+        if (!err) return sendCountries(null, rows);
+        db.all('SELECT DISTINCT country FROM visa_info ORDER BY country', [], sendCountries);
+      });
+    },
+    sendBody(res, 'No countries found')
   );
 });
 
 app.get('/api/visa/country/:country/types', (req: Request, res: Response) => {
   const country = req.params.country;
 
-  db.all(
-    'SELECT visa_type FROM visa_info WHERE LOWER(country) = LOWER(?) ORDER BY visa_type',
-    [country],
-    (err, rows) => {
-      if (err) return res.status(500).json({ error: err.message });
-
-      if (rows.length === 0) {
-        return res
-          .status(404)
-          .json({ message: `No visa information found for ${country}` });
-      }
-
-      const visaTypes = rows.map((row: any) => row.visa_type);
-      res.json({ data: visaTypes });
-    }
+  readThrough(
+    `types:${country.toLowerCase()}`,
+    (done) => {
+      db.get('SELECT visa_types FROM country_visa_types WHERE country = ?', [country], (err, row: any) => {
+        if (!err) return done(null, row ? `{"data":${row.visa_types}}` : undefined);
+        db.all(
+          'SELECT visa_type FROM visa_info WHERE country = ? COLLATE NOCASE ORDER BY visa_type',
+          [country],
+          (fallbackErr, rows) => {
+            if (fallbackErr) return done(fallbackErr);
+            done(null, rows.length ? JSON.stringify({ data: rows.map((row: any) => row.visa_type) }) : undefined);
+          }
+        );
+      });
+    },
+    sendBody(res, `No visa information found for ${country}`)
   );
 });
 
+// Turn free text into an FTS5 query matching every word as a prefix
+const toFtsQuery = (term: string): string =>
+  term
+    .split(/\s+/)
+    .filter((word) => /\w/.test(word))
+    .map((word) => `"${word.replace(/"/g, '""')}"*`)
+    .join(' ');
+
 app.get('/api/visa/search', (req: Request, res: Response)=> {
   const searchTerm = req.query.term as string | undefined;
 
+  // visa_info_fts is built and kept in sync by the scraper's SQLite writer (utils/db_utils.py)
+  const ftsQuery = `
+    SELECT visa_info.* FROM visa_info_fts
+    JOIN visa_info ON visa_info.id = visa_info_fts.rowid
+    WHERE visa_info_fts MATCH ?
+    ORDER BY bm25(visa_info_fts, 5.0, 5.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.5, 2.0)
+  `;
 
-  const query = `
+  const likeQuery = `
     SELECT * FROM visa_info 
     WHERE LOWER(country) LIKE LOWER(?) 
     OR LOWER(visa_type) LIKE LOWER(?) 
@@ -169,12 +225,9 @@ app.get('/api/visa/search', (req: Request, res: Response)=> {
   `;
 
   const param = `%${searchTerm}%`;
+  const ftsParam = toFtsQuery(searchTerm || '');
 
-  // Debugging: log the query and parameters
-  console.log('Executing query:', query);
-  console.log('With parameter:', param);
-
-  db.all(query, [param, param, param], (err, rows) => {
+  const sendRows = (err: Error | null, rows: any[]) => {
     if (err) {
       console.error('Error executing query:', err.message); // Log the error message for better clarity
       return res.status(500).json({ error: err.message });
@@ -196,6 +249,23 @@ app.get('/api/visa/search', (req: Request, res: Response)=> {
     });
 
     res.json({ data: processedRows });
+  };
+
+  const searchWithLike = () => {
+    db.all(likeQuery, [param, param, param], sendRows);
+  };
+
+  if (!ftsParam) {
+    return searchWithLike();
+  }
+
+  db.all(ftsQuery, [ftsParam], (err, rows) => {
+    if (err) {
+      // The index doesn't exist until the scraper has written to this database
+      console.error('Full-text search unavailable, falling back to LIKE:', err.message);
+      return searchWithLike();
+    }
+    sendRows(null, rows);
   });
 });
 
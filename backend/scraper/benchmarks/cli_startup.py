@@ -0,0 +1,96 @@
+"""
+Measure how long the non-crawl cli.py commands take to start and check them
+against CLI_STARTUP_BUDGET_MS.
+
+Every command runs in a fresh interpreter on a small synthetic dataset, so the
+time is dominated by imports. The budget applies to the time on top of a bare
+`python -c pass`, which keeps it comparable between machines. load and validate
+cannot do without pydantic and the VisaInfo schema, which cost more than the
+rest of either command and vary most between machines, so their budget applies
+on top of building that validator in a bare interpreter. The commands are also
+checked not to import crawl4ai.
+
+Run from backend/scraper:
+    python -m benchmarks.cli_startup --repeats 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.sqlite_loader import make_synthetic_visa_info
+from config import CLI_STARTUP_BUDGET_MS
+from utils.data_utils import save_visa_info_to_json
+from utils.db_utils import load_visa_info
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What every validating command pays before reading its input
+VALIDATOR_START = ["-c", "from utils.validation import visa_info_list_adapter; visa_info_list_adapter()"]
+
+
+def median_ms(args: list, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=SCRAPER_DIR, check=True, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def imports_crawl4ai(args: list) -> bool:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=SCRAPER_DIR, capture_output=True, text=True
+    )
+    return "crawl4ai" in result.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the startup time of the non-crawl cli.py commands.")
+    parser.add_argument("--records", type=int, default=200, help="synthetic records in the dataset")
+    parser.add_argument("--repeats", type=int, default=10, help="runs per command")
+    parser.add_argument("--budget", type=float, default=CLI_STARTUP_BUDGET_MS, help="budget in ms over the start a command needs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, "visa_info.json")
+        db_path = os.path.join(tmp_dir, "visa_info.db")
+        visas = make_synthetic_visa_info(args.records)
+        save_visa_info_to_json([visa.model_dump() for visa in visas], input_path)
+        load_visa_info(visas, db_path)
+
+        # Command and whether it validates entries against VisaInfo
+        commands = {
+            "--help": (["cli.py", "--help"], False),
+            "export json": (["cli.py", "export", os.path.join(tmp_dir, "out.json"), "--db", db_path], False),
+            "export snapshot": (["cli.py", "export", os.path.join(tmp_dir, "out.snapshot"), "--db", db_path], False),
+            "validate": (["cli.py", "validate", input_path], True),
+            "load": (["cli.py", "load", input_path, "--db", os.path.join(tmp_dir, "loaded.db")], True),
+            "sources": (["cli.py", "sources"], False),
+        }
+
+        bare = median_ms(["-c", "pass"], args.repeats)
+        validator = median_ms(VALIDATOR_START, args.repeats)
+        print(f"Bare interpreter start: {bare:.1f} ms, with the VisaInfo validator: {validator:.1f} ms")
+        print(f"Budget: {args.budget:.0f} ms on top of the start each command needs")
+        print(f"{'Command':<18} {'Total (ms)':>11} {'Startup (ms)':>13} {'crawl4ai':>9}")
+
+        over_budget = []
+        for name, (command, validates) in commands.items():
+            total = median_ms(command, args.repeats)
+            startup = total - (validator if validates else bare)
+            heavy = imports_crawl4ai(command)
+            print(f"{name:<18} {total:>11.1f} {startup:>13.1f} {'yes' if heavy else 'no':>9}")
+            if startup > args.budget or heavy:
+                over_budget.append(name)
+
+    if over_budget:
+        print(f"Over budget or importing crawl4ai: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("All commands within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Offline crawl benchmark: replays fixture pages from a local server and replaces the
+LLM with a deterministic fake, so scraper performance can be measured without
+touching gov.pl or Groq.
+
+Run from backend/scraper (needs the Playwright browser, see `crawl4ai-setup`):
+    python -m benchmarks.crawl_bench --countries 1 10 100 --llm-latency 1.0
+
+Each scenario runs cold (empty caches) and then warm (caches from the cold run),
+once with a plain browser and once with the browser context pool, and reports
+throughput, p50/p95 latency, page-load time and browser RSS per page. Results are saved as JSON in
+benchmarks/results/ so changes to main.py and scraper_utils.py can be compared.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import List
+
+import psutil
+from crawl4ai import AsyncWebCrawler
+
+from benchmarks.fake_llm import FakeLLMStrategy
+from benchmarks.fixture_server import FixtureServer
+from config import (
+    BROWSER_ALLOWED_RESOURCE_TYPES,
+    BROWSER_CONTEXT_MAX_PAGES,
+    BROWSER_CONTEXTS_PER_HOST,
+    BROWSER_JS_HEAP_MB,
+    BROWSER_MAX_CONTEXTS,
+    CSS_SELECTOR,
+    EXTRACTION_CACHE_MAX_BYTES,
+    EXTRACTION_CHUNK_TOKENS,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_MAX_IN_FLIGHT,
+    LLM_MAX_RETRIES,
+    LLM_PACK_TOKENS,
+    LLM_PACK_WAIT,
+    MARKDOWN_PRUNING,
+    MAX_CONCURRENT_CRAWLS,
+    REQUIRED_KEYS,
+    RULE_CONFIDENCE_THRESHOLD,
+    RULE_EXTRACTION,
+)
+from utils.browser_pool import BrowserContextPool
+from utils.crawl_scheduler import CrawlScheduler, HostRateLimiter
+from utils.extraction_cache import ExtractionCache
+from utils.instrumentation import PipelineMetrics
+from utils.llm_dispatch import LLMDispatcher
+from utils.markdown_pruning import MarkdownPruner
+from utils.revalidation import SourceRevalidator
+from utils.rule_extraction import RuleExtractor
+from utils.scraper_utils import CrawlContext, fetch_and_process_country, get_browser_config
+from utils.source_store import SourceStore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: The samples
+        p: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, or 0.0 without samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def browser_rss_bytes() -> int:
+    """
+    Returns:
+        int: Resident memory of all child processes (Playwright driver and browser)
+    """
+    total = 0
+    for child in psutil.Process().children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            continue
+    return total
+
+
+async def run_scenario(
+    crawler: AsyncWebCrawler,
+    server: FixtureServer,
+    countries: int,
+    cache: str,
+    cache_dir: str,
+    llm_latency: float,
+    max_concurrency: int,
+    host_rate: float,
+    browser_pool: BrowserContextPool = None,
+    llm_rate_limit: float = 0.0,
+) -> dict:
+    """
+    Crawl `countries` fixture pages through the real pipeline with a fake LLM.
+
+    Args:
+        crawler: The shared web crawler
+        server: The fixture server
+        countries: Number of countries (distinct pages) to crawl
+        cache: "cold" or "warm", used for labelling only
+        cache_dir: Directory holding the extraction cache and source validators
+        llm_latency: Seconds the fake LLM takes per request
+        max_concurrency: Global concurrency cap of the scheduler
+        host_rate: Requests per second allowed against the fixture server
+        browser_pool: Optional browser context pool; without it every page gets a new context
+        llm_rate_limit: Share of fake LLM requests answered with a rate limit error
+
+    Returns:
+        dict: The scenario results
+    """
+    country_names = [f"bench-country-{n}" for n in range(countries)]
+    country_sources = {country: server.page_url(n) for n, country in enumerate(country_names)}
+
+    llm_strategy = FakeLLMStrategy(latency=llm_latency, rate_limit_probability=llm_rate_limit)
+    metrics = PipelineMetrics()
+    usage_log = metrics.track_llm_usage(llm_strategy)
+    extraction_cache = ExtractionCache(os.path.join(cache_dir, "extraction"), EXTRACTION_CACHE_MAX_BYTES, usage_log)
+    source_store = SourceStore(os.path.join(cache_dir, "sources.db"))
+    source_revalidator = SourceRevalidator(source_store)
+    markdown_pruner = MarkdownPruner(EXTRACTION_CHUNK_TOKENS) if MARKDOWN_PRUNING else None
+    rule_extractor = RuleExtractor(REQUIRED_KEYS, RULE_CONFIDENCE_THRESHOLD) if RULE_EXTRACTION else None
+    llm_dispatcher = LLMDispatcher(
+        llm_strategy,
+        LLM_MAX_IN_FLIGHT,
+        LLM_MAX_RETRIES,
+        LLM_BACKOFF_BASE,
+        LLM_BACKOFF_MAX,
+        LLM_PACK_TOKENS,
+        LLM_PACK_WAIT,
+    )
+    scheduler = CrawlScheduler(max_concurrency)
+    context = CrawlContext(
+        crawler,
+        llm_strategy,
+        REQUIRED_KEYS,
+        css_selector=CSS_SELECTOR,
+        session_id="bench_session",
+        extraction_cache=extraction_cache,
+        source_revalidator=source_revalidator,
+        metrics=metrics,
+        browser_pool=browser_pool,
+        markdown_pruner=markdown_pruner,
+        rule_extractor=rule_extractor,
+        llm_dispatcher=llm_dispatcher,
+        rate_limiter=HostRateLimiter(host_rate, max_concurrency),
+    )
+    latencies = []
+    rss_samples = []
+    entries = 0
+    asset_requests = server.asset_requests
+
+    async def crawl_country(country: str):
+        started = time.perf_counter()
+        try:
+            return await fetch_and_process_country(context, country, server.base_url, country_sources)
+        finally:
+            latencies.append(time.perf_counter() - started)
+            rss_samples.append(browser_rss_bytes())
+
+    async for _, visa_entries in scheduler.run(
+        country_names,
+        crawl_country,
+    ):
+        entries += len(visa_entries or [])
+    source_store.close()
+
+    totals = metrics.report()["totals"]
+    fetch = totals["stages"].get("fetch", {"seconds": 0.0, "calls": 0})
+    browser = "pooled" if browser_pool else "plain"
+    return {
+        "scenario": f"{countries} countries, {cache} cache, {browser}",
+        "countries": countries,
+        "cache": cache,
+        "browser": browser,
+        "elapsed_seconds": scheduler.finished_at - scheduler.started_at,
+        "pages_per_minute": scheduler.throughput(),
+        "latency_p50_seconds": percentile(latencies, 50),
+        "latency_p95_seconds": percentile(latencies, 95),
+        "page_load_seconds": fetch["seconds"] / fetch["calls"] if fetch["calls"] else 0.0,
+        "browser_rss_mb_mean": sum(rss_samples) / len(rss_samples) / 2**20 if rss_samples else 0.0,
+        "browser_rss_mb_peak": max(rss_samples, default=0) / 2**20,
+        "asset_requests": server.asset_requests - asset_requests,
+        "failed": scheduler.failed,
+        "entries": entries,
+        "llm_calls": totals["llm_calls"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "packed_requests": llm_dispatcher.packed_requests,
+        "llm_retries": llm_dispatcher.retries,
+        "tokens_saved": totals["tokens_saved"],
+        "cache_hits": totals["cache_hits"],
+        "unchanged_sources": source_revalidator.unchanged,
+        "stages": totals["stages"],
+    }
+
+
+async def run_benchmarks(args) -> dict:
+    results = []
+    with FixtureServer() as server:
+        for browser in args.browser:
+            # A fresh browser per variant, so memory of one variant doesn't carry over
+            async with AsyncWebCrawler(config=get_browser_config(BROWSER_JS_HEAP_MB)) as crawler:
+                browser_pool = None
+                if browser == "pooled":
+                    browser_pool = BrowserContextPool(
+                        crawler,
+                        BROWSER_CONTEXTS_PER_HOST,
+                        BROWSER_MAX_CONTEXTS,
+                        BROWSER_CONTEXT_MAX_PAGES,
+                        BROWSER_ALLOWED_RESOURCE_TYPES,
+                    )
+                for countries in args.countries:
+                    with tempfile.TemporaryDirectory() as cache_dir:
+                        for cache in ["cold", "warm"]:
+                            result = await run_scenario(
+                                crawler,
+                                server,
+                                countries,
+                                cache,
+                                cache_dir,
+                                args.llm_latency,
+                                args.max_concurrency,
+                                args.host_rate,
+                                browser_pool,
+                                args.llm_rate_limit,
+                            )
+                            results.append(result)
+                            print(
+                                f"{result['scenario']:<36} {result['pages_per_minute']:>10.1f} pages/min"
+                                f" p50 {result['latency_p50_seconds']:.2f}s p95 {result['latency_p95_seconds']:.2f}s"
+                                f" load {result['page_load_seconds']:.2f}s rss {result['browser_rss_mb_mean']:.0f} MB"
+                            )
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            "llm_latency": args.llm_latency,
+            "llm_rate_limit": args.llm_rate_limit,
+            "max_concurrency": args.max_concurrency,
+            "host_rate": args.host_rate,
+            "browser": args.browser,
+            "fixture_pages": len(server.pages),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawl benchmark with fixture pages and a fake LLM.")
+    parser.add_argument("--countries", type=int, nargs="+", default=[1, 10, 100], help="scenario sizes")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="seconds per fake LLM request")
+    parser.add_argument("--llm-rate-limit", type=float, default=0.0, help="share of fake LLM requests rate limited")
+    parser.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENT_CRAWLS, help="global concurrency cap")
+    parser.add_argument("--host-rate", type=float, default=1000.0, help="requests per second against the fixture server")
+    parser.add_argument(
+        "--browser",
+        nargs="+",
+        choices=["plain", "pooled"],
+        default=["plain", "pooled"],
+        help="crawl with a new browser context per page, with the context pool, or both",
+    )
+    parser.add_argument("--output", default=RESULTS_DIR, help="directory for the JSON results")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmarks(args))
+
+    os.makedirs(args.output, exist_ok=True)
+    filename = os.path.join(args.output, f"crawl_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Saved benchmark results to '{filename}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Deterministic stand-in for LLMExtractionStrategy used by the offline benchmarks.
+"""
+import hashlib
+import random
+import re
+import time
+from typing import List
+
+from crawl4ai.models import TokenUsage
+
+
+# Header LLMDispatcher puts in front of every page of a packed request
+SOURCE_DOCUMENT_PATTERN = re.compile(
+    r"^# Source document (\S+): visa information for (.+) \((\S+)\)$", re.MULTILINE
+)
+
+
+class FakeRateLimitError(Exception):
+    """Stands in for the provider's HTTP 429 response."""
+
+    status_code = 429
+
+
+class FakeLLMStrategy:
+    """
+    Mimics the parts of LLMExtractionStrategy the pipeline uses (`run`, `usages`,
+    `show_usage`) without calling a provider.
+
+    Every request sleeps for `latency` seconds and returns `entries_per_page`
+    complete visa entries derived from the URL, so repeated runs produce identical
+    output. Token usage is estimated from the input size, like a real provider
+    would report it. Packed requests get entries for every source document,
+    tagged with its id, and `rate_limit_probability` of the requests fail with a
+    fake HTTP 429.
+    """
+
+    def __init__(
+        self,
+        latency: float = 1.0,
+        entries_per_page: int = 2,
+        prompt_overhead_tokens: int = 900,
+        rate_limit_probability: float = 0.0,
+    ):
+        self.latency = latency
+        self.rate_limit_probability = rate_limit_probability
+        self.entries_per_page = entries_per_page
+        self.prompt_overhead_tokens = prompt_overhead_tokens
+        self.usages: List[TokenUsage] = []
+        self.total_usage = TokenUsage()
+
+    def run(self, url: str, sections: List[str]) -> List[dict]:
+        """
+        Pretend to extract visa information from the given sections.
+
+        Args:
+            url: The URL of the page
+            sections: Markdown sections of the page
+
+        Returns:
+            List[dict]: Deterministic visa entries for the URL
+        """
+        time.sleep(self.latency)
+        if random.random() < self.rate_limit_probability:
+            raise FakeRateLimitError("Rate limit reached (fake)")
+
+        content = "\n\n".join(sections)
+        prompt_tokens = self.prompt_overhead_tokens + len(content.split()) * 4 // 3
+        completion_tokens = 150 * self.entries_per_page
+        usage = TokenUsage(
+            completion_tokens=completion_tokens,
+            prompt_tokens=prompt_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+        self.usages.append(usage)
+        self.total_usage.completion_tokens += usage.completion_tokens
+        self.total_usage.prompt_tokens += usage.prompt_tokens
+        self.total_usage.total_tokens += usage.total_tokens
+
+        sources = SOURCE_DOCUMENT_PATTERN.findall(content)
+        if not sources:
+            return self.page_entries("", url)
+        return [
+            {**entry, "source_document": document_id}
+            for document_id, country, source_url in sources
+            for entry in self.page_entries(country, source_url)
+        ]
+
+    def page_entries(self, country: str, url: str) -> List[dict]:
+        """
+        Args:
+            country: Country named by the request, empty for single-page requests
+            url: The URL of the page
+
+        Returns:
+            List[dict]: Deterministic visa entries for the URL
+        """
+        page_id = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+        return [
+            {
+                "country": country,
+                "visa_type": f"Visa {n} ({page_id})",
+                "requirements": ["Valid passport", "Completed application form", "Proof of funds"],
+                "processing_time": "15 to 30 days",
+                "validity": "Up to 1 year",
+                "fees": "EUR 80",
+                "entry_type": "Multiple-entry",
+                "allowed_stay": "Up to 1 year",
+                "embassy_link": url,
+                "notes": "Generated by the benchmark fake LLM.",
+                "error": False,
+            }
+            for n in range(self.entries_per_page)
+        ]
+
+    def show_usage(self) -> None:
+        """Print the token usage the fake provider reported."""
+        print("\n=== Token Usage Summary (fake LLM) ===")
+        print(f"{'Completion':<15} {self.total_usage.completion_tokens:>12,}")
+        print(f"{'Prompt':<15} {self.total_usage.prompt_tokens:>12,}")
+        print(f"{'Total':<15} {self.total_usage.total_tokens:>12,}")
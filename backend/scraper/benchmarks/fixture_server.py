@@ -0,0 +1,223 @@
+"""
+Local HTTP server replaying recorded visa pages for offline benchmarks.
+
+Record the pages listed in utils/visa_urls.py once (needs network access):
+    python -m benchmarks.fixture_server --record
+
+The server then serves them at http://127.0.0.1:<port>/pages/<n>, cycling through
+the recordings so any number of distinct benchmark pages can be crawled. Without
+recordings a synthetic visa page is served instead; its stylesheet, script and
+image are served from /assets/ so resource blocking shows up in the benchmark.
+"""
+import argparse
+import hashlib
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+from utils.revalidation import USER_AGENT
+from utils.visa_urls import build_visa_url_jobs
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Size and content type of the page assets of the synthetic page
+ASSET_BYTES = 256 * 1024
+ASSET_TYPES = {".css": "text/css", ".js": "application/javascript", ".jpg": "image/jpeg"}
+
+SYNTHETIC_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<title>National visa {n}</title>
+<link rel="stylesheet" href="/assets/site.css">
+<script src="/assets/analytics.js"></script>
+</head>
+<body>
+<nav><a href="/">Home</a> | <a href="/visas">Visas</a> | <a href="/contact">Contact</a></nav>
+<div class="cookie-banner">This website uses cookies to improve your experience.</div>
+<img src="/assets/banner.jpg" alt="Banner">
+<div class="country-data-container">
+<h1>National visa (type D) {n}</h1>
+<h2>Student visa</h2>
+<p>Processing time: 15 to 30 days. Validity: up to 1 year. Fee: EUR 80.</p>
+<ul>
+<li>Completed visa application form</li>
+<li>Valid passport issued within the last 10 years</li>
+<li>Letter of admission from a university</li>
+<li>Proof of sufficient funds</li>
+<li>Health insurance valid for the whole stay</li>
+</ul>
+<h2>Work visa</h2>
+<p>Processing time: 4 to 8 weeks. Validity: up to 2 years. Fee: EUR 80.</p>
+<ul>
+<li>Completed visa application form</li>
+<li>Valid passport issued within the last 10 years</li>
+<li>Work permit issued by the voivode</li>
+<li>Employment contract</li>
+</ul>
+<p>More information: <a href="https://www.gov.pl/web/diplomacy/visas">https://www.gov.pl/web/diplomacy/visas</a></p>
+</div>
+<footer>Copyright Ministry of Foreign Affairs</footer>
+</body>
+</html>
+"""
+
+
+def fixture_path(url: str) -> str:
+    """
+    Args:
+        url: The original page URL
+
+    Returns:
+        str: Path of the recording for the URL
+    """
+    return os.path.join(FIXTURE_DIR, f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html")
+
+
+def record_fixtures() -> None:
+    """Download every distinct page in utils/visa_urls.py into the fixture directory."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for job in build_visa_url_jobs():
+        request = urllib.request.Request(job["url"], headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                html = response.read()
+        except Exception as e:
+            print(f"Failed to record {job['url']}: {e}")
+            continue
+        with open(fixture_path(job["url"]), "wb") as file:
+            file.write(html)
+        print(f"Recorded {job['url']} ({len(html):,} bytes)")
+
+
+def load_fixtures() -> List[bytes]:
+    """
+    Returns:
+        List[bytes]: The recorded pages in utils/visa_urls.py order, or one
+            synthetic page per job if nothing was recorded
+    """
+    pages = []
+    for job in build_visa_url_jobs():
+        path = fixture_path(job["url"])
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                pages.append(file.read())
+    if not pages:
+        pages = [SYNTHETIC_PAGE.format(n=n).encode("utf-8") for n in range(len(build_visa_url_jobs()))]
+    return pages
+
+
+class FixtureServer:
+    """
+    Serves the fixture pages from a background thread with ETag support, so the
+    revalidation pre-check behaves like it does against real servers.
+    """
+
+    def __init__(self, pages: List[bytes] = None):
+        self.pages = pages or load_fixtures()
+        self.requests = 0
+        self.asset_requests = 0
+        pages = self.pages
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _page(self):
+                try:
+                    n = int(self.path.rsplit("/", 1)[-1])
+                except ValueError:
+                    return None, None
+                body = pages[n % len(pages)]
+                return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+            def _asset(self, send_body: bool):
+                content_type = ASSET_TYPES.get(os.path.splitext(self.path)[1])
+                if content_type is None:
+                    self.send_error(404)
+                    return
+                # Comment filler is valid CSS and JavaScript; browsers give up on the image
+                body = b"/*" + b" " * (ASSET_BYTES - 4) + b"*/"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def _respond(self, send_body: bool):
+                server.requests += 1
+                if self.path.startswith("/assets/"):
+                    server.asset_requests += 1
+                    self._asset(send_body)
+                    return
+                body, etag = self._page()
+                if body is None:
+                    self.send_error(404)
+                    return
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def page_url(self, n: int) -> str:
+        """
+        Args:
+            n: Index of the benchmark page
+
+        Returns:
+            str: URL of the n-th benchmark page
+        """
+        return f"{self.base_url}/pages/{n}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or serve benchmark fixture pages.")
+    parser.add_argument("--record", action="store_true", help="download the pages in utils/visa_urls.py")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures()
+        return
+
+    with FixtureServer() as server:
+        print(f"Serving {len(server.pages)} fixture pages at {server.page_url(0)} (Ctrl+C to stop)")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the LIKE scan of /api/visa/search against the FTS5 index as the table grows.
+
+Run from backend/scraper:
+    python -m benchmarks.search_index --records 1000 10000 100000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.sqlite_loader import make_synthetic_visa_info
+from utils.db_utils import connect_visa_db, load_visa_info, search_visa_info
+
+# The query backend/index.ts ran before the index existed
+LIKE_QUERY = """
+    SELECT * FROM visa_info
+    WHERE LOWER(country) LIKE LOWER(?)
+    OR LOWER(visa_type) LIKE LOWER(?)
+    OR LOWER(notes) LIKE LOWER(?)
+"""
+
+SEARCH_TERMS = ["Country 42", "student", "record 4242"]
+
+
+def median_ms(run, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark visa search with LIKE and with the FTS5 index.")
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 10000, 100000], help="table sizes")
+    parser.add_argument("--repeats", type=int, default=20, help="runs per query")
+    args = parser.parse_args()
+
+    print(f"{'Records':>10} {'Term':<14} {'LIKE (ms)':>10} {'FTS5 (ms)':>10}")
+    for records in args.records:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            conn = connect_visa_db(os.path.join(tmp_dir, "visa_info.db"))
+            load_visa_info(make_synthetic_visa_info(records), conn=conn)
+
+            for term in SEARCH_TERMS:
+                param = f"%{term}%"
+                like = median_ms(lambda: conn.execute(LIKE_QUERY, (param, param, param)).fetchall(), args.repeats)
+                fts = median_ms(lambda: search_visa_info(term, conn=conn), args.repeats)
+                print(f"{records:>10,} {term:<14} {like:>10.2f} {fts:>10.2f}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Load-test the hot reads of backend/index.ts before and after the serving lookups.
+
+By default the queries are replayed directly against a synthetic database, with
+the work the handlers do (parsing requirements, serializing the response), from
+several threads at once. With --base-url the endpoints of a running backend are
+requested over HTTP instead.
+
+Run from backend/scraper:
+    python -m benchmarks.serving_latency --records 20000
+    python -m benchmarks.serving_latency --base-url http://localhost:5000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.sqlite_loader import make_synthetic_visa_info
+from utils.db_utils import load_visa_info
+
+
+def parse_rows(cursor: sqlite3.Cursor) -> list:
+    columns = [column[0] for column in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor]
+    for row in rows:
+        row["requirements"] = json.loads(row["requirements"]) if row["requirements"] else []
+    return rows
+
+
+# Handlers as they were: LOWER() comparisons, DISTINCT and parsing every row
+def before_country(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    cursor = conn.execute("SELECT * FROM visa_info WHERE LOWER(country) = LOWER(?)", (country,))
+    return json.dumps({"data": parse_rows(cursor)})
+
+
+def before_type(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    cursor = conn.execute(
+        "SELECT * FROM visa_info WHERE LOWER(country) = LOWER(?) AND LOWER(visa_type) = LOWER(?)", (country, visa_type)
+    )
+    return json.dumps({"data": parse_rows(cursor)})
+
+
+def before_types(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    rows = conn.execute("SELECT visa_type FROM visa_info WHERE LOWER(country) = LOWER(?) ORDER BY visa_type", (country,))
+    return json.dumps({"data": [row[0] for row in rows]})
+
+
+def before_countries(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    rows = conn.execute("SELECT DISTINCT country FROM visa_info ORDER BY country")
+    return json.dumps({"data": [row[0] for row in rows]})
+
+
+# Handlers now: single indexed row fetches of pre-serialized JSON
+def after_country(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    row = conn.execute("SELECT data FROM country_visa_json WHERE country = ?", (country,)).fetchone()
+    return f'{{"data":{row[0]}}}'
+
+
+def after_type(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    cursor = conn.execute(
+        "SELECT * FROM visa_info WHERE country = ? COLLATE NOCASE AND visa_type = ? COLLATE NOCASE", (country, visa_type)
+    )
+    return json.dumps({"data": parse_rows(cursor)})
+
+
+def after_types(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    row = conn.execute("SELECT visa_types FROM country_visa_types WHERE country = ?", (country,)).fetchone()
+    return f'{{"data":{row[0]}}}'
+
+
+def after_countries(conn: sqlite3.Connection, country: str, visa_type: str) -> str:
+    rows = conn.execute("SELECT country FROM country_visa_types ORDER BY country")
+    return json.dumps({"data": [row[0] for row in rows]})
+
+
+ENDPOINTS = [
+    ("/api/visa/country/:country", before_country, after_country),
+    ("/api/visa/country/:country/type/:type", before_type, after_type),
+    ("/api/visa/country/:country/types", before_types, after_types),
+    ("/api/countries", before_countries, after_countries),
+]
+
+
+def percentiles(timings: list) -> str:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return f"{statistics.median(timings) * 1000:>9.3f} {p95 * 1000:>9.3f}"
+
+
+def run_load(request, keys: list, requests: int, concurrency: int) -> list:
+    """
+    Args:
+        request: Callable sending one request for a (country, visa_type) key
+        keys: Keys to pick from at random
+        requests: Number of requests per thread
+        concurrency: Number of threads sending requests at once
+
+    Returns:
+        list: The latency of every request in seconds
+    """
+    def worker(seed: int) -> list:
+        rng = random.Random(seed)
+        timings = []
+        for _ in range(requests):
+            key = rng.choice(keys)
+            started = time.perf_counter()
+            request(*key)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return [timing for timings in executor.map(worker, range(concurrency)) for timing in timings]
+
+
+def bench_sql(records: int, requests: int, concurrency: int) -> None:
+    print(f"{'Endpoint':<40} {'Version':<7} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "visa_info.db")
+        visas = make_synthetic_visa_info(records)
+        load_visa_info(visas, db_path)
+        # Requests arrive in whatever case the client typed
+        keys = [(visa.country.lower(), visa.visa_type.upper()) for visa in random.sample(visas, min(500, records))]
+
+        for endpoint, before, after in ENDPOINTS:
+            for version, handler in (("before", before), ("after", after)):
+                # One connection per thread, like a pool of server processes
+                local = threading.local()
+                connections = []
+
+                def request(country: str, visa_type: str):
+                    if not hasattr(local, "conn"):
+                        local.conn = sqlite3.connect(db_path, check_same_thread=False)
+                        connections.append(local.conn)
+                    return handler(local.conn, country, visa_type)
+
+                timings = run_load(request, keys, requests, concurrency)
+                print(f"{endpoint:<40} {version:<7} {percentiles(timings)}")
+                for conn in connections:
+                    conn.close()
+
+
+def bench_http(base_url: str, requests: int, concurrency: int) -> None:
+    def get(path: str) -> bytes:
+        with urllib.request.urlopen(base_url.rstrip("/") + path) as response:
+            return response.read()
+
+    countries = json.loads(get("/api/countries"))["data"]
+    keys = [
+        (country, visa_type)
+        for country in countries[:100]
+        for visa_type in json.loads(get(f"/api/visa/country/{urllib.parse.quote(country)}/types"))["data"]
+    ]
+    paths = {
+        "/api/visa/country/:country": lambda country, visa_type: f"/api/visa/country/{urllib.parse.quote(country)}",
+        "/api/visa/country/:country/type/:type": lambda country, visa_type: (
+            f"/api/visa/country/{urllib.parse.quote(country)}/type/{urllib.parse.quote(visa_type)}"
+        ),
+        "/api/visa/country/:country/types": lambda country, visa_type: f"/api/visa/country/{urllib.parse.quote(country)}/types",
+        "/api/countries": lambda country, visa_type: "/api/countries",
+    }
+
+    print(f"{'Endpoint':<40} {'p50 (ms)':>9} {'p95 (ms)':>9}")
+    for endpoint, path in paths.items():
+        timings = run_load(lambda country, visa_type: get(path(country, visa_type)), keys, requests, concurrency)
+        print(f"{endpoint:<40} {percentiles(timings)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the visa API reads before and after the serving lookups.")
+    parser.add_argument("--records", type=int, default=20000, help="synthetic records for the SQL replay")
+    parser.add_argument("--requests", type=int, default=200, help="requests per thread and endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="threads sending requests at once")
+    parser.add_argument("--base-url", help="request a running backend instead, e.g. http://localhost:5000")
+    args = parser.parse_args()
+
+    if args.base_url:
+        bench_http(args.base_url, args.requests, args.concurrency)
+    else:
+        bench_sql(args.records, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
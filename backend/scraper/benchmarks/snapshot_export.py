@@ -0,0 +1,93 @@
+"""
+Compare the binary snapshot export against the JSON and CSV outputs: file size,
+time to load everything, and time to look up single visa types.
+
+Run from backend/scraper:
+    python -m benchmarks.snapshot_export --records 1000 10000 100000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.sqlite_loader import make_synthetic_visa_info
+from utils.data_utils import (
+    VisaInfoSnapshot,
+    save_visa_info_to_csv,
+    save_visa_info_to_json,
+    save_visa_info_to_snapshot,
+)
+
+
+def median_ms(run, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def load_json(filename: str) -> list:
+    with open(filename, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_csv(filename: str) -> list:
+    with open(filename, newline="", encoding="utf-8") as file:
+        return list(csv.DictReader(file))
+
+
+def load_snapshot(filename: str) -> list:
+    with VisaInfoSnapshot(filename) as snapshot:
+        return list(snapshot)
+
+
+def json_lookups(filename: str, keys: list) -> list:
+    # A reader of the JSON output has to parse the whole file before the first lookup
+    entries = {(entry["country"], entry["visa_type"]): entry for entry in load_json(filename)}
+    return [entries.get(key) for key in keys]
+
+
+def snapshot_lookups(filename: str, keys: list) -> list:
+    with VisaInfoSnapshot(filename) as snapshot:
+        return [snapshot.get(*key) for key in keys]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the binary snapshot against the JSON and CSV outputs.")
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 10000, 100000], help="dataset sizes")
+    parser.add_argument("--lookups", type=int, default=100, help="single visa type lookups per run")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'Records':>10} {'Format':<9} {'Size (KB)':>10} {'Load all (ms)':>14} {'Lookups (ms)':>13}")
+    for records in args.records:
+        entries = [visa.model_dump() for visa in make_synthetic_visa_info(records)]
+        keys = [(entry["country"], entry["visa_type"]) for entry in random.sample(entries, min(args.lookups, records))]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, "all_visa_info.json")
+            csv_path = os.path.join(tmp_dir, "all_visa_info.csv")
+            snapshot_path = os.path.join(tmp_dir, "all_visa_info.snapshot")
+            save_visa_info_to_json(entries, json_path)
+            save_visa_info_to_csv(entries, csv_path)
+            save_visa_info_to_snapshot(entries, snapshot_path)
+
+            results = [
+                ("json", json_path, load_json, lambda: json_lookups(json_path, keys)),
+                ("csv", csv_path, load_csv, None),
+                ("snapshot", snapshot_path, load_snapshot, lambda: snapshot_lookups(snapshot_path, keys)),
+            ]
+            for name, path, load, lookups in results:
+                load_ms = median_ms(lambda: load(path), args.repeats)
+                lookup_ms = f"{median_ms(lookups, args.repeats):>13.2f}" if lookups else f"{'-':>13}"
+                print(f"{records:>10,} {name:<9} {os.path.getsize(path) / 1024:>10,.0f} {load_ms:>14.2f} {lookup_ms}")
+
+
+if __name__ == "__main__":
+    main()
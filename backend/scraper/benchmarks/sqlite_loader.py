@@ -0,0 +1,112 @@
+"""
+Compare the bulk visa_info loader against the old per-row path.
+
+Run from backend/scraper:
+    python -m benchmarks.sqlite_loader --records 10000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from typing import List
+
+from models.visa_info import VisaInfo
+from utils.db_utils import connect_visa_db, load_visa_info, migrate_visa_db
+
+
+def make_synthetic_visa_info(count: int) -> List[VisaInfo]:
+    """
+    Build synthetic visa records spread over many countries.
+
+    Args:
+        count: Number of records to build
+
+    Returns:
+        List[VisaInfo]: The records, unique on (country, visa_type)
+    """
+    visa_types = ["Student", "Work", "Tourist", "Family", "Transit"]
+    return [
+        VisaInfo(
+            country=f"Country {i // len(visa_types)}",
+            visa_type=visa_types[i % len(visa_types)],
+            requirements=[f"Requirement {j} for record {i}" for j in range(8)],
+            processing_time="6 to 12 weeks",
+            validity="Up to 1 year",
+            fees="€75",
+            entry_type="Multiple-entry",
+            allowed_stay="Duration of the program",
+            embassy_link=f"https://example.org/visa/{i}",
+            notes="Synthetic benchmark record. " * 5,
+        )
+        for i in range(count)
+    ]
+
+
+def load_per_row(visa_infos: List[VisaInfo], db_path: str) -> None:
+    """
+    The previous models/visa_info.py path: existence check, insert and commit per row.
+    """
+    conn = connect_visa_db(db_path)
+    migrate_visa_db(conn)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("PRAGMA synchronous=FULL")
+    cursor = conn.cursor()
+    for visa in visa_infos:
+        cursor.execute('''
+            SELECT COUNT(*) FROM visa_info
+            WHERE country = ? AND visa_type = ?
+        ''', (visa.country, visa.visa_type))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute('''
+                INSERT INTO visa_info (
+                    country, visa_type, requirements, processing_time, validity,
+                    fees, entry_type, allowed_stay, embassy_link, notes
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                visa.country,
+                visa.visa_type,
+                json.dumps(visa.requirements),
+                visa.processing_time,
+                visa.validity,
+                visa.fees,
+                visa.entry_type,
+                visa.allowed_stay,
+                visa.embassy_link,
+                visa.notes,
+            ))
+            conn.commit()
+    conn.close()
+
+
+def time_load(label: str, load, visa_infos: List[VisaInfo]) -> float:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "visa_info.db")
+        started = time.perf_counter()
+        load(visa_infos, db_path)
+        elapsed = time.perf_counter() - started
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT COUNT(*) FROM visa_info").fetchone()[0]
+        conn.close()
+
+    print(f"{label:<15} {elapsed:>10.3f}s {len(visa_infos) / elapsed:>12,.0f} rows/s ({rows:,} rows)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the visa_info SQLite loaders.")
+    parser.add_argument("--records", type=int, default=10000, help="number of synthetic records")
+    args = parser.parse_args()
+
+    visa_infos = make_synthetic_visa_info(args.records)
+
+    print(f"Loading {args.records:,} synthetic visa records")
+    per_row = time_load("Per-row", load_per_row, visa_infos)
+    bulk = time_load("Bulk upsert", lambda records, db_path: load_visa_info(records, db_path), visa_infos)
+    print(f"Speedup: {per_row / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare bulk validation with the cached TypeAdapter against building VisaInfo
+objects one at a time with data_utils.to_visa_info. Both paths coerce the
+entries first, so the difference is the validation itself.
+
+Run from backend/scraper:
+    python -m benchmarks.validation --records 1000 10000 50000
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from pydantic import ValidationError
+
+from benchmarks.sqlite_loader import make_synthetic_visa_info
+from config import REQUIRED_KEYS
+from utils.data_utils import is_complete_visa_info, to_visa_info
+from utils.validation import VisaInfoValidator, coerce_visa_info
+
+
+def make_extracted_entries(count: int) -> list:
+    """
+    Build entries shaped like LLM output, including its common mistakes.
+
+    Args:
+        count: Number of entries to build
+
+    Returns:
+        list: Entries where every 10th has string requirements, every 7th null notes
+            and embassy link, and every 50th is missing a required field
+    """
+    entries = []
+    for i, visa in enumerate(make_synthetic_visa_info(count)):
+        entry = visa.model_dump()
+        entry["error"] = False
+        if i % 10 == 0:
+            entry["requirements"] = ", ".join(entry["requirements"])
+        if i % 7 == 0:
+            entry["notes"] = entry["embassy_link"] = None
+        if i % 50 == 0:
+            entry["fees"] = ""
+        entries.append(entry)
+    return entries
+
+
+def per_object(entries: list) -> list:
+    # The previous path: completeness check, then one VisaInfo per entry
+    visas = []
+    for entry in entries:
+        entry = coerce_visa_info(entry)
+        if not is_complete_visa_info(entry, REQUIRED_KEYS):
+            continue
+        try:
+            visas.append(to_visa_info(entry))
+        except ValidationError:
+            continue
+    return visas
+
+
+def median_ms(run, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk VisaInfo validation against per-object construction.")
+    parser.add_argument("--records", type=int, nargs="+", default=[1000, 10000, 50000], help="batch sizes")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per measurement")
+    args = parser.parse_args()
+
+    validator = VisaInfoValidator(REQUIRED_KEYS)
+    print(f"{'Records':>10} {'Per object (ms)':>16} {'Bulk (ms)':>10} {'Valid':>8}")
+    for records in args.records:
+        entries = make_extracted_entries(records)
+        per_object_ms = median_ms(lambda: per_object(entries), args.repeats)
+        # Rejects are printed; keep the console out of the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            bulk_ms = median_ms(lambda: validator.validate(entries), args.repeats)
+            valid = len(validator.validate(entries))
+        assert valid == len(per_object(entries))
+        print(f"{records:>10,} {per_object_ms:>16.2f} {bulk_ms:>10.2f} {valid:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Command line interface of the scraper.
+
+Run from backend/scraper:
+    python cli.py crawl --mode visa-urls --db
+    python cli.py load output/all_visa_info.json
+    python cli.py export output/germany.csv --country Germany
+    python cli.py validate output/all_visa_info.jsonl
+    python cli.py sources
+    python cli.py bench snapshot_export --records 10000
+
+Subcommands import what they need when they run: only crawl loads crawl4ai and
+Playwright, and export does not build the pydantic model. Nothing is read or
+written at import time. The startup of the non-crawl commands is kept within
+CLI_STARTUP_BUDGET_MS by benchmarks/cli_startup.py.
+"""
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+from config import ADAPTIVE_SCHEDULE, INCREMENTAL_EXTRACTION, POST_PROCESS_WORKERS, VISA_DB_PATH
+
+# Output format of `export`, by file extension
+EXPORT_FORMATS = {".json": "json", ".csv": "csv", ".snapshot": "snapshot"}
+
+
+def add_crawl_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the crawl options, shared by `cli.py crawl` and main.py.
+
+    Args:
+        parser: The parser to add them to
+    """
+    parser.add_argument(
+        "--mode",
+        choices=["countries", "visa-urls"],
+        default="countries",
+        help="crawl one source per country, or every per-visa-type URL in utils/visa_urls.py",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=INCREMENTAL_EXTRACTION,
+        help="only send page sections that changed since the last run to the LLM",
+    )
+    parser.add_argument(
+        "--db",
+        action="store_true",
+        help="also write the crawl results into visa_info.db",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip jobs finished by an interrupted earlier run",
+    )
+    parser.add_argument(
+        "--prometheus",
+        metavar="PATH",
+        help="also write the run metrics to PATH in Prometheus text format",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=POST_PROCESS_WORKERS,
+        help="prune markdown and validate entries in this many worker processes",
+    )
+    parser.add_argument(
+        "--adaptive-schedule",
+        action="store_true",
+        default=ADAPTIVE_SCHEDULE,
+        help="skip sources not due for a re-crawl, answering them from their last crawl",
+    )
+
+
+class CrawlOptions:
+    """
+    Options of a crawl run, as set by the arguments of add_crawl_arguments.
+    """
+
+    def __init__(
+        self,
+        mode: str = "countries",
+        incremental: bool = INCREMENTAL_EXTRACTION,
+        write_db: bool = False,
+        resume: bool = False,
+        prometheus_path: str = None,
+        workers: int = POST_PROCESS_WORKERS,
+        adaptive_schedule: bool = ADAPTIVE_SCHEDULE,
+    ):
+        """
+        Args:
+            mode: "countries" crawls one source per country from COUNTRY_SOURCES,
+                "visa-urls" crawls every distinct page in utils/visa_urls.py
+            incremental: Re-extract only the page sections that changed since the last run
+            write_db: Also upsert the results straight into visa_info.db
+            resume: Skip jobs finished by an interrupted earlier run, using the crawl journal
+            prometheus_path: Optional file to also write the run metrics to in Prometheus format
+            workers: Worker processes for pruning and validation; 0 runs them on the event loop
+            adaptive_schedule: Skip sources not due for a re-crawl on their adaptive
+                schedule, answering them from the entries of their last crawl
+        """
+        self.mode = mode
+        self.incremental = incremental
+        self.write_db = write_db
+        self.resume = resume
+        self.prometheus_path = prometheus_path
+        self.workers = workers
+        self.adaptive_schedule = adaptive_schedule
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "CrawlOptions":
+        """
+        Args:
+            args: Arguments parsed with the options of add_crawl_arguments
+
+        Returns:
+            CrawlOptions: The options they set
+        """
+        return cls(
+            mode=args.mode,
+            incremental=args.incremental,
+            write_db=args.db,
+            resume=args.resume,
+            prometheus_path=args.prometheus,
+            workers=args.workers,
+            adaptive_schedule=args.adaptive_schedule,
+        )
+
+
+def read_entries(filename: str) -> List[dict]:
+    """
+    Args:
+        filename: A JSON, JSONL or snapshot file written by the crawler
+
+    Returns:
+        List[dict]: Its visa information entries
+    """
+    if filename.endswith(".jsonl"):
+        from utils.data_utils import read_visa_info_jsonl
+
+        return list(read_visa_info_jsonl(filename))
+    if filename.endswith(".snapshot"):
+        from utils.data_utils import VisaInfoSnapshot
+
+        with VisaInfoSnapshot(filename) as snapshot:
+            return list(snapshot)
+
+    from utils.changeset import read_visa_info_json
+
+    return read_visa_info_json(filename)
+
+
+def by_country(entries: List[dict]) -> Dict[str, List[dict]]:
+    """
+    Args:
+        entries: Visa information entries
+
+    Returns:
+        Dict[str, List[dict]]: The entries grouped by country, in order of appearance
+    """
+    grouped = {}
+    for entry in entries:
+        grouped.setdefault(str(entry.get("country", "")), []).append(entry)
+    return grouped
+
+
+def crawl(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from main import crawl_visa_information
+
+    asyncio.run(crawl_visa_information(CrawlOptions.from_args(args)))
+    return 0
+
+
+def load(args: argparse.Namespace) -> int:
+    import logging
+
+    from config import REQUIRED_KEYS
+    from utils.db_utils import load_visa_info
+    from utils.validation import VisaInfoValidator
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    validator = VisaInfoValidator(REQUIRED_KEYS, args.rejects)
+    visas = [
+        visa
+        for country, entries in by_country(read_entries(args.input)).items()
+        for visa in validator.validate(entries, country)
+    ]
+    validator.close()
+    load_visa_info(visas, args.db)
+    validator.show_usage()
+    return 0
+
+
+def export(args: argparse.Namespace) -> int:
+    from utils.db_utils import read_visa_info
+
+    export_format = EXPORT_FORMATS[os.path.splitext(args.output)[1]]
+    entries = read_visa_info(args.country, args.db)
+    if export_format == "snapshot":
+        from utils.data_utils import save_visa_info_to_snapshot
+
+        save_visa_info_to_snapshot(entries, args.output)
+    elif export_format == "csv":
+        from utils.data_utils import save_visa_info_to_csv
+
+        save_visa_info_to_csv(entries, args.output)
+    else:
+        from utils.data_utils import save_visa_info_to_json
+
+        save_visa_info_to_json(entries, args.output)
+    return 0
+
+
+def validate(args: argparse.Namespace) -> int:
+    from config import REQUIRED_KEYS
+    from utils.validation import VisaInfoValidator
+
+    validator = VisaInfoValidator(REQUIRED_KEYS, args.rejects)
+    for country, entries in by_country(read_entries(args.input)).items():
+        validator.validate(entries, country)
+    validator.close()
+    validator.show_usage()
+    return 1 if validator.rejected else 0
+
+
+def sources(args: argparse.Namespace) -> int:
+    from config import (
+        BASE_URL,
+        COUNTRIES_TO_CRAWL,
+        COUNTRY_SOURCES,
+        CSS_SELECTOR,
+        SOURCE_SETTINGS,
+        SOURCE_STORE_PATH,
+    )
+    from utils.source_registry import SourceRegistry, known_sources
+    from utils.source_store import SourceStore
+
+    source_store = SourceStore(SOURCE_STORE_PATH, read_only=True)
+    SourceRegistry(source_store, CSS_SELECTOR, SOURCE_SETTINGS, schedule=ADAPTIVE_SCHEDULE).show_schedule(
+        known_sources(COUNTRIES_TO_CRAWL, BASE_URL, COUNTRY_SOURCES)
+    )
+    source_store.close()
+    return 0
+
+
+def bench(args: argparse.Namespace) -> int:
+    import importlib
+
+    module_name = f"benchmarks.{args.name}"
+    try:
+        benchmark = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name != module_name:
+            raise
+        benchmarks_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+        available = sorted(
+            name[:-3] for name in os.listdir(benchmarks_dir) if name.endswith(".py") and name != "__init__.py"
+        )
+        print(f"Unknown benchmark '{args.name}', choose from: {', '.join(available)}")
+        return 2
+
+    # Benchmarks parse their own arguments
+    sys.argv = [f"{module_name}", *args.args]
+    benchmark.main()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Crawl, store and export visa information.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl_parser = subparsers.add_parser("crawl", help="crawl visa information (see main.py)")
+    add_crawl_arguments(crawl_parser)
+    crawl_parser.set_defaults(handler=crawl)
+
+    load_parser = subparsers.add_parser("load", help="validate a crawl output and upsert it into the database")
+    load_parser.add_argument("input", help="JSON, JSONL or snapshot file of visa information")
+    load_parser.add_argument("--db", default=VISA_DB_PATH, help="SQLite database to load into")
+    load_parser.add_argument("--rejects", metavar="PATH", help="write rejected entries to PATH (JSONL)")
+    load_parser.set_defaults(handler=load)
+
+    export_parser = subparsers.add_parser("export", help="export stored visa information")
+    export_parser.add_argument("output", help="output file; the format follows its extension (.json, .csv, .snapshot)")
+    export_parser.add_argument("--country", action="append", help="only export this country; may be repeated")
+    export_parser.add_argument("--db", default=VISA_DB_PATH, help="SQLite database to export from")
+    export_parser.set_defaults(handler=export)
+
+    validate_parser = subparsers.add_parser("validate", help="check a crawl output against the VisaInfo model")
+    validate_parser.add_argument("input", help="JSON, JSONL or snapshot file of visa information")
+    validate_parser.add_argument("--rejects", metavar="PATH", help="write rejected entries to PATH (JSONL)")
+    validate_parser.set_defaults(handler=validate)
+
+    sources_parser = subparsers.add_parser("sources", help="show the selector and re-crawl schedule of every source")
+    sources_parser.set_defaults(handler=sources)
+
+    bench_parser = subparsers.add_parser("bench", help="run a benchmark from benchmarks/")
+    bench_parser.add_argument("name", help="benchmark module, e.g. snapshot_export")
+    bench_parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the benchmark")
+    bench_parser.set_defaults(handler=bench)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """
+    Entry point of the command line interface.
+
+    Args:
+        argv: Arguments without the program name; defaults to sys.argv
+
+    Returns:
+        int: The exit status
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        if os.path.splitext(args.output)[1] not in EXPORT_FORMATS:
+            parser.error(f"unknown export format of '{args.output}', use one of {', '.join(EXPORT_FORMATS)}")
+        if not os.path.exists(args.db):
+            parser.error(f"database '{args.db}' does not exist")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
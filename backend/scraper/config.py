@@ -1,4 +1,5 @@
 # config.py
+import os
 
 # Base URL for visa information (example using a visa service provider)
 BASE_URL="https://www.gov.pl/web/pakistan-en/d-type-national-visa"
@@ -23,6 +24,105 @@ COUNTRIES_TO_CRAWL = [
     # Add more countries as needed
 ]
 
+# Maximum number of countries (or pages in visa-urls mode) crawled at the same time
+MAX_CONCURRENT_CRAWLS = 4
+
+# Requests per second allowed against a single host, and how many may burst at once
+HOST_RATE_LIMIT = 0.5
+HOST_BURST = 1
+
+# On-disk cache of LLM extraction results, keyed by URL and page content hash
+EXTRACTION_CACHE_DIR = ".cache/extraction"
+EXTRACTION_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Per-URL state of crawled sources (validators, last entries, change history), one SQLite row each
+SOURCE_STORE_PATH = ".cache/sources.db"
+
+# Timeout of the HEAD request checking the validators (ETag/Last-Modified/Content-Length) of a source
+REVALIDATION_TIMEOUT = 10
+
+# Per-source settings keyed by host or URL (a URL entry overrides its host): the CSS selector
+# of the visa content (CSS_SELECTOR if unset) and hints sent to the LLM with the page
+SOURCE_SETTINGS = {
+    "www.gov.pl": {
+        "css_selector": CSS_SELECTOR,
+        "hints": "Pages are for applicants from Pakistan. The D-type visa is the national "
+        "long-stay visa (study, work); the C-type visa is the Schengen short-stay visa.",
+    },
+}
+
+# Adaptive re-crawl schedule derived from the change history of every source: the interval
+# halves when a crawl finds changed entries and doubles when it does not. Skipping sources
+# that are not due is off unless enabled here or with --adaptive-schedule
+ADAPTIVE_SCHEDULE = False
+SOURCE_MIN_INTERVAL = 12 * 3600
+SOURCE_MAX_INTERVAL = 30 * 24 * 3600
+SOURCE_INTERVAL_BACKOFF = 2.0
+SOURCE_HISTORY_LENGTH = 20
+
+# Incremental extraction: only markdown sections that changed since the last run go to the LLM
+INCREMENTAL_EXTRACTION = False
+SECTION_STORE_PATH = ".cache/sections.json"
+
+# Boilerplate and sections without visa keywords are pruned from the markdown, and the rest
+# is split into chunks of at most this many tokens that are extracted in parallel
+MARKDOWN_PRUNING = True
+EXTRACTION_CHUNK_TOKENS = 1500
+
+# Rule-based fast path: sections whose required fields all reach this confidence skip the LLM
+RULE_EXTRACTION = True
+RULE_CONFIDENCE_THRESHOLD = 0.8
+
+# LLM dispatch: requests in flight, backoff on rate limits (429), and packing of small
+# chunks from different countries into shared requests (0 disables packing)
+LLM_MAX_IN_FLIGHT = 4
+LLM_MAX_RETRIES = 5
+LLM_BACKOFF_BASE = 2.0
+LLM_BACKOFF_MAX = 60.0
+LLM_PACK_TOKENS = EXTRACTION_CHUNK_TOKENS
+LLM_PACK_WAIT = 0.5
+
+# Near-duplicate visa types of a country are merged: same canonical category and requirements/notes
+# at least DEDUP_SIMILARITY alike, or any names with texts at least DEDUP_CROSS_TYPE_SIMILARITY alike
+DEDUP_SIMILARITY = 0.5
+DEDUP_CROSS_TYPE_SIMILARITY = 0.9
+DEDUP_MAX_COUNTRIES = 100
+
+# Worker processes for markdown pruning and entry validation (0 keeps them on the event loop);
+# worth it when pages are large or many are crawled at once, see main.py --workers
+POST_PROCESS_WORKERS = 0
+
+# Extracted entries that fail bulk validation are written here with their reasons
+REJECTED_VISA_INFO_PATH = "output/rejected_visa_info.jsonl"
+
+# Journal of finished crawl jobs, used by main.py --resume
+CRAWL_JOURNAL_PATH = ".cache/crawl_journal.jsonl"
+# Journal lines written between syncs to disk; an OS crash only loses jobs since the last sync
+CRAWL_JOURNAL_SYNC_EVERY = 20
+
+# Browser context pool: warm contexts are reused per host instead of opening one per page.
+# Only the listed Playwright resource types are loaded; add "script" for pages that need JavaScript.
+BROWSER_ALLOWED_RESOURCE_TYPES = ["document"]
+BROWSER_CONTEXTS_PER_HOST = 2
+BROWSER_MAX_CONTEXTS = MAX_CONCURRENT_CRAWLS
+# Contexts are recycled after this many pages, and each renderer's JavaScript heap is capped
+BROWSER_CONTEXT_MAX_PAGES = 50
+BROWSER_JS_HEAP_MB = 256
+
+# Directory for the changesets (added, removed and modified entries) written after every run
+CHANGESET_DIR = "output/changesets"
+
+# Directory for the JSON run reports (per-stage timings, tokens and entry counts)
+RUN_REPORT_DIR = "output/reports"
+
+# Startup budget of the non-crawl cli.py commands, in milliseconds on top of a bare
+# interpreter start, or of building the VisaInfo validator for load and validate,
+# which cannot skip pydantic; checked by benchmarks/cli_startup.py
+CLI_STARTUP_BUDGET_MS = 100
+
+# SQLite database served by backend/index.ts (repository root)
+VISA_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "visa_info.db")
+
 # Optional: Add source websites for different countries
 COUNTRY_SOURCES = {
     "poland": "https://www.gov.pl/web/pakistan-en/d-type-national-visa",
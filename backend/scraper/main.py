@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import os
 from typing import Set
@@ -5,83 +6,340 @@ from typing import Set
 from crawl4ai import AsyncWebCrawler
 from dotenv import load_dotenv
 
+from cli import CrawlOptions, add_crawl_arguments
 from config import (
     BASE_URL,
+    BROWSER_ALLOWED_RESOURCE_TYPES,
+    BROWSER_CONTEXT_MAX_PAGES,
+    BROWSER_CONTEXTS_PER_HOST,
+    BROWSER_JS_HEAP_MB,
+    BROWSER_MAX_CONTEXTS,
+    CHANGESET_DIR,
     COUNTRIES_TO_CRAWL,
     COUNTRY_SOURCES,
+    CRAWL_JOURNAL_PATH,
+    CRAWL_JOURNAL_SYNC_EVERY,
     CSS_SELECTOR,
+    DEDUP_CROSS_TYPE_SIMILARITY,
+    DEDUP_MAX_COUNTRIES,
+    DEDUP_SIMILARITY,
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_BYTES,
+    EXTRACTION_CHUNK_TOKENS,
+    HOST_BURST,
+    HOST_RATE_LIMIT,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_MAX_IN_FLIGHT,
+    LLM_MAX_RETRIES,
+    LLM_PACK_TOKENS,
+    LLM_PACK_WAIT,
+    MARKDOWN_PRUNING,
+    MAX_CONCURRENT_CRAWLS,
+    REJECTED_VISA_INFO_PATH,
     REQUIRED_KEYS,
+    REVALIDATION_TIMEOUT,
+    RULE_CONFIDENCE_THRESHOLD,
+    RULE_EXTRACTION,
+    RUN_REPORT_DIR,
+    SECTION_STORE_PATH,
+    SOURCE_HISTORY_LENGTH,
+    SOURCE_INTERVAL_BACKOFF,
+    SOURCE_MAX_INTERVAL,
+    SOURCE_MIN_INTERVAL,
+    SOURCE_SETTINGS,
+    SOURCE_STORE_PATH,
 )
-from utils.data_utils import save_visa_info_to_csv, save_visa_info_to_json
+from utils.browser_pool import BrowserContextPool
+from utils.changeset import (
+    changed_keys,
+    entry_key,
+    is_empty_changeset,
+    iter_visa_info_json,
+    save_changeset,
+    update_visa_info_json,
+    update_visa_info_json_from_jsonl,
+)
+from utils.checkpoint import CrawlJournal
+from utils.crawl_scheduler import CrawlScheduler, HostRateLimiter
+from utils.data_utils import VisaInfoStreamWriter, rewrite_visa_info_csv, save_visa_info_to_snapshot
+from utils.db_utils import apply_visa_info_changeset
+from utils.dedup import VisaDedupIndex
+from utils.extraction_cache import ExtractionCache
+from utils.incremental_extraction import SectionStore
+from utils.instrumentation import PipelineMetrics, show_llm_usage
+from utils.llm_dispatch import LLMDispatcher
+from utils.markdown_pruning import MarkdownPruner
+from utils.process_pool import PostProcessPool
+from utils.revalidation import SourceRevalidator
+from utils.rule_extraction import RuleExtractor
 from utils.scraper_utils import (
+    CrawlContext,
     fetch_and_process_country,
+    fetch_and_process_job,
     get_browser_config,
     get_llm_strategy,
 )
+from utils.source_registry import SourceRegistry, get_country_url
+from utils.source_store import SourceStore
+from utils.validation import VisaInfoValidator
+from utils.visa_urls import build_visa_url_jobs
 
-load_dotenv()
-
-
-async def crawl_visa_information():
+async def crawl_visa_information(options: CrawlOptions = None):
     """
     Main function to crawl visa information for multiple countries.
+
+    Args:
+        options: Mode, outputs and components of the run (see cli.CrawlOptions);
+            defaults to crawling one source per country
     """
+    options = options or CrawlOptions()
+
+    # Read the API keys from .env
+    load_dotenv()
+
     # Initialize configurations
-    browser_config = get_browser_config()
+    browser_config = get_browser_config(BROWSER_JS_HEAP_MB)
     llm_strategy = get_llm_strategy()
     session_id = "visa_info_crawl_session"
 
-    # Initialize state variables
-    all_visa_info = []
-    seen_entries: Set[tuple] = set()
+    # Per-stage timings, markdown size, token usage, cache lookups and entry counts for the run report
+    metrics = PipelineMetrics()
+    usage_log = metrics.track_llm_usage(llm_strategy)
+
+    extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES, usage_log)
+    # Validators, last entries and change history of every source, one row per URL
+    source_store = SourceStore(SOURCE_STORE_PATH)
+    source_revalidator = SourceRevalidator(source_store, REVALIDATION_TIMEOUT)
+    source_registry = SourceRegistry(
+        source_store,
+        CSS_SELECTOR,
+        SOURCE_SETTINGS,
+        SOURCE_MIN_INTERVAL,
+        SOURCE_MAX_INTERVAL,
+        SOURCE_INTERVAL_BACKOFF,
+        SOURCE_HISTORY_LENGTH,
+        schedule=options.adaptive_schedule,
+    )
+    section_store = SectionStore(SECTION_STORE_PATH) if options.incremental else None
+    markdown_pruner = MarkdownPruner(EXTRACTION_CHUNK_TOKENS) if MARKDOWN_PRUNING else None
+    rule_extractor = RuleExtractor(REQUIRED_KEYS, RULE_CONFIDENCE_THRESHOLD) if RULE_EXTRACTION else None
+
+    # All LLM requests share one in-flight cap and rate limit backoff
+    llm_dispatcher = LLMDispatcher(
+        llm_strategy,
+        LLM_MAX_IN_FLIGHT,
+        LLM_MAX_RETRIES,
+        LLM_BACKOFF_BASE,
+        LLM_BACKOFF_MAX,
+        LLM_PACK_TOKENS,
+        LLM_PACK_WAIT,
+    )
+
+    # Extracted entries are validated in bulk; rejected ones are kept with their reasons
+    validator = VisaInfoValidator(REQUIRED_KEYS, REJECTED_VISA_INFO_PATH)
+    post_process_pool = PostProcessPool(options.workers, REQUIRED_KEYS) if options.workers else None
+
+    # Finished jobs are journaled so an interrupted crawl can be resumed
+    journal = CrawlJournal(CRAWL_JOURNAL_PATH, options.resume, CRAWL_JOURNAL_SYNC_EVERY)
+
+    # Initialize state variables, rebuilding the dedup state from the journal when resuming
+    seen_entries: Set[tuple] = journal.seen_entries()
+    dedup_index = VisaDedupIndex(DEDUP_SIMILARITY, DEDUP_CROSS_TYPE_SIMILARITY, max_countries=DEDUP_MAX_COUNTRIES)
+    for _, visa_entries in journal.entries():
+        for entry in visa_entries:
+            dedup_index.add(entry)
+    for country, visa_type in journal.retracted:
+        dedup_index.retract(country, visa_type)
 
     # Create output directory if it doesn't exist
     os.makedirs("output", exist_ok=True)
 
+    # Entries are streamed to disk as soon as they are extracted
+    visa_info_writer = VisaInfoStreamWriter("output/all_visa_info.jsonl", "output/all_visa_info.csv")
+    for _, visa_entries in journal.entries():
+        visa_info_writer.write(visa_entries)
+    if journal.completed:
+        print(f"Resuming crawl: {len(journal.completed)} jobs already finished.")
+
+    # Crawl countries (or pages) concurrently; the per-host rate limit keeps requests polite
+    scheduler = CrawlScheduler(MAX_CONCURRENT_CRAWLS)
+    rate_limiter = HostRateLimiter(HOST_RATE_LIMIT, HOST_BURST)
+
     # Start the web crawler context
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        for country in COUNTRIES_TO_CRAWL:
-            # Fetch and process visa information for the current country
-            visa_entries = await fetch_and_process_country(
-                crawler,
-                country,
-                BASE_URL,
-                CSS_SELECTOR,
-                llm_strategy,
-                session_id,
-                REQUIRED_KEYS,
-                seen_entries,
-                COUNTRY_SOURCES,
-            )
+    async with AsyncWebCrawler(config=browser_config) as crawler, visa_info_writer:
+        # Warm browser contexts are shared by all pages of a host
+        browser_pool = BrowserContextPool(
+            crawler,
+            BROWSER_CONTEXTS_PER_HOST,
+            BROWSER_MAX_CONTEXTS,
+            BROWSER_CONTEXT_MAX_PAGES,
+            BROWSER_ALLOWED_RESOURCE_TYPES,
+        )
+        context = CrawlContext(
+            crawler,
+            llm_strategy,
+            REQUIRED_KEYS,
+            seen_entries,
+            CSS_SELECTOR,
+            session_id,
+            extraction_cache=extraction_cache,
+            source_revalidator=source_revalidator,
+            section_store=section_store,
+            metrics=metrics,
+            browser_pool=browser_pool,
+            markdown_pruner=markdown_pruner,
+            rule_extractor=rule_extractor,
+            llm_dispatcher=llm_dispatcher,
+            validator=validator,
+            dedup_index=dedup_index,
+            post_process_pool=post_process_pool,
+            source_registry=source_registry,
+            rate_limiter=rate_limiter,
+        )
 
-            # Add the visa entries to the total list
-            all_visa_info.extend(visa_entries)
+        if options.mode == "visa-urls":
+            # Several pages per country, so country files are written once all jobs are done
+            visa_info_by_country = {}
+            for country, visa_entries in journal.entries():
+                visa_info_by_country.setdefault(country, []).extend(visa_entries)
 
-            # Save country-specific data
-            if visa_entries:
-                save_visa_info_to_json(visa_entries, f"output/{country}_visa_info.json")
+            async def crawl_job(job: dict):
+                return await fetch_and_process_job(context, job)
 
-            # Pause between requests to be polite and avoid rate limits
-            await asyncio.sleep(3)
+            # Pages go through the same scheduler and host rate limit as countries
+            jobs = build_visa_url_jobs()
+            job_keys = [(job["country"], job["url"]) for job in jobs]
+            async for job, visa_entries in scheduler.run(
+                [job for job in jobs if not journal.is_done(job["country"], job["url"])],
+                crawl_job,
+            ):
+                if visa_entries is None:
+                    journal.record_failure(job["country"], job["url"])
+                    continue
+                with metrics.stage(job["country"], "write"):
+                    visa_info_writer.write(visa_entries)
+                    journal.record(job["country"], job["url"], visa_entries, dedup_index.retracted)
+                visa_info_by_country.setdefault(job["country"], []).extend(visa_entries)
 
-    # Save all collected visa information to CSV and JSON files
-    if all_visa_info:
-        save_visa_info_to_csv(all_visa_info, "output/all_visa_info.csv")
-        save_visa_info_to_json(all_visa_info, "output/all_visa_info.json")
-        print(f"Saved {len(all_visa_info)} visa entries to output files.")
+            # A country's file only loses visa types once all of its pages were crawled
+            completed_countries = journal.completed_countries(job_keys)
+            for country, visa_entries in visa_info_by_country.items():
+                # Visa types merged into another one on a later page are dropped
+                visa_entries = [entry for entry in visa_entries if entry_key(entry) not in dedup_index.retracted]
+                if visa_entries:
+                    with metrics.stage(country, "write"):
+                        update_visa_info_json(
+                            f"output/{country}_visa_info.json",
+                            visa_entries,
+                            None if country in completed_countries else [],
+                        )
+        else:
+
+            async def crawl_country(country: str):
+                # Fetch and process visa information for the current country
+                return await fetch_and_process_country(context, country, BASE_URL, COUNTRY_SOURCES)
+
+            def country_url(country: str) -> str:
+                return get_country_url(country, BASE_URL, COUNTRY_SOURCES)
+
+            job_keys = [(country, country_url(country)) for country in COUNTRIES_TO_CRAWL]
+            async for country, visa_entries in scheduler.run(
+                [country for country in COUNTRIES_TO_CRAWL if not journal.is_done(country, country_url(country))],
+                crawl_country,
+            ):
+                if visa_entries is None:
+                    journal.record_failure(country, country_url(country))
+                    continue
+                with metrics.stage(country, "write"):
+                    # Stream the visa entries to the output files
+                    visa_info_writer.write(visa_entries)
+                    journal.record(country, country_url(country), visa_entries, dedup_index.retracted)
+
+                    # Save country-specific data
+                    if visa_entries:
+                        update_visa_info_json(f"output/{country}_visa_info.json", visa_entries)
+
+        await browser_pool.close()
+
+    validator.close()
+    source_store.close()
+    if post_process_pool:
+        post_process_pool.close()
+
+    # Keep the journal while some jobs failed or are missing, so --resume only retries those
+    journal.close(journal.is_finished(job_keys))
+
+    # Apply what changed since the last run to the combined JSON file and the database.
+    # Visa types missing from the crawl are only removed from countries whose jobs all
+    # completed, so a page that failed to load or extract does not remove the entries it had.
+    completed_countries = journal.completed_countries(job_keys)
+    removal_scope = None if completed_countries == {country for country, _ in job_keys} else completed_countries
+    if visa_info_writer.count:
+        with metrics.stage("all", "write"):
+            # Merged records of near-duplicates found on later pages supersede rows already
+            # written, or retract them when the merge moved to another visa type
+            if dedup_index.superseded or dedup_index.retracted:
+                rewrite_visa_info_csv("output/all_visa_info.jsonl", "output/all_visa_info.csv", dedup_index.retracted)
+            # The combined JSON file is the stored state the changeset is computed against;
+            # it and the crawl's JSONL file are streamed rather than loaded
+            changeset = update_visa_info_json_from_jsonl(
+                "output/all_visa_info.json",
+                "output/all_visa_info.jsonl",
+                removal_scope,
+                dedup_index.retracted,
+            )
+            # Memory-mappable snapshot for readers that look up single countries or visa types
+            if not is_empty_changeset(changeset) or not os.path.exists("output/all_visa_info.snapshot"):
+                save_visa_info_to_snapshot(iter_visa_info_json("output/all_visa_info.json"), "output/all_visa_info.snapshot")
+        print(f"Saved {visa_info_writer.count} visa entries to output files.")
+
+        if options.write_db:
+            # The database gets the same changeset, so it follows the JSON file; a database
+            # that missed runs can be brought up to date with `cli.py load output/all_visa_info.json`
+            with metrics.stage("all", "load_db"):
+                apply_visa_info_changeset(changeset)
+            print(f"Applied {len(changed_keys(changeset))} changed visa entries to visa_info.db.")
+
+        # Lets the serving side invalidate only what changed
+        save_changeset(changeset, CHANGESET_DIR)
     else:
         print("No visa information was found during the crawl.")
 
     # Display usage statistics for the LLM strategy
-    llm_strategy.show_usage()
+    show_llm_usage(llm_strategy)
+    llm_dispatcher.show_usage()
+    validator.show_usage()
+    dedup_index.show_usage()
+    source_revalidator.show_usage()
+    source_registry.show_usage()
+    browser_pool.show_usage()
+    if markdown_pruner:
+        markdown_pruner.show_usage()
+    if post_process_pool:
+        post_process_pool.show_usage()
+    if rule_extractor:
+        rule_extractor.show_usage()
+    if section_store:
+        section_store.show_usage()
+    scheduler.show_usage()
+
+    # Save the run report so regressions show up between runs
+    metrics.write_report(RUN_REPORT_DIR)
+    if options.prometheus_path:
+        metrics.write_prometheus(options.prometheus_path)
 
 
 async def main():
     """
-    Entry point of the script.
+    Entry point of the script; `python cli.py crawl` takes the same arguments.
     """
-    await crawl_visa_information()
+    parser = argparse.ArgumentParser(description="Crawl visa information.")
+    add_crawl_arguments(parser)
+    args = parser.parse_args()
+
+    await crawl_visa_information(CrawlOptions.from_args(args))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -1,13 +1,7 @@
-import sqlite3
-import json
 import logging
 from typing import List
 from pydantic import BaseModel
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-logger = logging.getLogger(__name__)
-
 # Define the VisaInfo model
 class VisaInfo(BaseModel):
     country: str
@@ -116,109 +110,9 @@ visa_data = [
     )
 ]
 
-# Connect to SQLite database
-try:
-    conn = sqlite3.connect(r"C:\Users\User\fypaivisaconsultant\visa_info.db")
-    cursor = conn.cursor()
-    logger.info("Successfully connected to visa_info.db")
-except sqlite3.Error as e:
-    logger.error(f"Failed to connect to database: {e}")
-    raise
-
-# Delete all existing records for Hungary
-try:
-    cursor.execute("DELETE FROM visa_info WHERE country = 'Hungary'")
-    deleted_rows = cursor.rowcount
-    conn.commit()
-    logger.info(f"Deleted {deleted_rows} records for Hungary")
-except sqlite3.Error as e:
-    logger.error(f"Failed to delete records for Hungary: {e}")
-    conn.close()
-    raise
-
-# Create table with unique constraint on country and visa_type
-try:
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS visa_info (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            country TEXT,
-            visa_type TEXT,
-            requirements TEXT,
-            processing_time TEXT,
-            validity TEXT,
-            fees TEXT,
-            entry_type TEXT,
-            allowed_stay TEXT,
-            embassy_link TEXT,
-            notes TEXT,
-            UNIQUE(country, visa_type)
-        )
-    ''')
-    conn.commit()
-    logger.info("Table visa_info created or already exists")
-except sqlite3.Error as e:
-    logger.error(f"Failed to create table: {e}")
-    conn.close()
-    raise
-
-# Function to check if a record exists
-def record_exists(country: str, visa_type: str) -> bool:
-    try:
-        cursor.execute('''
-            SELECT COUNT(*) FROM visa_info
-            WHERE country = ? AND visa_type = ?
-        ''', (country, visa_type))
-        count = cursor.fetchone()[0]
-        logger.info(f"Checked existence of {visa_type} visa for {country}: {'Exists' if count > 0 else 'Does not exist'}")
-        return count > 0
-    except sqlite3.Error as e:
-        logger.error(f"Failed to check record existence for {visa_type} in {country}: {e}")
-        raise
-
-# Insert visa data
-for visa in visa_data:
-    try:
-        if not record_exists(visa.country, visa.visa_type):
-            cursor.execute('''
-                INSERT INTO visa_info (
-                    country,
-                    visa_type,
-                    requirements,
-                    processing_time,
-                    validity,
-                    fees,
-                    entry_type,
-                    allowed_stay,
-                    embassy_link,
-                    notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                visa.country,
-                visa.visa_type,
-                json.dumps(visa.requirements),
-                visa.processing_time,
-                visa.validity,
-                visa.fees,
-                visa.entry_type,
-                visa.allowed_stay,
-                visa.embassy_link,
-                visa.notes
-            ))
-            conn.commit()
-            logger.info(f"Inserted {visa.visa_type} visa for {visa.country}")
-        else:
-            logger.info(f"Skipped {visa.visa_type} visa for {visa.country}: Record already exists")
-    except sqlite3.IntegrityError as e:
-        logger.error(f"IntegrityError for {visa.visa_type} visa in {visa.country}: {e}")
-    except sqlite3.Error as e:
-        logger.error(f"Database error for {visa.visa_type} visa in {visa.country}: {e}")
-    except Exception as e:
-        logger.error(f"Unexpected error for {visa.visa_type} visa in {visa.country}: {e}")
+# Seed the Hungary records into visa_info.db: python -m models.visa_info
+if __name__ == "__main__":
+    from utils.db_utils import load_visa_info
 
-# Commit and close
-try:
-    conn.commit()
-    conn.close()
-    logger.info("Database connection closed")
-except sqlite3.Error as e:
-    logger.error(f"Failed to close database connection: {e}")
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_visa_info(visa_data)
@@ -1,7 +1,9 @@
 import sqlite3
 
+from config import VISA_DB_PATH
+
 # Connect to the SQLite database
-conn = sqlite3.connect(r"C:\Users\User\fypaivisaconsultant\visa_info.db")
+conn = sqlite3.connect(VISA_DB_PATH)
 cursor = conn.cursor()
 
 # Fetch all rows from the 'visa_info' table
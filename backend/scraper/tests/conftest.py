@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the scraper modules the way main.py does, from backend/scraper
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
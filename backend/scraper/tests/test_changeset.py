@@ -0,0 +1,124 @@
+import json
+import sqlite3
+
+from utils.changeset import iter_visa_info_json, update_visa_info_json_from_jsonl, write_visa_info_json
+from utils.data_utils import save_visa_info_to_json, to_visa_info
+from utils.db_utils import apply_visa_info_changeset, load_visa_info, read_visa_info
+
+
+def visa(country, visa_type, fees="80 EUR"):
+    return {
+        "country": country,
+        "visa_type": visa_type,
+        "requirements": ["Valid passport"],
+        "processing_time": "15 days",
+        "validity": "1 year",
+        "fees": fees,
+        "entry_type": "Multiple",
+        "allowed_stay": "365 days",
+        "embassy_link": "",
+        "notes": "",
+    }
+
+
+def write_jsonl(path, entries):
+    with open(path, "w", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(json.dumps(entry) + "\n")
+
+
+def keys(entries):
+    return sorted((entry["country"], entry["visa_type"]) for entry in entries)
+
+
+def test_removals_limited_to_completed_countries(tmp_path):
+    json_path, jsonl_path = str(tmp_path / "all.json"), str(tmp_path / "all.jsonl")
+    write_visa_info_json([visa("Poland", "Student"), visa("Poland", "Work"), visa("Spain", "Work")], json_path)
+    # Spain's page failed, so it is missing from the crawl but not in the removal scope
+    write_jsonl(jsonl_path, [visa("Poland", "Student", "60 EUR"), visa("Poland", "Student", "90 EUR")])
+
+    changeset = update_visa_info_json_from_jsonl(json_path, jsonl_path, {"Poland"})
+
+    assert changeset["removed"] == [{"country": "Poland", "visa_type": "Work"}]
+    assert changeset["modified"] == [{"country": "Poland", "visa_type": "Student", "fields": {"fees": "90 EUR"}}]
+    assert changeset["added"] == []
+    entries = list(iter_visa_info_json(json_path))
+    assert keys(entries) == [("Poland", "Student"), ("Spain", "Work")]
+    assert [entry["fees"] for entry in entries if entry["country"] == "Poland"] == ["90 EUR"]
+
+
+def test_written_like_save_visa_info_to_json(tmp_path):
+    entries = [visa("Poland", "Student"), visa("Poland", "Work", "80 EUR }")]
+    saved_path, written_path = tmp_path / "saved.json", tmp_path / "written.json"
+    save_visa_info_to_json(entries, str(saved_path))
+    write_visa_info_json(iter(entries), str(written_path))
+
+    assert written_path.read_text(encoding="utf-8") == saved_path.read_text(encoding="utf-8")
+    assert list(iter_visa_info_json(str(written_path))) == entries
+
+    # Other layouts are loaded whole
+    written_path.write_text(json.dumps(entries), encoding="utf-8")
+    assert list(iter_visa_info_json(str(written_path))) == entries
+
+
+def test_nothing_removed_without_completed_countries(tmp_path):
+    json_path, jsonl_path = str(tmp_path / "all.json"), str(tmp_path / "all.jsonl")
+    save_visa_info_to_json([visa("Poland", "Student"), visa("Poland", "Work")], json_path)
+    write_jsonl(jsonl_path, [visa("Poland", "Student"), visa("Spain", "Work")])
+
+    changeset = update_visa_info_json_from_jsonl(json_path, jsonl_path, set())
+
+    assert changeset["removed"] == []
+    assert keys(changeset["added"]) == [("Spain", "Work")]
+    assert keys(iter_visa_info_json(json_path)) == [("Poland", "Student"), ("Poland", "Work"), ("Spain", "Work")]
+
+
+def test_retracted_visa_types_are_removed(tmp_path):
+    json_path, jsonl_path = str(tmp_path / "all.json"), str(tmp_path / "all.jsonl")
+    save_visa_info_to_json([visa("Poland", "Student Visa")], json_path)
+    # A later page merged the first page's record into a shorter visa type
+    write_jsonl(jsonl_path, [visa("Poland", "Student Visa"), visa("Poland", "Study Visa")])
+
+    changeset = update_visa_info_json_from_jsonl(json_path, jsonl_path, set(), {("Poland", "Student Visa")})
+
+    assert changeset["removed"] == [{"country": "Poland", "visa_type": "Student Visa"}]
+    assert keys(changeset["added"]) == [("Poland", "Study Visa")]
+    assert keys(iter_visa_info_json(json_path)) == [("Poland", "Study Visa")]
+
+
+def test_changeset_applied_to_database(tmp_path):
+    db_path = str(tmp_path / "visa_info.db")
+    json_path, jsonl_path = str(tmp_path / "all.json"), str(tmp_path / "all.jsonl")
+    write_visa_info_json([visa("Poland", "Work")], json_path)
+    # The database already holds the entry the JSON file is missing
+    load_visa_info([to_visa_info(visa("Poland", "Work")), to_visa_info(visa("Poland", "Student"))], db_path)
+    write_jsonl(jsonl_path, [visa("Poland", "Student", "90 EUR")])
+
+    changeset = update_visa_info_json_from_jsonl(json_path, jsonl_path)
+    apply_visa_info_changeset(changeset, db_path)
+
+    rows = read_visa_info(db_path=db_path)
+    assert keys(rows) == [("Poland", "Student")]
+    assert rows[0]["fees"] == "90 EUR"
+
+
+def test_modified_row_missing_from_database_is_inserted(tmp_path):
+    db_path = str(tmp_path / "visa_info.db")
+    load_visa_info([to_visa_info(visa("Spain", "Work"))], db_path)
+    changeset = {
+        "added": [],
+        "removed": [],
+        "modified": [{"country": "Poland", "visa_type": "Work", "fields": {"requirements": ["Work permit"]}}],
+    }
+
+    apply_visa_info_changeset(changeset, db_path)
+
+    rows = read_visa_info(["Poland"], db_path)
+    assert [(row["visa_type"], row["requirements"]) for row in rows] == [("Work", ["Work permit"])]
+    conn = sqlite3.connect(db_path)
+    orphans = conn.execute('''
+        SELECT COUNT(*) FROM visa_requirement r
+        WHERE NOT EXISTS (SELECT 1 FROM visa_info v WHERE v.country = r.country AND v.visa_type = r.visa_type)
+    ''').fetchone()[0]
+    conn.close()
+    assert orphans == 0
@@ -0,0 +1,133 @@
+import json
+import os
+
+from utils import checkpoint
+from utils.checkpoint import CrawlJournal
+
+STUDENT = {"country": "Poland", "visa_type": "Student"}
+WORK = {"country": "Germany", "visa_type": "Work"}
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_resume_after_interruption(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CrawlJournal(path)
+    journal.record("poland", "https://a.test/poland", [STUDENT])
+    journal.record("spain", "https://a.test/spain", [])
+    journal.record_failure("germany", "https://a.test/germany")
+    journal.file.close()
+
+    # The process died while writing the next line
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"country": "italy", "url": "https://a.t')
+
+    journal = CrawlJournal(path, resume=True)
+    assert journal.is_done("poland", "https://a.test/poland")
+    assert journal.is_done("spain", "https://a.test/spain")
+    assert not journal.is_done("germany", "https://a.test/germany")
+    assert not journal.is_done("italy", "https://a.test/italy")
+    assert journal.seen_entries() == {("Poland", "Student")}
+
+    # The failed job is retried and appended after the complete lines
+    journal.record("germany", "https://a.test/germany", [WORK])
+    journal.close()
+    assert [record["country"] for record in read_records(path)] == ["poland", "spain", "germany", "germany"]
+
+    journal = CrawlJournal(path, resume=True)
+    assert journal.is_done("germany", "https://a.test/germany")
+    assert not journal.failed
+    journal.close()
+
+
+def test_without_resume_starts_over(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CrawlJournal(path)
+    journal.record("poland", "https://a.test/poland", [STUDENT])
+    journal.close()
+
+    journal = CrawlJournal(path)
+    assert not journal.completed
+    journal.close()
+    assert read_records(path) == []
+
+
+def test_removed_once_every_job_is_done(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    jobs = [("poland", "https://a.test/poland"), ("spain", "https://a.test/spain")]
+    journal = CrawlJournal(path)
+    journal.record("poland", "https://a.test/poland", [])
+    assert not journal.is_finished(jobs)
+
+    journal.record("spain", "https://a.test/spain", [])
+    assert journal.is_finished(jobs)
+    journal.close(journal.is_finished(jobs))
+    assert not os.path.exists(path)
+
+
+def test_kept_while_a_job_failed(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    jobs = [("poland", "https://a.test/poland"), ("spain", "https://a.test/spain")]
+    journal = CrawlJournal(path)
+    journal.record("poland", "https://a.test/poland", [STUDENT])
+    journal.record_failure("spain", "https://a.test/spain")
+    assert not journal.is_finished(jobs)
+    journal.close(journal.is_finished(jobs))
+    assert os.path.exists(path)
+
+    # --resume only retries the failed job, and the journal goes once it is done
+    journal = CrawlJournal(path, resume=True)
+    assert [job for job in jobs if not journal.is_done(*job)] == [("spain", "https://a.test/spain")]
+    journal.record("spain", "https://a.test/spain", [])
+    journal.close(journal.is_finished(jobs))
+    assert not os.path.exists(path)
+
+
+def test_retracted_visa_types_survive_resume(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CrawlJournal(path)
+    journal.record("poland", "https://a.test/poland/student", [STUDENT])
+    journal.record("poland", "https://a.test/poland/study", [], {("Poland", "Student")})
+    # Keys already journaled are not written again
+    journal.record("poland", "https://a.test/poland/work", [], {("Poland", "Student")})
+    journal.file.close()
+    assert [record.get("retracted") for record in read_records(path)] == [None, [["Poland", "Student"]], None]
+
+    journal = CrawlJournal(path, resume=True)
+    assert journal.retracted == {("Poland", "Student")}
+
+    # A later job that finds the visa type again makes it live again
+    journal.record("poland", "https://a.test/poland/national", [STUDENT])
+    journal.file.close()
+    assert not CrawlJournal(path, resume=True).retracted
+
+
+def test_synced_per_batch(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(checkpoint.os, "fsync", synced.append)
+    journal = CrawlJournal(str(tmp_path / "journal.jsonl"), sync_every=3)
+    for n in range(7):
+        journal.record("poland", f"https://a.test/{n}", [])
+    assert len(synced) == 2
+
+    journal.close()
+    assert len(synced) == 3
+
+
+def test_completed_countries_leave_out_failed_and_missing_jobs(tmp_path):
+    jobs = [
+        ("poland", "https://a.test/poland/study"),
+        ("poland", "https://a.test/poland/work"),
+        ("spain", "https://a.test/spain"),
+        ("italy", "https://a.test/italy"),
+    ]
+    journal = CrawlJournal(str(tmp_path / "journal.jsonl"))
+    journal.record("poland", "https://a.test/poland/study", [STUDENT])
+    journal.record_failure("poland", "https://a.test/poland/work")
+    journal.record("spain", "https://a.test/spain", [])
+
+    assert journal.completed_countries(jobs) == {"spain"}
+    journal.close()
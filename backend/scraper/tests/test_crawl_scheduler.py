@@ -0,0 +1,60 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+from utils.crawl_scheduler import CrawlScheduler, HostRateLimiter
+
+RATE = 10
+
+
+def crawl(scheduler, limiter, jobs, requests_per_job=1):
+    """Run (url, seconds) jobs sending requests_per_job requests each; return the send times per host."""
+    sent = {}
+
+    async def worker(job):
+        url, seconds = job
+        for _ in range(requests_per_job):
+            await limiter.acquire(url)
+            sent.setdefault(urlparse(url).netloc, []).append(time.monotonic())
+        await asyncio.sleep(seconds)
+
+    async def run():
+        async for _ in scheduler.run(jobs, worker):
+            pass
+
+    asyncio.run(run())
+    return sent
+
+
+def gaps(times):
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+def test_jobs_queued_for_a_slot_do_not_burst():
+    # Both slots are busy while the short a.test jobs queue; once they free up, the
+    # queued jobs must still be paced instead of sending tokens they banked meanwhile
+    jobs = [("https://a.test/1", 0.3), ("https://b.test/1", 0.3), ("https://a.test/2", 0), ("https://a.test/3", 0)]
+    sent = crawl(CrawlScheduler(2), HostRateLimiter(RATE), jobs)
+
+    assert len(sent["a.test"]) == 3
+    assert all(gap >= 0.9 / RATE for gap in gaps(sent["a.test"]))
+
+
+def test_every_request_of_a_job_takes_a_token():
+    sent = crawl(CrawlScheduler(2), HostRateLimiter(RATE), [("https://a.test/1", 0)], requests_per_job=2)
+
+    assert all(gap >= 0.9 / RATE for gap in gaps(sent["a.test"]))
+
+
+def test_failed_job_yields_none():
+    async def worker(job):
+        if job == "fail":
+            raise RuntimeError("boom")
+        return job
+
+    async def run():
+        return dict([result async for result in scheduler.run(["ok", "fail"], worker)])
+
+    scheduler = CrawlScheduler(2)
+    assert asyncio.run(run()) == {"ok": "ok", "fail": None}
+    assert scheduler.failed == 1
@@ -0,0 +1,54 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from utils.data_utils import to_visa_info
+from utils.db_utils import connect_visa_db, load_visa_info, read_visa_info
+
+
+def visa(country, visa_type, requirements):
+    return to_visa_info({
+        "country": country,
+        "visa_type": visa_type,
+        "requirements": requirements,
+        "processing_time": "15 days",
+        "validity": "1 year",
+        "fees": "80 EUR",
+        "entry_type": "Multiple",
+        "allowed_stay": "365 days",
+    })
+
+
+def test_serving_tables_rebuilt_for_loaded_countries(tmp_path):
+    conn = connect_visa_db(str(tmp_path / "visa_info.db"))
+    load_visa_info([visa("Poland", "Work", ["Work permit"]), visa("Spain", "Student", ["Admission letter"])], conn=conn)
+    load_visa_info([visa("Poland", "au pair", ["Au pair contract"]), visa("Poland", "Student", ["Admission letter"])], conn=conn)
+
+    visa_types = dict(conn.execute("SELECT country, visa_types FROM country_visa_types"))
+    assert {country: json.loads(types) for country, types in visa_types.items()} == {
+        "Poland": ["au pair", "Student", "Work"],
+        "Spain": ["Student"],
+    }
+
+    poland = json.loads(conn.execute("SELECT data FROM country_visa_json WHERE country = 'poland'").fetchone()[0])
+    assert [entry["visa_type"] for entry in poland] == ["au pair", "Student", "Work"]
+    assert poland[0]["requirements"] == ["Au pair contract"]
+    assert set(poland[0]) == {"id", "country", "visa_type", "requirements", "processing_time", "validity",
+                              "fees", "entry_type", "allowed_stay", "embassy_link", "notes"}
+    conn.close()
+
+
+def test_readers_open_read_only(tmp_path):
+    db_path = str(tmp_path / "visa_info.db")
+    with pytest.raises(sqlite3.OperationalError):
+        read_visa_info(db_path=db_path)
+    assert not os.path.exists(db_path)
+
+    load_visa_info([visa("Poland", "Work", ["Work permit"])], db_path)
+    conn = connect_visa_db(db_path, read_only=True)
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM visa_info")
+    conn.close()
+    assert [entry["visa_type"] for entry in read_visa_info(db_path=db_path)] == ["Work"]
@@ -0,0 +1,122 @@
+from config import DEDUP_CROSS_TYPE_SIMILARITY, DEDUP_SIMILARITY
+from utils.dedup import VisaDedupIndex
+from utils.scraper_utils import dedup_visa_entries
+
+COMMON_REQUIREMENTS = [
+    "Valid passport issued within the last ten years",
+    "Proof of health insurance covering the whole stay",
+]
+
+
+def visa(visa_type, requirements, fees="80 EUR"):
+    return {
+        "country": "Poland",
+        "visa_type": visa_type,
+        "requirements": requirements,
+        "processing_time": "15 days",
+        "validity": "1 year",
+        "fees": fees,
+        "entry_type": "Multiple",
+        "allowed_stay": "365 days",
+        "embassy_link": "",
+        "notes": "",
+    }
+
+
+def dedup_index():
+    return VisaDedupIndex(DEDUP_SIMILARITY, DEDUP_CROSS_TYPE_SIMILARITY)
+
+
+def test_near_identical_distinct_types_are_kept():
+    student = visa(
+        "Student",
+        ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS, "Proof of sufficient funds for the stay"],
+    )
+    language_course = visa(
+        "Language Course",
+        ["Confirmation of enrolment in a Polish language course", *COMMON_REQUIREMENTS, "Proof of sufficient funds for the stay"],
+    )
+    work = visa("Work", ["Work permit issued by the voivode", "Employment contract with a Polish employer", *COMMON_REQUIREMENTS])
+    seasonal_work = visa(
+        "Seasonal Work",
+        ["Seasonal work permit registered by the district labour office", "Proof of accommodation in Poland", *COMMON_REQUIREMENTS],
+    )
+
+    entries = dedup_visa_entries([student, language_course, work, seasonal_work], "poland", set(), dedup_index())
+
+    assert [entry["visa_type"] for entry in entries] == ["Student", "Language Course", "Work", "Seasonal Work"]
+
+
+def test_near_duplicate_on_a_later_page_is_merged():
+    index, seen_entries = dedup_index(), set()
+    first_page = dedup_visa_entries(
+        [visa("Student", ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS])],
+        "poland",
+        seen_entries,
+        index,
+    )
+    second_page = dedup_visa_entries(
+        [visa(
+            "National D Student Visa",
+            ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS, "Proof of sufficient funds"],
+            fees="80 EUR (PLN 340)",
+        )],
+        "poland",
+        seen_entries,
+        index,
+    )
+
+    assert [entry["visa_type"] for entry in first_page] == ["Student"]
+    # The merged record supersedes the one written for the first page
+    assert [entry["visa_type"] for entry in second_page] == ["Student"]
+    assert second_page[0]["requirements"][-1] == "Proof of sufficient funds"
+    assert second_page[0]["fees"] == "80 EUR (PLN 340)"
+    assert index.superseded == 1
+
+    # A third page merges into the merged record, not the first page's
+    third_page = dedup_visa_entries(
+        [visa("Study Visa", ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS, "Two photographs"])],
+        "poland",
+        seen_entries,
+        index,
+    )
+    # Members are merged shortest visa type first, whatever order their pages came in
+    assert third_page[0]["requirements"][-2:] == ["Two photographs", "Proof of sufficient funds"]
+
+
+def student_pages():
+    return [
+        [visa("Student Visa", ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS])],
+        [visa("National D Student Visa", ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS, "Proof of sufficient funds"])],
+        [visa("Study Visa", ["Letter of admission from a Polish university", *COMMON_REQUIREMENTS, "Two photographs"])],
+    ]
+
+
+def test_merge_does_not_depend_on_page_order():
+    results = []
+    for order in ([0, 1, 2], [2, 1, 0], [1, 2, 0]):
+        index, seen_entries, pages = dedup_index(), set(), student_pages()
+        for page in order:
+            last_page = dedup_visa_entries(pages[page], "poland", seen_entries, index)
+        results.append(last_page)
+
+    assert all(result == results[0] for result in results)
+    assert [entry["visa_type"] for entry in results[0]] == ["Study Visa"]
+    assert results[0][0]["requirements"][-2:] == ["Two photographs", "Proof of sufficient funds"]
+
+
+def test_visa_type_taken_over_by_a_later_page_is_retracted():
+    index, seen_entries, pages = dedup_index(), set(), student_pages()
+    dedup_visa_entries(pages[0], "poland", seen_entries, index)
+    second_page = dedup_visa_entries(pages[2], "poland", seen_entries, index)
+
+    assert [entry["visa_type"] for entry in second_page] == ["Study Visa"]
+    assert index.retracted == {("Poland", "Student Visa")}
+    assert index.find(pages[1][0])["visa_type"] == "Study Visa"
+
+    # A resumed run restores the retraction from the journal
+    resumed = dedup_index()
+    for entry in pages[0] + second_page:
+        resumed.add(entry)
+    resumed.retract("Poland", "Student Visa")
+    assert resumed.find(pages[1][0])["visa_type"] == "Study Visa"
@@ -0,0 +1,75 @@
+import asyncio
+import re
+
+from utils.instrumentation import current_country
+from utils.llm_dispatch import LLMDispatcher
+
+HEADER_PATTERN = re.compile(r"^# Source document (\S+): visa information for (.+) \((\S+)\)$", re.MULTILINE)
+POLAND_URL = "https://a.test/poland"
+SPAIN_URL = "https://a.test/spain"
+
+
+class ScriptedStrategy:
+    """
+    Stands in for the LLM: packed requests are answered by `answer_pack`, given the
+    document id of every URL; single requests get one entry named after their URL.
+    """
+
+    def __init__(self, answer_pack):
+        self.answer_pack = answer_pack
+        self.requests = []
+
+    def run(self, url, sections):
+        self.requests.append(url)
+        headers = HEADER_PATTERN.findall(sections[0])
+        if headers:
+            return self.answer_pack({source_url: document_id for document_id, _, source_url in headers})
+        return [{"country": "", "visa_type": f"alone {url}"}]
+
+
+def extract(strategy):
+    dispatcher = LLMDispatcher(strategy, pack_tokens=1000, pack_wait=0.01)
+
+    async def submit(country, url):
+        current_country.set(country)
+        return await dispatcher.submit(url, f"Visa information of {country}.")
+
+    async def run():
+        return await asyncio.gather(submit("poland", POLAND_URL), submit("spain", SPAIN_URL))
+
+    poland, spain = asyncio.run(run())
+    return [entry["visa_type"] for entry in poland], [entry["visa_type"] for entry in spain]
+
+
+def test_routed_by_document_id():
+    strategy = ScriptedStrategy(lambda ids: [
+        {"visa_type": "Student", "source_document": ids[POLAND_URL]},
+        {"visa_type": "Work", "country": "Spain", "source_document": ids[SPAIN_URL]},
+    ])
+    assert extract(strategy) == (["Student"], ["Work"])
+    assert len(strategy.requests) == 1
+
+
+def test_misattributed_country_is_extracted_alone():
+    strategy = ScriptedStrategy(lambda ids: [
+        {"visa_type": "Student", "country": "Spain", "source_document": ids[POLAND_URL]},
+        {"visa_type": "Work", "country": "Spain", "source_document": ids[SPAIN_URL]},
+    ])
+    assert extract(strategy) == ([f"alone {POLAND_URL}"], ["Work"])
+    assert strategy.requests[1:] == [POLAND_URL]
+
+
+def test_missing_document_is_extracted_alone():
+    strategy = ScriptedStrategy(lambda ids: [{"visa_type": "Student", "source_document": ids[POLAND_URL]}])
+    assert extract(strategy) == (["Student"], [f"alone {SPAIN_URL}"])
+    assert strategy.requests[1:] == [SPAIN_URL]
+
+
+def test_entry_without_document_id_retries_every_chunk():
+    strategy = ScriptedStrategy(lambda ids: [
+        {"visa_type": "Student", "source_document": ids[POLAND_URL]},
+        {"visa_type": "Work"},
+    ])
+    assert extract(strategy) == ([f"alone {POLAND_URL}"], [f"alone {SPAIN_URL}"])
+    assert sorted(strategy.requests[1:]) == [POLAND_URL, SPAIN_URL]
+    assert " " in strategy.requests[0]
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.revalidation import SourceRevalidator
+from utils.source_store import SourceStore
+
+ENTRIES = [{"country": "Poland", "visa_type": "Student"}]
+
+
+class StubServer:
+    """
+    Local HTTP server answering HEAD requests with a configurable status and
+    headers, and recording the request headers it received.
+    """
+
+    def __init__(self):
+        self.status = 200
+        self.headers = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                stub.requests.append(dict(self.headers))
+                self.send_response(stub.status)
+                for header, value in stub.headers.items():
+                    self.send_header(header, value)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/visa"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def respond(self, status: int = 200, **headers: str) -> None:
+        self.status = status
+        self.headers = {header.replace("_", "-"): value for header, value in headers.items()}
+
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+@pytest.fixture
+def revalidator(tmp_path):
+    store = SourceStore(str(tmp_path / "sources.db"))
+    yield SourceRevalidator(store, timeout=5)
+    store.close()
+
+
+def crawl(revalidator: SourceRevalidator, url: str) -> bool:
+    """Check a URL and, like the crawler, commit its entries after a successful crawl."""
+    changed = asyncio.run(revalidator.has_changed(url))
+    if changed:
+        revalidator.commit(url, ENTRIES)
+    return changed
+
+
+def test_not_modified_reuses_previous_entries(server, revalidator):
+    server.respond(ETag='"v1"', Last_Modified="Mon, 05 Oct 2026 10:00:00 GMT")
+    assert crawl(revalidator, server.url)
+
+    server.respond(304)
+    assert not crawl(revalidator, server.url)
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+    assert server.requests[-1]["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+    assert revalidator.previous_entries(server.url) == ENTRIES
+
+
+def test_unchanged_etag_without_conditional_support(server, revalidator):
+    server.respond(ETag='"v1"', Content_Length="100")
+    assert crawl(revalidator, server.url)
+    assert not crawl(revalidator, server.url)
+
+
+def test_changed_etag(server, revalidator):
+    server.respond(ETag='"v1"')
+    assert crawl(revalidator, server.url)
+    server.respond(ETag='"v2"')
+    assert crawl(revalidator, server.url)
+
+
+def test_changed_last_modified(server, revalidator):
+    server.respond(Last_Modified="Mon, 05 Oct 2026 10:00:00 GMT")
+    assert crawl(revalidator, server.url)
+    server.respond(Last_Modified="Tue, 06 Oct 2026 10:00:00 GMT")
+    assert crawl(revalidator, server.url)
+
+
+def test_changed_content_length_with_same_etag(server, revalidator):
+    server.respond(ETag='"v1"', Content_Length="100")
+    assert crawl(revalidator, server.url)
+    server.respond(ETag='"v1"', Content_Length="120")
+    assert crawl(revalidator, server.url)
+
+
+def test_no_validators_always_changed(server, revalidator):
+    server.respond(Content_Length="100")
+    assert crawl(revalidator, server.url)
+    assert crawl(revalidator, server.url)
+    assert revalidator.previous_entries(server.url) == []
+
+
+def test_head_error_counts_as_changed(server, revalidator):
+    server.respond(ETag='"v1"')
+    assert crawl(revalidator, server.url)
+    server.respond(405)
+    assert crawl(revalidator, server.url)
+    assert revalidator.changed == 2
+
+
+def test_not_modified_without_stored_entries(server, revalidator):
+    server.respond(304)
+    assert asyncio.run(revalidator.has_changed(server.url))
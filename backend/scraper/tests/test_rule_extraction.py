@@ -0,0 +1,32 @@
+from config import REQUIRED_KEYS
+from utils.rule_extraction import RuleExtractor
+
+STUDENT_SECTION = """## Student Visa
+
+- Valid passport
+- Letter of admission from a Polish university
+
+The visa fee is 80 EUR. Applications are processed within 15 days.
+The visa is valid for 1 year. Holders may stay up to 365 days. It is a multiple-entry visa."""
+
+WORK_SECTION = """## Work Visa
+
+Foreigners who have found an employer in Poland apply with their work permit and employment contract."""
+
+
+def test_prose_section_next_to_confident_section_goes_to_llm():
+    extractor = RuleExtractor(REQUIRED_KEYS)
+    confident, partial, llm_markdown = extractor.extract(f"{STUDENT_SECTION}\n\n{WORK_SECTION}")
+
+    assert [entry["visa_type"] for entry in confident] == ["Student Visa"]
+    assert [entry["visa_type"] for entry, _ in partial] == ["Work Visa"]
+    assert llm_markdown == WORK_SECTION
+
+
+def test_heading_only_sections_are_skipped():
+    extractor = RuleExtractor(REQUIRED_KEYS)
+    _, partial, llm_markdown = extractor.extract(f"# Visas for Poland\n\n{STUDENT_SECTION}\n\n## See also\n\n---")
+
+    assert partial == []
+    assert llm_markdown == ""
+    assert extractor.rule_pages == 1
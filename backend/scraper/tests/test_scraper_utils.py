@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.llm_dispatch import error_block
+from utils.scraper_utils import CrawlContext, fetch_and_process_job
+
+REQUIRED_KEYS = ["country", "visa_type", "requirements"]
+PAGE = "## Student Visa\n\nLetter of admission, valid passport and proof of funds.\n"
+STUDENT = {
+    "country": "Poland",
+    "visa_type": "Student",
+    "requirements": ["Letter of admission"],
+    "processing_time": "15 days",
+    "validity": "1 year",
+    "fees": "80 EUR",
+    "entry_type": "Multiple",
+    "allowed_stay": "365 days",
+}
+JOB = {"country": "poland", "url": "https://a.test/poland/study", "visa_types": ["Student"]}
+
+
+class StubCrawler:
+    async def arun(self, url, config):
+        return SimpleNamespace(success=True, markdown=PAGE, error_message="")
+
+
+class StubStrategy:
+    """Returns the same blocks for every extraction request."""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def run(self, url, sections):
+        return [dict(block) for block in self.blocks]
+
+
+def crawl(blocks):
+    context = CrawlContext(StubCrawler(), StubStrategy(blocks), REQUIRED_KEYS, css_selector="main")
+    return asyncio.run(fetch_and_process_job(context, JOB))
+
+
+def test_extracted_page_returns_entries():
+    assert [entry["visa_type"] for entry in crawl([STUDENT])] == ["Student"]
+
+
+def test_page_without_entries_returns_empty_list():
+    assert crawl([]) == []
+
+
+def test_failed_extraction_fails_the_job():
+    # An empty result would mark the job done and remove the page's stored visa types
+    assert crawl([error_block("Rate limit retries exhausted")]) is None
+    assert crawl([STUDENT, error_block("Chunk 2 failed")]) is None
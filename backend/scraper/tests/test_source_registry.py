@@ -0,0 +1,68 @@
+from utils.revalidation import SourceRevalidator
+from utils.source_registry import SourceRegistry
+from utils.source_store import SourceStore
+
+URL = "https://www.gov.pl/web/pakistan/visa"
+STUDENT = [{"country": "Poland", "visa_type": "Student"}]
+WORK = [{"country": "Poland", "visa_type": "Work"}]
+HOUR = 3600
+START = 1_700_000_000
+
+
+def registry(store, schedule=False):
+    return SourceRegistry(store, "main", min_interval=HOUR, max_interval=8 * HOUR, backoff=2.0, schedule=schedule)
+
+
+def test_schedule_is_opt_in(tmp_path):
+    store = SourceStore(str(tmp_path / "sources.db"))
+    registry(store).commit(URL, STUDENT, now=START)
+
+    assert registry(store).is_due(URL, now=START + 1)
+    scheduled = registry(store, schedule=True)
+    assert not scheduled.is_due(URL, now=START + 1)
+    assert scheduled.is_due(URL, now=START + HOUR)
+    assert scheduled.skipped == 1
+    store.close()
+
+
+def test_interval_adapts_and_survives_reopening(tmp_path):
+    path = str(tmp_path / "sources.db")
+    store = SourceStore(path)
+    sources = registry(store)
+    assert sources.commit(URL, STUDENT, now=START)
+    assert not sources.commit(URL, STUDENT, now=START + HOUR)
+    assert not sources.commit(URL, STUDENT, now=START + 3 * HOUR)
+    assert sources.next_crawl(URL) == START + 7 * HOUR
+    assert sources.commit(URL, WORK, now=START + 7 * HOUR)
+    store.close()
+
+    reopened = registry(SourceStore(path, read_only=True))
+    assert reopened.next_crawl(URL) == START + 9 * HOUR
+    assert reopened.previous_entries(URL) == WORK
+    assert reopened.change_rate(URL) == 1 / 3
+
+
+def test_registry_and_revalidator_share_a_row(tmp_path):
+    store = SourceStore(str(tmp_path / "sources.db"))
+    revalidator = SourceRevalidator(store)
+    revalidator.pending[URL] = {"etag": '"v1"'}
+    revalidator.commit(URL, STUDENT)
+    registry(store).commit(URL, STUDENT, now=START)
+
+    stored = store.get(URL)
+    assert stored["validators"] == {"etag": '"v1"'}
+    assert stored["entries"] == STUDENT
+    assert stored["interval"] == HOUR
+
+    # A page that loses its validators can no longer be skipped, but keeps its schedule
+    revalidator.commit(URL, WORK)
+    assert revalidator.previous_entries(URL) == []
+    assert registry(store).next_crawl(URL) == START + HOUR
+    assert store.conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 1
+    store.close()
+
+
+def test_read_only_store_does_not_create_the_database(tmp_path):
+    path = tmp_path / "sources.db"
+    assert registry(SourceStore(str(path), read_only=True)).previous_entries(URL) == []
+    assert not path.exists()
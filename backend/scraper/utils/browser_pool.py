@@ -0,0 +1,165 @@
+import asyncio
+import weakref
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable
+from urllib.parse import urlparse
+
+from crawl4ai import AsyncWebCrawler
+
+
+class BrowserContextPool:
+    """
+    Pool of reusable browser contexts, handed out per host as crawl4ai session ids.
+
+    Without a session id crawl4ai opens a new browser context for every page, and
+    only closes its page afterwards. The pool keeps at most `contexts_per_host`
+    warm contexts per host and `max_contexts` in total, so later pages from the
+    same host skip context creation. Idle contexts of other hosts are closed when
+    the total limit is reached, and every context is recycled after
+    `max_pages_per_context` pages to bound its memory.
+
+    All requests whose Playwright resource type is not in `allowed_resource_types`
+    (images, fonts, stylesheets, media, analytics scripts, ...) are aborted.
+    """
+
+    def __init__(
+        self,
+        crawler: AsyncWebCrawler,
+        contexts_per_host: int = 2,
+        max_contexts: int = 4,
+        max_pages_per_context: int = 50,
+        allowed_resource_types: Iterable[str] = ("document",),
+    ):
+        self.crawler = crawler
+        self.contexts_per_host = contexts_per_host
+        self.max_contexts = max_contexts
+        self.max_pages_per_context = max_pages_per_context
+        self.allowed_resource_types = set(allowed_resource_types)
+
+        self.hosts: Dict[str, int] = {}
+        self.page_counts: Dict[str, int] = {}
+        self.idle: "OrderedDict[str, str]" = OrderedDict()
+        self.next_id = 0
+        self.pages = 0
+        self.reused = 0
+        self.recycled = 0
+        self.blocked: Counter = Counter()
+        self._available = asyncio.Condition()
+        self._routed_contexts = weakref.WeakSet()
+
+        crawler.crawler_strategy.set_hook("on_page_context_created", self._block_resources)
+
+    async def _block_resources(self, page, context=None, **kwargs):
+        # The hook runs for every crawl, but routes only need to be added once per context
+        if context is not None and context not in self._routed_contexts:
+            self._routed_contexts.add(context)
+            await context.route("**/*", self._route)
+        return page
+
+    async def _route(self, route) -> None:
+        resource_type = route.request.resource_type
+        if resource_type in self.allowed_resource_types:
+            await route.continue_()
+        else:
+            self.blocked[resource_type] += 1
+            await route.abort()
+
+    async def _close_session(self, session_id: str) -> None:
+        await self.crawler.crawler_strategy.browser_manager.kill_session(session_id)
+        self.page_counts.pop(session_id, None)
+
+    def _open_contexts(self) -> int:
+        return sum(self.hosts.values())
+
+    async def acquire(self, url: str) -> str:
+        """
+        Wait for a browser context for the host of the URL.
+
+        Args:
+            url: The URL about to be crawled
+
+        Returns:
+            str: The session id to pass to CrawlerRunConfig
+        """
+        host = urlparse(url).netloc
+        async with self._available:
+            while True:
+                # Prefer a warm context of the same host
+                for session_id, idle_host in self.idle.items():
+                    if idle_host == host:
+                        del self.idle[session_id]
+                        self.reused += 1
+                        return session_id
+
+                if self.hosts.get(host, 0) < self.contexts_per_host:
+                    if self._open_contexts() >= self.max_contexts and self.idle:
+                        # Make room by closing the least recently used idle context of another host
+                        session_id, idle_host = self.idle.popitem(last=False)
+                        self.hosts[idle_host] -= 1
+                        await self._close_session(session_id)
+                    if self._open_contexts() < self.max_contexts:
+                        self.hosts[host] = self.hosts.get(host, 0) + 1
+                        self.next_id += 1
+                        session_id = f"browser_pool_{self.next_id}"
+                        self.page_counts[session_id] = 0
+                        return session_id
+
+                await self._available.wait()
+
+    async def release(self, url: str, session_id: str) -> None:
+        """
+        Return a browser context to the pool, recycling it once it served enough pages.
+
+        Args:
+            url: The URL that was crawled
+            session_id: The session id returned by acquire
+        """
+        host = urlparse(url).netloc
+        async with self._available:
+            self.pages += 1
+            self.page_counts[session_id] += 1
+            if self.page_counts[session_id] >= self.max_pages_per_context:
+                self.hosts[host] -= 1
+                self.recycled += 1
+                await self._close_session(session_id)
+            else:
+                self.idle[session_id] = host
+            self._available.notify_all()
+
+    @asynccontextmanager
+    async def session(self, url: str) -> AsyncIterator[str]:
+        """
+        Borrow a browser context for the host of the URL.
+
+        Args:
+            url: The URL about to be crawled
+
+        Yields:
+            str: The session id to pass to CrawlerRunConfig
+        """
+        session_id = await self.acquire(url)
+        try:
+            yield session_id
+        finally:
+            await self.release(url, session_id)
+
+    async def close(self) -> None:
+        """
+        Close all idle browser contexts.
+        """
+        async with self._available:
+            while self.idle:
+                session_id, host = self.idle.popitem()
+                self.hosts[host] -= 1
+                await self._close_session(session_id)
+
+    def show_usage(self) -> None:
+        """Print how often warm contexts were reused and which requests were blocked."""
+        print("\n=== Browser Context Pool ===")
+        print(f"{'Pages':<15} {self.pages:>12,}")
+        print(f"{'Reused':<15} {self.reused:>12,}")
+        print(f"{'Recycled':<15} {self.recycled:>12,}")
+        print(f"{'Blocked':<15} {sum(self.blocked.values()):>12,}")
+        for resource_type, count in self.blocked.most_common():
+            print(f"{'  ' + resource_type:<15} {count:>12,}")
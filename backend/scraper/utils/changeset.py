@@ -0,0 +1,331 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.data_utils import VISA_INFO_FIELDS, read_visa_info_jsonl, save_visa_info_to_json
+
+# Fields compared between runs; (country, visa_type) identifies the entry
+DIFF_FIELDS = [field for field in VISA_INFO_FIELDS if field not in ("country", "visa_type")]
+
+
+def entry_key(entry: dict) -> Tuple[str, str]:
+    """
+    Args:
+        entry: A visa information entry
+
+    Returns:
+        Tuple[str, str]: The (country, visa_type) identifying the entry
+    """
+    return entry["country"], entry["visa_type"]
+
+
+def field_hash(value) -> str:
+    """
+    Args:
+        value: A field value (string or list of requirements)
+
+    Returns:
+        str: A short, stable hash of the value
+    """
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def field_hashes(entry: dict) -> Dict[str, str]:
+    """
+    Args:
+        entry: A visa information entry
+
+    Returns:
+        Dict[str, str]: The hash of every compared field
+    """
+    return {field: field_hash(entry.get(field)) for field in DIFF_FIELDS}
+
+
+def diff_visa_info(stored: Iterable[dict], crawled: Iterable[dict], countries: Optional[Iterable[str]] = None) -> dict:
+    """
+    Compare a new crawl against the stored dataset by (country, visa_type).
+
+    Only stored entries of `countries` can be reported as removed, so a run that
+    crawled a few countries leaves the others alone.
+
+    Args:
+        stored: The entries currently stored
+        crawled: The entries of the new crawl
+        countries: Countries the crawl covered; defaults to the countries of the crawled entries
+
+    Returns:
+        dict: The changeset, {"added": [entry], "removed": [{"country", "visa_type"}],
+            "modified": [{"country", "visa_type", "fields": {field: new value}}]}
+    """
+    stored_hashes = {entry_key(entry): field_hashes(entry) for entry in stored}
+    crawled_entries = {entry_key(entry): entry for entry in crawled}
+    return diff_field_hashes(stored_hashes, crawled_entries.values(), countries)
+
+
+def diff_field_hashes(
+    stored_hashes: Dict[Tuple[str, str], Dict[str, str]],
+    crawled: Iterable[dict],
+    countries: Optional[Iterable[str]] = None,
+) -> dict:
+    """
+    Compare a new crawl against the field hashes of the stored dataset, like diff_visa_info.
+
+    Args:
+        stored_hashes: The field_hashes of every stored entry, keyed by (country, visa_type)
+        crawled: The entries of the new crawl, unique on (country, visa_type); read once
+        countries: Countries the crawl covered; defaults to the countries of the crawled entries
+
+    Returns:
+        dict: The changeset (see diff_visa_info)
+    """
+    added, modified = [], []
+    crawled_keys = set()
+    for entry in crawled:
+        key = entry_key(entry)
+        crawled_keys.add(key)
+        hashes = stored_hashes.get(key)
+        if hashes is None:
+            added.append(entry)
+            continue
+        fields = {field: entry.get(field) for field, value_hash in field_hashes(entry).items() if hashes[field] != value_hash}
+        if fields:
+            modified.append({"country": key[0], "visa_type": key[1], "fields": fields})
+
+    scope = set(countries) if countries is not None else {country for country, _ in crawled_keys}
+    removed = [
+        {"country": country, "visa_type": visa_type}
+        for country, visa_type in stored_hashes
+        if country in scope and (country, visa_type) not in crawled_keys
+    ]
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def is_empty_changeset(changeset: dict) -> bool:
+    """
+    Args:
+        changeset: A changeset returned by diff_visa_info
+
+    Returns:
+        bool: True if nothing changed
+    """
+    return not (changeset["added"] or changeset["removed"] or changeset["modified"])
+
+
+def changed_keys(changeset: dict) -> List[Tuple[str, str]]:
+    """
+    Args:
+        changeset: A changeset returned by diff_visa_info
+
+    Returns:
+        List[Tuple[str, str]]: The (country, visa_type) of every added, removed or modified entry
+    """
+    return [entry_key(entry) for kind in ("added", "removed", "modified") for entry in changeset[kind]]
+
+
+def apply_changeset(entries: List[dict], changeset: dict) -> List[dict]:
+    """
+    Apply a changeset to a list of entries, keeping the order of unchanged entries.
+
+    Args:
+        entries: The stored entries
+        changeset: A changeset returned by diff_visa_info
+
+    Returns:
+        List[dict]: The updated entries; added entries are appended
+    """
+    removed = {entry_key(entry) for entry in changeset["removed"]}
+    modified = {entry_key(change): change["fields"] for change in changeset["modified"]}
+    updated = [
+        {**entry, **modified.get(entry_key(entry), {})}
+        for entry in entries
+        if entry_key(entry) not in removed
+    ]
+    return updated + changeset["added"]
+
+
+def read_visa_info_json(filename: str) -> List[dict]:
+    """
+    Args:
+        filename: Name of a JSON file written by save_visa_info_to_json
+
+    Returns:
+        List[dict]: Its entries, or an empty list if the file does not exist
+    """
+    if not os.path.exists(filename):
+        return []
+    with open(filename, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def update_visa_info_json(filename: str, visa_info_list: List[dict], countries: Optional[Iterable[str]] = None) -> dict:
+    """
+    Apply the difference between a JSON output file and a new crawl to the file.
+
+    The file is only rewritten if something changed, so readers watching it
+    (e.g. by modification time) are not invalidated by unchanged crawls.
+
+    Args:
+        filename: Name of the JSON file
+        visa_info_list: The entries of the new crawl
+        countries: Countries the crawl covered; defaults to the countries of the entries
+
+    Returns:
+        dict: The applied changeset
+    """
+    stored = read_visa_info_json(filename)
+    changeset = diff_visa_info(stored, visa_info_list, countries)
+    if is_empty_changeset(changeset):
+        print(f"No changes to '{filename}'.")
+    else:
+        save_visa_info_to_json(apply_changeset(stored, changeset), filename)
+    return changeset
+
+
+def iter_visa_info_json(filename: str) -> Iterator[dict]:
+    """
+    Read the entries of a JSON output file one at a time.
+
+    Files in the layout of write_visa_info_json and save_visa_info_to_json (an
+    array indented by two spaces) are streamed entry by entry; files in any other
+    layout are loaded whole.
+
+    Args:
+        filename: Name of the JSON file
+
+    Yields:
+        dict: Each entry; none if the file does not exist
+    """
+    if not os.path.exists(filename):
+        return
+    with open(filename, encoding="utf-8") as file:
+        if file.readline() == "[\n":
+            # Every entry ends with a line closing it at the indentation of the array
+            entry_lines, streamed = [], 0
+            for line in file:
+                entry_lines.append(line)
+                if line.rstrip() in ("  }", "  },"):
+                    yield json.loads("".join(entry_lines).rstrip().rstrip(","))
+                    entry_lines, streamed = [], streamed + 1
+            if "".join(entry_lines).strip() == "]":
+                return
+            if streamed:
+                raise ValueError(f"Unexpected end of the entries in '{filename}'")
+        file.seek(0)
+        yield from json.load(file)
+
+
+def write_visa_info_json(visa_info_list: Iterable[dict], filename: str) -> int:
+    """
+    Stream entries into a JSON array formatted exactly like save_visa_info_to_json.
+
+    The file is written next to the target and moved into place, so `visa_info_list`
+    may be streamed from the file it replaces (see iter_visa_info_json).
+
+    Args:
+        visa_info_list: The entries to write
+        filename: Name of the JSON file
+
+    Returns:
+        int: Number of entries written
+    """
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    count = 0
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, "w", encoding="utf-8") as file:
+        file.write("[")
+        for entry in visa_info_list:
+            entry_json = json.dumps(entry, indent=2, ensure_ascii=False)
+            file.write(",\n" if count else "\n")
+            file.write("\n".join(f"  {line}" for line in entry_json.splitlines()))
+            count += 1
+        file.write("\n]" if count else "]")
+    os.replace(tmp_filename, filename)
+
+    print(f"Saved {count} visa entries to '{filename}'.")
+    return count
+
+
+def update_visa_info_json_from_jsonl(
+    filename: str,
+    jsonl_filename: str,
+    countries: Optional[Iterable[str]] = None,
+    retracted: Iterable[Tuple[str, str]] = (),
+) -> dict:
+    """
+    Apply the difference between a JSON output file and a crawl's JSONL file to the file.
+
+    Both files are streamed: only the field hashes of the stored entries and the
+    line of the last record of every crawled (country, visa_type), which wins like
+    in diff_visa_info, are kept besides the changeset. If something changed, the
+    file is rewritten as the untouched stored entries followed by the crawled ones.
+    Crawled records of retracted visa types are left out, and stored entries under
+    them are removed even outside `countries`: they were merged into another visa
+    type rather than missed by a failed page.
+
+    Args:
+        filename: Name of the JSON file, which may not exist yet
+        jsonl_filename: Name of the JSONL file written during the crawl
+        countries: Countries the crawl covered; defaults to the countries of the crawled entries
+        retracted: (country, visa_type) keys the dedup index merged into another visa type
+
+    Returns:
+        dict: The applied changeset
+    """
+    stored_hashes = {entry_key(entry): field_hashes(entry) for entry in iter_visa_info_json(filename)}
+    retracted = set(retracted)
+    last_lines = {
+        entry_key(entry): n
+        for n, entry in enumerate(read_visa_info_jsonl(jsonl_filename))
+        if entry_key(entry) not in retracted
+    }
+
+    def crawled_entries() -> Iterator[dict]:
+        for n, entry in enumerate(read_visa_info_jsonl(jsonl_filename)):
+            if last_lines.get(entry_key(entry)) == n:
+                yield entry
+
+    changeset = diff_field_hashes(stored_hashes, crawled_entries(), countries)
+    removed = {entry_key(entry) for entry in changeset["removed"]}
+    for key in sorted(retracted & stored_hashes.keys() - removed):
+        changeset["removed"].append({"country": key[0], "visa_type": key[1]})
+        removed.add(key)
+    if is_empty_changeset(changeset):
+        print(f"No changes to '{filename}'.")
+        return changeset
+
+
+    def updated_entries() -> Iterator[dict]:
+        for entry in iter_visa_info_json(filename):
+            if entry_key(entry) not in removed and entry_key(entry) not in last_lines:
+                yield entry
+        yield from crawled_entries()
+
+    write_visa_info_json(updated_entries(), filename)
+    return changeset
+
+
+def save_changeset(changeset: dict, changeset_dir: str) -> str:
+    """
+    Write a changeset as a timestamped JSON file for the serving side to invalidate from.
+
+    Args:
+        changeset: A changeset returned by diff_visa_info
+        changeset_dir: Directory for changesets
+
+    Returns:
+        str: Path of the written changeset
+    """
+    os.makedirs(changeset_dir, exist_ok=True)
+    created_at = datetime.now(timezone.utc)
+    filename = os.path.join(changeset_dir, f"changeset_{created_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump({"created_at": created_at.isoformat(), **changeset}, file, indent=2, ensure_ascii=False)
+    print(
+        f"Saved changeset to '{filename}': {len(changeset['added'])} added, "
+        f"{len(changeset['removed'])} removed, {len(changeset['modified'])} modified."
+    )
+    return filename
@@ -0,0 +1,180 @@
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+# Terminal states of a journaled job
+DONE = "done"
+FAILED = "failed"
+
+
+class CrawlJournal:
+    """
+    Append-only journal of crawl jobs that reached a terminal state.
+
+    Every (country, url) job is written as one JSON line when it completes, with
+    its extracted entries, or when it fails, so an interrupted crawl can be resumed
+    without paying for the same LLM extractions again. Completed jobs are skipped
+    on resume and failed ones are retried. A completed job also lists the
+    (country, visa_type) keys the dedup index retracted since the previous
+    record, so a resumed run drops their records too; a key found again by a
+    later job is live again.
+
+    Resuming appends to the existing file. Lines are flushed as they are written,
+    which survives the crawler process dying, and synced to disk every
+    `sync_every` lines and on close, which bounds what an OS crash can lose to
+    jobs that are simply crawled again.
+    """
+
+    def __init__(self, path: str, resume: bool = False, sync_every: int = 20):
+        self.path = path
+        self.sync_every = sync_every
+        self.completed: Dict[Tuple[str, str], List[dict]] = {}
+        self.failed: Set[Tuple[str, str]] = set()
+        self.retracted: Set[Tuple[str, str]] = set()
+        self.unsynced = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not (resume and os.path.exists(path)):
+            self.file = open(path, "w", encoding="utf-8")
+            return
+
+        valid_bytes = 0
+        with open(path, "rb") as file:
+            for line in file:
+                # The last line may be cut short if the process died while writing it
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_bytes += len(line)
+                self._apply(record)
+
+        # Drop a partial last line so appended records start on a line of their own
+        self.file = open(path, "a", encoding="utf-8")
+        self.file.truncate(valid_bytes)
+
+    def _apply(self, record: dict) -> None:
+        key = (record["country"], record["url"])
+        if record.get("status", DONE) == DONE:
+            self.completed[key] = record["entries"]
+            self.failed.discard(key)
+            self.retracted.difference_update((entry["country"], entry["visa_type"]) for entry in record["entries"])
+            self.retracted.update((country, visa_type) for country, visa_type in record.get("retracted", []))
+        elif key not in self.completed:
+            self.failed.add(key)
+
+    def _write(self, record: dict) -> None:
+        self._apply(record)
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.unsynced += 1
+        if self.unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """Sync the lines written so far to disk."""
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def is_done(self, country: str, url: str) -> bool:
+        """
+        Args:
+            country: The crawled country
+            url: The crawled URL
+
+        Returns:
+            bool: True if the job completed, in this or an earlier, interrupted run
+        """
+        return (country, url) in self.completed
+
+    def is_finished(self, jobs: Iterable[Tuple[str, str]]) -> bool:
+        """
+        Args:
+            jobs: The (country, url) jobs of the crawl
+
+        Returns:
+            bool: True if every job completed, so nothing is left to resume; failed
+                jobs keep the journal for --resume to retry
+        """
+        return all(job in self.completed for job in jobs)
+
+    def completed_countries(self, jobs: Iterable[Tuple[str, str]]) -> Set[str]:
+        """
+        Args:
+            jobs: The (country, url) jobs of the crawl
+
+        Returns:
+            Set[str]: The countries whose jobs all completed; a failed or missing job
+                leaves its country out
+        """
+        countries = {}
+        for country, url in jobs:
+            countries[country] = countries.get(country, True) and self.is_done(country, url)
+        return {country for country, completed in countries.items() if completed}
+
+    def record(
+        self,
+        country: str,
+        url: str,
+        entries: List[dict],
+        retracted: Iterable[Tuple[str, str]] = (),
+    ) -> None:
+        """
+        Journal a completed job, which may have found no entries.
+
+        Args:
+            country: The crawled country
+            url: The crawled URL
+            entries: The processed visa information entries of the job
+            retracted: The (country, visa_type) keys retracted by the dedup index so far;
+                only those not journaled yet are written
+        """
+        record = {"country": country, "url": url, "status": DONE, "entries": entries}
+        new_retracted = sorted(set(retracted) - self.retracted)
+        if new_retracted:
+            record["retracted"] = [list(key) for key in new_retracted]
+        self._write(record)
+
+    def record_failure(self, country: str, url: str) -> None:
+        """
+        Journal a job whose page could not be fetched or crawled.
+
+        Args:
+            country: The crawled country
+            url: The crawled URL
+        """
+        self._write({"country": country, "url": url, "status": FAILED})
+
+    def entries(self) -> Iterator[Tuple[str, List[dict]]]:
+        """
+        Yields:
+            Tuple[str, List[dict]]: The country and entries of every completed job
+        """
+        for (country, _), entries in self.completed.items():
+            yield country, entries
+
+    def seen_entries(self) -> Set[tuple]:
+        """
+        Returns:
+            Set[tuple]: The (country, visa_type) dedup state rebuilt from the journal
+        """
+        return {
+            (entry["country"], entry["visa_type"])
+            for _, entries in self.entries()
+            for entry in entries
+        }
+
+    def close(self, finished: bool = False) -> None:
+        """
+        Sync and close the journal, removing it once the whole crawl has finished.
+
+        Args:
+            finished: True if every job completed (see is_finished)
+        """
+        self.sync()
+        self.file.close()
+        if finished:
+            os.remove(self.path)
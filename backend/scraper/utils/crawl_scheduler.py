@@ -0,0 +1,134 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Tuple
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Token bucket limiting how often requests may be sent to a single host.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; every
+    request consumes one token and waits until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and consume it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """
+    Keeps one token bucket per host so that different hosts are paced independently.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, url: str) -> None:
+        """
+        Wait for the rate limit of the host serving the given URL.
+
+        Args:
+            url: The URL about to be requested
+        """
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        await self.buckets[host].acquire()
+
+
+class CrawlScheduler:
+    """
+    Runs crawl jobs concurrently with a global concurrency cap.
+
+    Jobs pace their own requests with a HostRateLimiter: every outgoing request
+    takes its host's token right before it is sent, once the job holds a slot, so
+    jobs queued for a slot never bank tokens and burst when slots free up.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.finished = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    async def run(
+        self,
+        jobs: Iterable[Any],
+        worker: Callable[[Any], Awaitable[Any]],
+    ) -> AsyncIterator[Tuple[Any, Any]]:
+        """
+        Run the worker for every job and yield results as soon as each job finishes.
+
+        Args:
+            jobs: The jobs to run (e.g. country names)
+            worker: Coroutine function processing a single job
+
+        Yields:
+            Tuple[Any, Any]: The job and the worker result, in completion order.
+                Jobs whose worker raised yield None.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_job(job):
+            async with semaphore:
+                try:
+                    return job, await worker(job)
+                except Exception as e:
+                    print(f"Error crawling {job}: {e}")
+                    self.failed += 1
+                    return job, None
+
+        self.started_at = time.perf_counter()
+        tasks = [asyncio.create_task(run_job(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                job, result = await next_done
+                self.finished += 1
+                yield job, result
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.finished_at = time.perf_counter()
+
+    def throughput(self) -> float:
+        """
+        Returns:
+            float: Finished jobs per minute for the last run.
+        """
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        return self.finished / elapsed * 60 if elapsed > 0 else 0.0
+
+    def show_usage(self) -> None:
+        """Print a summary of the last run's throughput."""
+        elapsed = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        print("\n=== Crawl Throughput ===")
+        print(f"{'Finished':<15} {self.finished:>12,}")
+        print(f"{'Failed':<15} {self.failed:>12,}")
+        print(f"{'Elapsed (s)':<15} {elapsed:>12.1f}")
+        print(f"{'Per minute':<15} {self.throughput():>12.1f}")
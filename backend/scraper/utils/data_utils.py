@@ -1,8 +1,36 @@
 import csv
 import json
+import mmap
 import os
-from typing import List, Set
-from models.visa_info import VisaInfo
+import struct
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from models.visa_info import VisaInfo
+
+# Fixed CSV column order, matching the VisaInfo model; spelled out so reading and
+# writing the outputs does not pay for building the pydantic model
+VISA_INFO_FIELDS = [
+    "country",
+    "visa_type",
+    "requirements",
+    "processing_time",
+    "validity",
+    "fees",
+    "entry_type",
+    "allowed_stay",
+    "embassy_link",
+    "notes",
+]
+
+# Binary snapshot layout (little-endian), see save_visa_info_to_snapshot
+SNAPSHOT_MAGIC = b"VISASNAP"
+SNAPSHOT_VERSION = 1
+# magic, version, scalar field count, record count, string count, string table offset, record table offset
+SNAPSHOT_HEADER = struct.Struct("<8sHHIIQQ")
+SNAPSHOT_OFFSET = struct.Struct("<I")
+# Every field except requirements holds one string id; the requirement ids follow them
+SNAPSHOT_SCALAR_FIELDS = [field for field in VISA_INFO_FIELDS if field != "requirements"]
 
 
 def is_duplicate_visa_info(country: str, visa_type: str, seen_entries: Set[tuple]) -> bool:
@@ -34,6 +62,27 @@ def is_complete_visa_info(visa_info: dict, required_keys: List[str]) -> bool:
     return all(key in visa_info and visa_info[key] for key in required_keys)
 
 
+def to_visa_info(visa_info: dict) -> "VisaInfo":
+    """
+    Build a VisaInfo model from a complete visa information entry.
+
+    Args:
+        visa_info: Dictionary containing visa information
+
+    Returns:
+        VisaInfo: The model, with a missing embassy link or notes stored as empty strings
+    """
+    from models.visa_info import VisaInfo
+
+    return VisaInfo(
+        **{
+            **visa_info,
+            "embassy_link": visa_info.get("embassy_link") or "",
+            "notes": visa_info.get("notes") or "",
+        }
+    )
+
+
 def save_visa_info_to_csv(visa_info_list: List[dict], filename: str) -> None:
     """
     Save visa information to a CSV file.
@@ -47,7 +96,7 @@ def save_visa_info_to_csv(visa_info_list: List[dict], filename: str) -> None:
         return
 
     # Make sure output directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
 
     # Get all fields from the data
     all_fields = set()
@@ -78,8 +127,329 @@ def save_visa_info_to_json(visa_info_list: List[dict], filename: str) -> None:
         return
 
     # Make sure output directory exists
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
 
     with open(filename, "w", encoding="utf-8") as file:
         json.dump(visa_info_list, file, indent=2, ensure_ascii=False)
-    print(f"Saved {len(visa_info_list)} visa entries to '{filename}'.")
\ No newline at end of file
+    print(f"Saved {len(visa_info_list)} visa entries to '{filename}'.")
+
+
+class VisaInfoStreamWriter:
+    """
+    Appends visa information entries to JSONL and CSV files as soon as they are
+    extracted, so a crash late in a crawl keeps everything written so far and
+    memory does not grow with the number of countries.
+
+    The final JSON array is produced from the JSONL file afterwards, by
+    changeset.update_visa_info_json_from_jsonl.
+    """
+
+    def __init__(self, jsonl_filename: str, csv_filename: str):
+        self.jsonl_filename = jsonl_filename
+        self.csv_filename = csv_filename
+        self.count = 0
+
+        # Make sure output directories exist
+        os.makedirs(os.path.dirname(jsonl_filename) or ".", exist_ok=True)
+        os.makedirs(os.path.dirname(csv_filename) or ".", exist_ok=True)
+
+        self.jsonl_file = open(jsonl_filename, "w", encoding="utf-8")
+        self.csv_file = open(csv_filename, mode="w", newline="", encoding="utf-8")
+        self.csv_writer = csv.DictWriter(self.csv_file, fieldnames=VISA_INFO_FIELDS, extrasaction="ignore")
+        self.csv_writer.writeheader()
+
+    def write(self, visa_info_list: List[dict]) -> None:
+        """
+        Append entries to both files and flush them to disk.
+
+        Args:
+            visa_info_list: List of visa information dictionaries
+        """
+        for entry in visa_info_list:
+            self.jsonl_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.csv_writer.writerow(entry)
+            self.count += 1
+
+        self.jsonl_file.flush()
+        self.csv_file.flush()
+
+    def close(self) -> None:
+        """Close both output files."""
+        self.jsonl_file.close()
+        self.csv_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_visa_info_jsonl(filename: str) -> Iterator[dict]:
+    """
+    Read visa information entries from a JSONL file one at a time.
+
+    Args:
+        filename: Name of the JSONL file to read
+
+    Yields:
+        dict: Each visa information entry
+    """
+    with open(filename, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def rewrite_visa_info_csv(
+    jsonl_filename: str,
+    csv_filename: str,
+    retracted: Iterable[Tuple[str, str]] = (),
+) -> int:
+    """
+    Rewrite the CSV file of a crawl from its JSONL file with one row per visa type.
+
+    Used when merged records superseded entries already written; the last record
+    of every (country, visa_type) wins, and retracted visa types are dropped. Only
+    the line numbers of the last records are kept in memory.
+
+    Args:
+        jsonl_filename: Name of the JSONL file written during the crawl
+        csv_filename: Name of the CSV file to rewrite
+        retracted: (country, visa_type) keys merged into another visa type
+
+    Returns:
+        int: Number of rows written
+    """
+    retracted = set(retracted)
+    last_lines = {
+        (entry["country"], entry["visa_type"]): n
+        for n, entry in enumerate(read_visa_info_jsonl(jsonl_filename))
+        if (entry["country"], entry["visa_type"]) not in retracted
+    }
+
+    count = 0
+    tmp_filename = f"{csv_filename}.tmp"
+    with open(tmp_filename, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=VISA_INFO_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for n, entry in enumerate(read_visa_info_jsonl(jsonl_filename)):
+            if last_lines.get((entry["country"], entry["visa_type"])) == n:
+                writer.writerow(entry)
+                count += 1
+    os.replace(tmp_filename, csv_filename)
+
+    print(f"Saved {count} visa entries to '{csv_filename}'.")
+    return count
+
+
+def save_visa_info_to_snapshot(visa_info_list: Iterable[dict], filename: str) -> int:
+    """
+    Save visa information to a compact binary snapshot for the serving layer.
+
+    Layout, all integers little-endian:
+    - Header: SNAPSHOT_HEADER
+    - String table: string count + 1 uint32 offsets, then the UTF-8 strings. Every
+      distinct string (country, requirement, fee, ...) is stored once.
+    - Record table: record count + 1 uint32 offsets, then per record the string ids
+      of SNAPSHOT_SCALAR_FIELDS followed by the ids of its requirements.
+
+    Records are sorted by (country, visa_type) so VisaInfoSnapshot can look them up
+    with a binary search on the memory-mapped file.
+
+    Args:
+        visa_info_list: Visa information dictionaries, unique on (country, visa_type)
+        filename: Name of the snapshot file to write
+
+    Returns:
+        int: Number of records written
+    """
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    def text(value) -> str:
+        return "" if value is None else str(value)
+
+    strings: List[bytes] = []
+    string_ids = {}
+
+    def intern(value) -> int:
+        value = text(value)
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value.encode("utf-8"))
+        return string_ids[value]
+
+    records = sorted(visa_info_list, key=lambda entry: (text(entry.get("country")), text(entry.get("visa_type"))))
+    record_ids = []
+    for entry in records:
+        requirements = entry.get("requirements") or []
+        if isinstance(requirements, str):
+            requirements = [requirements]
+        record_ids.append(
+            [intern(entry.get(field)) for field in SNAPSHOT_SCALAR_FIELDS]
+            + [intern(requirement) for requirement in requirements]
+        )
+
+    string_offsets, position = [0], 0
+    for string in strings:
+        position += len(string)
+        string_offsets.append(position)
+    record_offsets, position = [0], 0
+    for ids in record_ids:
+        position += len(ids) * SNAPSHOT_OFFSET.size
+        record_offsets.append(position)
+
+    string_table_offset = SNAPSHOT_HEADER.size
+    record_table_offset = string_table_offset + len(string_offsets) * SNAPSHOT_OFFSET.size + string_offsets[-1]
+
+    tmp_filename = f"{filename}.tmp"
+    with open(tmp_filename, "wb") as file:
+        file.write(SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC,
+            SNAPSHOT_VERSION,
+            len(SNAPSHOT_SCALAR_FIELDS),
+            len(records),
+            len(strings),
+            string_table_offset,
+            record_table_offset,
+        ))
+        file.write(struct.pack(f"<{len(string_offsets)}I", *string_offsets))
+        file.write(b"".join(strings))
+        file.write(struct.pack(f"<{len(record_offsets)}I", *record_offsets))
+        for ids in record_ids:
+            file.write(struct.pack(f"<{len(ids)}I", *ids))
+    os.replace(tmp_filename, filename)
+
+    print(f"Saved {len(records)} visa entries ({len(strings)} distinct strings) to '{filename}'.")
+    return len(records)
+
+
+class VisaInfoSnapshot:
+    """
+    Reads a snapshot written by save_visa_info_to_snapshot without loading it.
+
+    The file is memory-mapped; opening it only parses the header, and a lookup by
+    (country, visa_type) binary searches the sorted records, decoding O(log n)
+    strings. Only the records that are returned are decoded in full.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, field_count, self.record_count, self.string_count, self.string_table_offset, \
+            self.record_table_offset = SNAPSHOT_HEADER.unpack_from(self.data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a visa information snapshot")
+        if version != SNAPSHOT_VERSION or field_count != len(SNAPSHOT_SCALAR_FIELDS):
+            self.close()
+            raise ValueError(f"{filename} has snapshot version {version}, expected {SNAPSHOT_VERSION}")
+
+        self.strings_offset = self.string_table_offset + (self.string_count + 1) * SNAPSHOT_OFFSET.size
+        self.records_offset = self.record_table_offset + (self.record_count + 1) * SNAPSHOT_OFFSET.size
+
+    def _offset(self, table_offset: int, index: int) -> int:
+        return SNAPSHOT_OFFSET.unpack_from(self.data, table_offset + index * SNAPSHOT_OFFSET.size)[0]
+
+    def string(self, string_id: int) -> str:
+        """
+        Args:
+            string_id: Index in the string table
+
+        Returns:
+            str: The interned string
+        """
+        start = self._offset(self.string_table_offset, string_id)
+        end = self._offset(self.string_table_offset, string_id + 1)
+        return self.data[self.strings_offset + start:self.strings_offset + end].decode("utf-8")
+
+    def _record_ids(self, index: int) -> Tuple[int, ...]:
+        start = self._offset(self.record_table_offset, index)
+        end = self._offset(self.record_table_offset, index + 1)
+        count = (end - start) // SNAPSHOT_OFFSET.size
+        return struct.unpack_from(f"<{count}I", self.data, self.records_offset + start)
+
+    def key(self, index: int) -> Tuple[str, str]:
+        """
+        Args:
+            index: Record index
+
+        Returns:
+            Tuple[str, str]: The (country, visa_type) of the record
+        """
+        start = self.records_offset + self._offset(self.record_table_offset, index)
+        country_id, visa_type_id = struct.unpack_from("<2I", self.data, start)
+        return self.string(country_id), self.string(visa_type_id)
+
+    def record(self, index: int) -> dict:
+        """
+        Args:
+            index: Record index
+
+        Returns:
+            dict: The visa information entry
+        """
+        ids = self._record_ids(index)
+        field_count = len(SNAPSHOT_SCALAR_FIELDS)
+        entry = dict(zip(SNAPSHOT_SCALAR_FIELDS, (self.string(string_id) for string_id in ids[:field_count])))
+        entry["requirements"] = [self.string(string_id) for string_id in ids[field_count:]]
+        return {field: entry[field] for field in VISA_INFO_FIELDS}
+
+    def _lower_bound(self, key: Tuple[str, ...]) -> int:
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle)[:len(key)] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def get(self, country: str, visa_type: str) -> Optional[dict]:
+        """
+        Args:
+            country: The country name
+            visa_type: The type of visa
+
+        Returns:
+            Optional[dict]: The visa information entry, or None if there is none
+        """
+        index = self._lower_bound((country, visa_type))
+        if index < self.record_count and self.key(index) == (country, visa_type):
+            return self.record(index)
+        return None
+
+    def for_country(self, country: str) -> List[dict]:
+        """
+        Args:
+            country: The country name
+
+        Returns:
+            List[dict]: All visa information entries of the country, sorted by visa type
+        """
+        entries = []
+        index = self._lower_bound((country,))
+        while index < self.record_count and self.key(index)[0] == country:
+            entries.append(self.record(index))
+            index += 1
+        return entries
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(self.record_count):
+            yield self.record(index)
+
+    def close(self) -> None:
+        """Unmap and close the snapshot file."""
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
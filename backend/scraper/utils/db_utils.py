@@ -0,0 +1,705 @@
+import json
+import logging
+import os
+import pathlib
+import re
+import sqlite3
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, List, Tuple
+
+from config import VISA_DB_PATH
+from utils.changeset import changed_keys
+
+if TYPE_CHECKING:
+    from models.visa_info import VisaInfo
+
+logger = logging.getLogger(__name__)
+
+# Column order used for every insert into visa_info
+VISA_INFO_COLUMNS = [
+    "country",
+    "visa_type",
+    "requirements",
+    "processing_time",
+    "validity",
+    "fees",
+    "entry_type",
+    "allowed_stay",
+    "embassy_link",
+    "notes",
+]
+
+# Visa records upserted per executemany batch, bounding memory for large loads
+LOAD_BATCH_SIZE = 500
+
+# Full-text search index over every text field of visa_info, ranked with bm25
+VISA_INFO_FTS_TABLE = "visa_info_fts"
+# bm25 weight per indexed column (VISA_INFO_COLUMNS order); matches in country and visa type rank highest
+VISA_INFO_FTS_WEIGHTS = [5.0, 5.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.5, 2.0]
+
+# Requirements are stored as a JSON list; the index gets one requirement per line
+FLATTEN_REQUIREMENTS = """
+    CASE WHEN json_valid({row}.requirements) AND json_type({row}.requirements) = 'array'
+        THEN (SELECT group_concat(value, char(10)) FROM json_each({row}.requirements))
+        ELSE {row}.requirements
+    END
+"""
+
+# Requirements as a JSON array, decoded like decode_requirements
+REQUIREMENTS_JSON = """
+    CASE
+        WHEN requirements IS NULL OR requirements = '' THEN json_array()
+        WHEN json_valid(requirements) AND json_type(requirements) = 'array' THEN json(requirements)
+        WHEN json_valid(requirements) THEN json_array(CAST(json_extract(requirements, '$') AS TEXT))
+        ELSE json_array(requirements)
+    END
+"""
+# A visa_info row in the response format of backend/index.ts
+SERVING_ROW_JSON = "json_object('id', id, {})".format(
+    ", ".join(
+        f"'{column}', {REQUIREMENTS_JSON if column == 'requirements' else column}" for column in VISA_INFO_COLUMNS
+    )
+)
+
+
+def connect_visa_db(db_path: str = VISA_DB_PATH, read_only: bool = False) -> sqlite3.Connection:
+    """
+    Open the visa database without touching its schema.
+
+    Writers call migrate_visa_db on the connection before they write. Readers open
+    the database read-only, so exporting or searching never creates the file,
+    switches its journal mode or runs DDL.
+
+    Args:
+        db_path: Path to the SQLite database
+        read_only: Open with mode=ro; the database must exist
+
+    Returns:
+        sqlite3.Connection: The open connection
+    """
+    if read_only:
+        conn = sqlite3.connect(f"{pathlib.Path(os.path.abspath(db_path)).as_uri()}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+    logger.info(f"Connected to {db_path}{' (read-only)' if read_only else ''}")
+    return conn
+
+
+def migrate_visa_db(conn: sqlite3.Connection) -> None:
+    """
+    Switch the visa database to WAL mode and make sure the schema exists.
+
+    Every statement is idempotent, so writers run this before each bulk write.
+    Databases created before the unique constraint existed get a unique index on
+    (country, visa_type) instead, which the upsert in load_visa_info relies on.
+
+    Args:
+        conn: Writable connection to the visa database
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS visa_info (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                country TEXT,
+                visa_type TEXT,
+                requirements TEXT,
+                processing_time TEXT,
+                validity TEXT,
+                fees TEXT,
+                entry_type TEXT,
+                allowed_stay TEXT,
+                embassy_link TEXT,
+                notes TEXT,
+                UNIQUE(country, visa_type)
+            )
+        ''')
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_visa_info_country_visa_type
+            ON visa_info (country, visa_type)
+        ''')
+
+        ensure_visa_info_fts(conn)
+        ensure_visa_requirement_tables(conn)
+        ensure_serving_tables(conn)
+
+
+def ensure_visa_info_fts(conn: sqlite3.Connection) -> None:
+    """
+    Create the FTS5 search index over visa_info and the triggers keeping it in sync.
+
+    The triggers update the index row by row whenever visa_info changes, whether
+    the scraper or the backend writes it, so it never needs a full rebuild. An index
+    created for a database that already holds rows is filled once from them.
+
+    Args:
+        conn: Open connection to the visa database
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (VISA_INFO_FTS_TABLE,)
+    ).fetchone()
+    if exists:
+        return
+
+    columns = ", ".join(VISA_INFO_COLUMNS)
+
+    def values(row: str) -> str:
+        return ", ".join(
+            FLATTEN_REQUIREMENTS.format(row=row) if column == "requirements" else f"{row}.{column}"
+            for column in VISA_INFO_COLUMNS
+        )
+
+    changed = " OR ".join(f"old.{column} IS NOT new.{column}" for column in VISA_INFO_COLUMNS)
+
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE {VISA_INFO_FTS_TABLE} USING fts5(
+            {columns},
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER visa_info_fts_insert AFTER INSERT ON visa_info BEGIN
+            INSERT INTO {VISA_INFO_FTS_TABLE} (rowid, {columns}) VALUES (new.id, {values("new")});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER visa_info_fts_delete AFTER DELETE ON visa_info BEGIN
+            DELETE FROM {VISA_INFO_FTS_TABLE} WHERE rowid = old.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER visa_info_fts_update AFTER UPDATE ON visa_info WHEN {changed} BEGIN
+            DELETE FROM {VISA_INFO_FTS_TABLE} WHERE rowid = old.id;
+            INSERT INTO {VISA_INFO_FTS_TABLE} (rowid, {columns}) VALUES (new.id, {values("new")});
+        END
+    ''')
+    conn.execute(f'''
+        INSERT INTO {VISA_INFO_FTS_TABLE} (rowid, {columns})
+        SELECT visa_info.id, {values("visa_info")} FROM visa_info
+    ''')
+    logger.info(f"Created full-text search index {VISA_INFO_FTS_TABLE}")
+
+
+def ensure_serving_tables(conn: sqlite3.Connection) -> None:
+    """
+    Create the lookup tables behind the hot reads of backend/index.ts.
+
+    - A COLLATE NOCASE index on (country, visa_type) serves case-insensitive
+      lookups, which LOWER() on both sides could not.
+    - country_visa_types holds the sorted visa types of every country.
+    - country_visa_json holds every country's rows pre-serialized in the
+      response format, so /api/visa/country/:country is a single row fetch.
+
+    Both tables are rebuilt for the written countries by refresh_serving_tables
+    whenever the loaders write, and filled once from visa_info when they are
+    first created.
+
+    Args:
+        conn: Open connection to the visa database
+    """
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_visa_info_country_visa_type_nocase
+        ON visa_info (country COLLATE NOCASE, visa_type COLLATE NOCASE)
+    ''')
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'country_visa_json'"
+    ).fetchone()
+    if exists:
+        return
+
+    conn.execute('''
+        CREATE TABLE country_visa_types (
+            country TEXT PRIMARY KEY COLLATE NOCASE,
+            visa_types TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE country_visa_json (
+            country TEXT PRIMARY KEY COLLATE NOCASE,
+            data TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    refresh_serving_tables(conn)
+    logger.info("Created serving lookup tables")
+
+
+def refresh_serving_tables(conn: sqlite3.Connection, countries: Iterable[str] = None) -> None:
+    """
+    Rebuild the lookup rows of countries from visa_info.
+
+    Each table is rebuilt with one set-based statement, which groups and
+    serializes the rows inside SQLite, so a bulk load refreshes the lookups of
+    all its countries at once. Runs inside the caller's transaction.
+
+    Args:
+        conn: Open connection to the visa database
+        countries: Countries whose rows changed; all countries if None
+    """
+    scope, params = "", []
+    if countries is not None:
+        countries = sorted(set(countries))
+        if not countries:
+            return
+        scope = "WHERE country IN (SELECT value FROM json_each(?))"
+        params = [json.dumps(countries, ensure_ascii=False)]
+
+    # Countries without rows anymore are dropped
+    conn.execute(f"DELETE FROM country_visa_types {scope}", params)
+    conn.execute(f"DELETE FROM country_visa_json {scope}", params)
+
+    # The ordered subquery feeds the groups, so their arrays keep the visa type order
+    conn.execute(f'''
+        INSERT OR REPLACE INTO country_visa_types (country, visa_types)
+        SELECT country, json_group_array(visa_type) FROM (
+            SELECT country, visa_type FROM visa_info {scope}
+            ORDER BY country, visa_type COLLATE NOCASE
+        )
+        GROUP BY country
+    ''', params)
+    conn.execute(f'''
+        INSERT OR REPLACE INTO country_visa_json (country, data)
+        SELECT country, json_group_array(json(data)) FROM (
+            SELECT country, {SERVING_ROW_JSON} AS data FROM visa_info {scope}
+            ORDER BY country, visa_type COLLATE NOCASE
+        )
+        GROUP BY country
+    ''', params)
+
+
+def normalize_requirement(requirement: str) -> str:
+    """
+    Args:
+        requirement: A requirement as extracted
+
+    Returns:
+        str: The requirement with whitespace collapsed, as stored in requirement_text
+    """
+    return " ".join(str(requirement).split())
+
+
+def decode_requirements(requirements: str) -> List[str]:
+    """
+    Args:
+        requirements: The requirements column of visa_info
+
+    Returns:
+        List[str]: The requirements, or the raw text as the only one if it isn't a JSON list
+    """
+    try:
+        decoded = json.loads(requirements or "[]")
+    except json.JSONDecodeError:
+        return [requirements]
+    return decoded if isinstance(decoded, list) else [str(decoded)]
+
+
+def ensure_visa_requirement_tables(conn: sqlite3.Connection) -> None:
+    """
+    Create the normalized requirement tables.
+
+    requirement_text holds every distinct requirement once; visa_requirement links
+    each (country, visa_type) to its requirements in page order. The tables are
+    filled by load_visa_info, and once from visa_info when they are first created.
+
+    Args:
+        conn: Open connection to the visa database
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'visa_requirement'"
+    ).fetchone()
+    if exists:
+        return
+
+    conn.execute('''
+        CREATE TABLE requirement_text (
+            id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE visa_requirement (
+            country TEXT NOT NULL,
+            visa_type TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            requirement_id INTEGER NOT NULL REFERENCES requirement_text (id),
+            PRIMARY KEY (country, visa_type, position)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE INDEX idx_visa_requirement_requirement_id
+        ON visa_requirement (requirement_id, country, visa_type)
+    ''')
+    conn.execute('''
+        CREATE TRIGGER visa_requirement_delete AFTER DELETE ON visa_info BEGIN
+            DELETE FROM visa_requirement WHERE country = old.country AND visa_type = old.visa_type;
+        END
+    ''')
+
+    rows = conn.execute("SELECT country, visa_type, requirements FROM visa_info").fetchall()
+    write_visa_requirements(
+        conn, [(country, visa_type, decode_requirements(requirements)) for country, visa_type, requirements in rows]
+    )
+    logger.info(f"Created requirement tables from {len(rows)} visa records")
+
+
+def write_visa_requirements(conn: sqlite3.Connection, visas: List[Tuple[str, str, List[str]]]) -> None:
+    """
+    Replace the normalized requirements of visa records.
+
+    Runs inside the caller's transaction.
+
+    Args:
+        conn: Open connection to the visa database
+        visas: (country, visa_type, requirements) of every record to replace
+    """
+    conn.executemany(
+        "DELETE FROM visa_requirement WHERE country = ? AND visa_type = ?",
+        ((country, visa_type) for country, visa_type, _ in visas),
+    )
+
+    links = [
+        (country, visa_type, position, normalize_requirement(requirement))
+        for country, visa_type, requirements in visas
+        for position, requirement in enumerate(requirements)
+        if normalize_requirement(requirement)
+    ]
+    conn.executemany(
+        "INSERT OR IGNORE INTO requirement_text (text) VALUES (?)",
+        {(text,) for _, _, _, text in links},
+    )
+    conn.executemany('''
+        INSERT INTO visa_requirement (country, visa_type, position, requirement_id)
+        SELECT ?, ?, ?, id FROM requirement_text WHERE text = ?
+    ''', links)
+
+
+def prune_requirement_text(conn: sqlite3.Connection) -> None:
+    """
+    Drop requirement texts no visa type uses anymore.
+
+    Args:
+        conn: Open connection to the visa database
+    """
+    conn.execute('''
+        DELETE FROM requirement_text
+        WHERE id NOT IN (SELECT requirement_id FROM visa_requirement)
+    ''')
+
+
+def get_visa_requirements(country: str, visa_type: str, db_path: str = VISA_DB_PATH, conn: sqlite3.Connection = None) -> List[str]:
+    """
+    Args:
+        country: The country
+        visa_type: The visa type
+        db_path: Path to the SQLite database, used when no connection is given
+        conn: Optional open connection to reuse
+
+    Returns:
+        List[str]: The requirements of the visa type, in page order
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_visa_db(db_path, read_only=True)
+    try:
+        rows = conn.execute('''
+            SELECT requirement_text.text
+            FROM visa_requirement
+            JOIN requirement_text ON requirement_text.id = visa_requirement.requirement_id
+            WHERE visa_requirement.country = ? AND visa_requirement.visa_type = ?
+            ORDER BY visa_requirement.position
+        ''', (country, visa_type)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+    return [text for text, in rows]
+
+
+def find_visa_types_requiring(term: str, db_path: str = VISA_DB_PATH, conn: sqlite3.Connection = None) -> List[Tuple[str, str, str]]:
+    """
+    Find the visa types with a requirement mentioning a term, e.g. "blocked account".
+
+    Only the deduplicated requirement dictionary is scanned; the visa types are
+    then found through the requirement_id index.
+
+    Args:
+        term: Text the requirement must contain (case-insensitive)
+        db_path: Path to the SQLite database, used when no connection is given
+        conn: Optional open connection to reuse
+
+    Returns:
+        List[Tuple[str, str, str]]: (country, visa_type, requirement) ordered by country
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_visa_db(db_path, read_only=True)
+    try:
+        return conn.execute('''
+            SELECT visa_requirement.country, visa_requirement.visa_type, requirement_text.text
+            FROM requirement_text
+            JOIN visa_requirement ON visa_requirement.requirement_id = requirement_text.id
+            WHERE requirement_text.text LIKE ?
+            ORDER BY visa_requirement.country, visa_requirement.visa_type, visa_requirement.position
+        ''', (f"%{term}%",)).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def fts_query(term: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word as a prefix.
+
+    Args:
+        term: The user's search text
+
+    Returns:
+        str: The MATCH expression, or an empty string if the text has no words
+    """
+    words = re.findall(r"\w+", term)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_visa_info(term: str, limit: int = 20, db_path: str = VISA_DB_PATH, conn: sqlite3.Connection = None) -> List[dict]:
+    """
+    Search visa information with the full-text index, best matches first.
+
+    Args:
+        term: The search text
+        limit: Maximum number of results
+        db_path: Path to the SQLite database, used when no connection is given
+        conn: Optional open connection to reuse
+
+    Returns:
+        List[dict]: The matching visa_info rows, with requirements decoded
+    """
+    query = fts_query(term)
+    if not query:
+        return []
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_visa_db(db_path, read_only=True)
+
+    weights = ", ".join(str(weight) for weight in VISA_INFO_FTS_WEIGHTS)
+    try:
+        cursor = conn.execute(f'''
+            SELECT {", ".join(f"visa_info.{column}" for column in VISA_INFO_COLUMNS)}
+            FROM {VISA_INFO_FTS_TABLE}
+            JOIN visa_info ON visa_info.id = {VISA_INFO_FTS_TABLE}.rowid
+            WHERE {VISA_INFO_FTS_TABLE} MATCH ?
+            ORDER BY bm25({VISA_INFO_FTS_TABLE}, {weights})
+            LIMIT ?
+        ''', (query, limit))
+        results = [dict(zip(VISA_INFO_COLUMNS, row)) for row in cursor]
+    finally:
+        if own_conn:
+            conn.close()
+
+    for result in results:
+        try:
+            result["requirements"] = json.loads(result["requirements"] or "[]")
+        except json.JSONDecodeError:
+            result["requirements"] = [result["requirements"]]
+    return results
+
+
+def visa_info_row(visa: "VisaInfo") -> tuple:
+    """
+    Convert a VisaInfo into a visa_info row in VISA_INFO_COLUMNS order.
+
+    Args:
+        visa: The visa information
+
+    Returns:
+        tuple: The row values, with requirements stored as a JSON list
+    """
+    return (
+        visa.country,
+        visa.visa_type,
+        json.dumps(visa.requirements),
+        visa.processing_time,
+        visa.validity,
+        visa.fees,
+        visa.entry_type,
+        visa.allowed_stay,
+        visa.embassy_link,
+        visa.notes,
+    )
+
+
+def load_visa_info(visa_infos: Iterable["VisaInfo"], db_path: str = VISA_DB_PATH, conn: sqlite3.Connection = None) -> int:
+    """
+    Upsert visa information into the visa_info table in a single transaction.
+
+    Rows are matched on (country, visa_type); existing rows are updated in place,
+    so no existence check or per-row commit is needed. The normalized requirement
+    tables and the serving lookups of the loaded countries are rebuilt in the
+    same transaction, after migrate_visa_db has made sure the schema exists.
+
+    Args:
+        visa_infos: The visa information to store
+        db_path: Path to the SQLite database, used when no connection is given
+        conn: Optional open connection to reuse
+
+    Returns:
+        int: Number of rows written
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_visa_db(db_path)
+    migrate_visa_db(conn)
+
+    columns = ", ".join(VISA_INFO_COLUMNS)
+    placeholders = ", ".join("?" for _ in VISA_INFO_COLUMNS)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in VISA_INFO_COLUMNS[2:])
+    written = 0
+    countries = set()
+
+    try:
+        with conn:
+            # Work in batches so large loads never sit in memory as a whole
+            visa_infos = iter(visa_infos)
+            while batch := list(islice(visa_infos, LOAD_BATCH_SIZE)):
+                conn.executemany(f'''
+                    INSERT INTO visa_info ({columns}) VALUES ({placeholders})
+                    ON CONFLICT(country, visa_type) DO UPDATE SET {updates}
+                ''', (visa_info_row(visa) for visa in batch))
+                write_visa_requirements(conn, [(visa.country, visa.visa_type, visa.requirements) for visa in batch])
+                countries.update(visa.country for visa in batch)
+                written += len(batch)
+
+            prune_requirement_text(conn)
+            refresh_serving_tables(conn, countries)
+        logger.info(f"Upserted {written} visa records")
+    except sqlite3.Error as e:
+        logger.error(f"Failed to load visa records: {e}")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    return written
+
+
+def read_visa_info(countries: Iterable[str] = None, db_path: str = VISA_DB_PATH, conn: sqlite3.Connection = None) -> List[dict]:
+    """
+    Read stored visa information.
+
+    Args:
+        countries: Only read these countries; all countries if None
+        db_path: Path to the SQLite database, used when no connection is given
+        conn: Optional open connection to reuse
+
+    Returns:
+        List[dict]: The visa_info rows, with requirements decoded
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_visa_db(db_path, read_only=True)
+
+    query = f"SELECT {', '.join(VISA_INFO_COLUMNS)} FROM visa_info"
+    params = []
+    if countries is not None:
+        params = list(countries)
+        query += f" WHERE country IN ({', '.join('?' for _ in params)})"
+    try:
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    entries = [dict(zip(VISA_INFO_COLUMNS, row)) for row in rows]
+    for entry in entries:
+        entry["requirements"] = decode_requirements(entry["requirements"])
+    return entries
+
+
+def apply_visa_info_changeset(changeset: dict, db_path: str = VISA_DB_PATH, conn: sqlite3.Connection = None) -> int:
+    """
+    Apply a changeset from utils.changeset.diff_visa_info to the visa_info table.
+
+    Only the changed rows and columns are written, in a single transaction, so
+    the search index, requirement tables and serving lookups are only updated
+    where data changed. Added rows are upserted on (country, visa_type), so a
+    database that already holds them takes the crawled values. Modified rows
+    missing from the database (e.g. one built from an older JSON file) are
+    inserted with the fields the changeset holds, so their requirement links
+    always have a row; a warning suggests reloading the full dataset. The schema
+    is migrated first (see migrate_visa_db).
+
+    Args:
+        changeset: The added, removed and modified entries
+        db_path: Path to the SQLite database, used when no connection is given
+        conn: Optional open connection to reuse
+
+    Returns:
+        int: Number of rows written or deleted
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect_visa_db(db_path)
+    migrate_visa_db(conn)
+
+    columns = ", ".join(VISA_INFO_COLUMNS)
+    placeholders = ", ".join("?" for _ in VISA_INFO_COLUMNS)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in VISA_INFO_COLUMNS[2:])
+
+    def column_value(column: str, value):
+        return json.dumps(value) if column == "requirements" else value
+
+    try:
+        with conn:
+            conn.executemany(
+                "DELETE FROM visa_info WHERE country = ? AND visa_type = ?",
+                ((entry["country"], entry["visa_type"]) for entry in changeset["removed"]),
+            )
+            conn.executemany(
+                f"INSERT INTO visa_info ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(country, visa_type) DO UPDATE SET {updates}",
+                (tuple(column_value(column, entry.get(column)) for column in VISA_INFO_COLUMNS) for entry in changeset["added"]),
+            )
+            missing = 0
+            for change in changeset["modified"]:
+                fields = [field for field in change["fields"] if field in VISA_INFO_COLUMNS]
+                values = [column_value(field, change["fields"][field]) for field in fields]
+                cursor = conn.execute(
+                    f"UPDATE visa_info SET {', '.join(f'{field} = ?' for field in fields)} WHERE country = ? AND visa_type = ?",
+                    values + [change["country"], change["visa_type"]],
+                )
+                if cursor.rowcount == 0:
+                    missing += 1
+                    conn.execute(
+                        f"INSERT INTO visa_info (country, visa_type{''.join(f', {field}' for field in fields)}) "
+                        f"VALUES ({', '.join('?' for _ in range(len(fields) + 2))})",
+                        [change["country"], change["visa_type"]] + values,
+                    )
+
+            requirement_changes = [
+                (entry["country"], entry["visa_type"], entry["requirements"]) for entry in changeset["added"]
+            ] + [
+                (change["country"], change["visa_type"], change["fields"]["requirements"])
+                for change in changeset["modified"]
+                if "requirements" in change["fields"]
+            ]
+            write_visa_requirements(conn, requirement_changes)
+            if changeset["removed"] or requirement_changes:
+                prune_requirement_text(conn)
+            refresh_serving_tables(conn, {country for country, _ in changed_keys(changeset)})
+        written = len(changeset["added"]) + len(changeset["removed"]) + len(changeset["modified"])
+        logger.info(f"Applied changeset to {written} visa records")
+        if missing:
+            logger.warning(
+                f"{missing} modified visa records were missing from the database and were inserted "
+                "with their changed fields only; reload the JSON output to fill them in"
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Failed to apply visa changeset: {e}")
+        raise
+    finally:
+        if own_conn:
+            conn.close()
+
+    return written
@@ -0,0 +1,357 @@
+import re
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+# Canonical visa categories, checked in order so specific ones win over generic ones
+# (e.g. "Job Seeker" before "Work"); patterns cover English and common German names
+CANONICAL_VISA_TYPES = [
+    ("Job Seeker", re.compile(r"job[- ]?seek|opportunity card|chancenkarte|arbeitsplatzsuche", re.IGNORECASE)),
+    ("Working Holiday", re.compile(r"working holiday", re.IGNORECASE)),
+    ("Au Pair", re.compile(r"au[- ]pair", re.IGNORECASE)),
+    ("Research", re.compile(r"research|scientist|forsch", re.IGNORECASE)),
+    ("Training", re.compile(r"training|apprentice|ausbildung|internship|trainee|praktikum", re.IGNORECASE)),
+    ("Language Course", re.compile(r"language course|sprachkurs", re.IGNORECASE)),
+    ("Student", re.compile(r"stud(?:y|ent|ies|ium|ien)|universit", re.IGNORECASE)),
+    ("Business", re.compile(r"business|geschäft", re.IGNORECASE)),
+    ("Work", re.compile(r"work|employ|\bjob\b|arbeit|erwerb|blue card|blaue karte|skilled", re.IGNORECASE)),
+    ("Family", re.compile(r"family|famili|spouse|reunification|marriage|ehegatt|partner", re.IGNORECASE)),
+    ("Transit", re.compile(r"transit", re.IGNORECASE)),
+    ("Medical", re.compile(r"medical|treatment|behandlung", re.IGNORECASE)),
+    ("Tourist", re.compile(r"touris|visit|besuch|schengen|short[- ]stay", re.IGNORECASE)),
+]
+# Words that say nothing about the visa category, e.g. in "National D Student Visa"
+VISA_TYPE_NOISE = re.compile(r"\(.*?\)|\b(?:visas?|visum|national|type|[cd]|long[- ]stay|permit)\b", re.IGNORECASE)
+
+SHINGLE_SIZE = 3
+# Rows per LSH band; bands of a signature sharing all rows make two entries candidates
+LSH_ROWS = 4
+EMPTY_BIN = 0xFFFFFFFF
+
+
+def canonical_visa_type(visa_type: str) -> str:
+    """
+    Args:
+        visa_type: The visa type as extracted, e.g. "Student Visa (Visum zu Studienzwecken)"
+
+    Returns:
+        str: Its canonical category, e.g. "Student", or the lowercased name without noise words
+    """
+    for category, pattern in CANONICAL_VISA_TYPES:
+        if pattern.search(visa_type):
+            return category
+    return " ".join(VISA_TYPE_NOISE.sub(" ", visa_type).lower().split()) or " ".join(visa_type.lower().split())
+
+
+def shingle_hashes(entry: dict) -> List[int]:
+    """
+    Args:
+        entry: A visa information entry
+
+    Returns:
+        List[int]: 32-bit hashes of the word shingles of its requirements and notes
+    """
+    requirements = entry.get("requirements") or []
+    text = " ".join(requirements if isinstance(requirements, list) else [str(requirements)])
+    words = re.findall(r"\w+", f"{text} {entry.get('notes') or ''}".lower())
+    if len(words) < SHINGLE_SIZE:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))] if words else []
+    return [
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    ]
+
+
+def minhash_signature(hashes: List[int], num_bins: int) -> Optional[array]:
+    """
+    One-permutation MinHash: the hash space is split into bins and every bin keeps
+    its smallest value, so a signature costs one pass over the shingles instead of
+    one per hash function. Empty bins borrow the value of the next non-empty bin.
+
+    Args:
+        hashes: Shingle hashes of an entry
+        num_bins: Signature length
+
+    Returns:
+        Optional[array]: The signature, or None if the entry has no text
+    """
+    if not hashes:
+        return None
+    signature = array("I", [EMPTY_BIN] * num_bins)
+    for value in hashes:
+        index, rest = value % num_bins, value // num_bins
+        if rest < signature[index]:
+            signature[index] = rest
+    empty = [value == EMPTY_BIN for value in signature]
+    # Walk backwards so every empty bin knows the next filled one, wrapping around
+    source = empty.index(False) + num_bins
+    for index in range(num_bins - 1, -1, -1):
+        if not empty[index]:
+            source = index
+        else:
+            signature[index] = signature[source % num_bins] + (source - index) % num_bins * 0x01000193
+    return signature
+
+
+def signature_similarity(first: Optional[array], second: Optional[array]) -> float:
+    """
+    Args:
+        first: MinHash signature of an entry
+        second: MinHash signature of another entry
+
+    Returns:
+        float: Estimated Jaccard similarity of their shingles; 1.0 if neither has text
+    """
+    if first is None or second is None:
+        return 1.0 if first is second else 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def kept_order(entry: dict) -> Tuple[int, str]:
+    """
+    Args:
+        entry: A visa information entry
+
+    Returns:
+        Tuple[int, str]: Sort key of a group of near-duplicates; the first entry gives
+            the group its visa type, so the shortest name wins, then the lexically smallest
+    """
+    return len(entry["visa_type"]), entry["visa_type"]
+
+
+def merge_visa_info(kept: dict, duplicate: dict) -> dict:
+    """
+    Merge a near-duplicate into the entry that is kept.
+
+    The result does not depend on which of two entries' other fields arrived
+    first: empty fields are filled, conflicting values keep the longer one
+    (then the lexically smaller), and requirements are the union in order.
+
+    Args:
+        kept: The entry that stays, and keeps its country and visa type
+        duplicate: The near-duplicate merged into it
+
+    Returns:
+        dict: The merged entry
+    """
+    merged = dict(kept)
+    for field, value in duplicate.items():
+        if field in ("country", "visa_type", "requirements"):
+            continue
+        current = merged.get(field)
+        if not current or (value and (len(str(value)), str(current)) > (len(str(current)), str(value))):
+            merged[field] = value
+
+    def normalized(requirement: str) -> str:
+        return " ".join(requirement.lower().split())
+
+    requirements = list(kept.get("requirements") or [])
+    known = {normalized(requirement) for requirement in requirements}
+    for requirement in duplicate.get("requirements") or []:
+        if normalized(requirement) not in known:
+            known.add(normalized(requirement))
+            requirements.append(requirement)
+    merged["requirements"] = requirements
+    return merged
+
+
+class CountryPartition:
+    """
+    Dedup state of one country: kept entries, the near-duplicates merged into each,
+    compact signatures and LSH buckets. A retracted entry leaves None in its slot.
+    """
+
+    def __init__(self):
+        self.entries: List[Optional[dict]] = []
+        self.members: List[List[dict]] = []
+        self.positions: Dict[str, int] = {}
+        self.signatures: List[Optional[array]] = []
+        self.by_category: Dict[str, List[int]] = {}
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+
+class VisaDedupIndex:
+    """
+    Finds near-duplicate visa entries across pages and runs of a crawl.
+
+    Entries are blocked by country. Within a country, an entry is a duplicate of a
+    stored one if both fall into the same canonical visa category (canonical_visa_type)
+    and their requirements and notes are at least `similarity` alike, or if their
+    texts are at least `cross_type_similarity` alike whatever their names. Similarity
+    is estimated from MinHash signatures, and LSH buckets of signature bands find
+    the cross-category candidates, so a lookup compares against a handful of
+    entries rather than all of them.
+
+    The kept entries are held with their signatures (`num_bins` 32-bit values per
+    entry) and the entries merged into them, so near-duplicates found on later
+    pages can be merged into them, and at most `max_countries` countries are held,
+    least recently used first out. An evicted country still falls back to the
+    exact (country, visa_type) check.
+
+    A merge does not depend on the order in which pages finish: the members of a
+    group are merged in kept_order, so the group keeps the visa type of its
+    shortest-named member and lists requirements in that member order. When a
+    later member takes over the visa type, the previous one is added to
+    `retracted`, and outputs drop the records already written under it.
+    """
+
+    def __init__(
+        self,
+        similarity: float = 0.5,
+        cross_type_similarity: float = 0.9,
+        num_bins: int = 64,
+        max_countries: int = 100,
+    ):
+        self.similarity = similarity
+        self.cross_type_similarity = cross_type_similarity
+        self.num_bins = num_bins
+        self.max_countries = max_countries
+        self.partitions: "OrderedDict[str, CountryPartition]" = OrderedDict()
+        self.retracted: Set[Tuple[str, str]] = set()
+        self.duplicates = 0
+        self.superseded = 0
+        self.evicted = 0
+
+    def _partition(self, country: str) -> CountryPartition:
+        partition = self.partitions.get(country)
+        if partition is None:
+            partition = self.partitions[country] = CountryPartition()
+            if len(self.partitions) > self.max_countries:
+                self.partitions.popitem(last=False)
+                self.evicted += 1
+        self.partitions.move_to_end(country)
+        return partition
+
+    def _bands(self, signature: Optional[array]) -> List[Tuple[int, bytes]]:
+        if signature is None:
+            return []
+        return [
+            (band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes())
+            for band in range(self.num_bins // LSH_ROWS)
+        ]
+
+    def signature(self, entry: dict) -> Optional[array]:
+        """
+        Args:
+            entry: A visa information entry
+
+        Returns:
+            Optional[array]: The MinHash signature of its requirements and notes
+        """
+        return minhash_signature(shingle_hashes(entry), self.num_bins)
+
+    def find(self, entry: dict, signature: Optional[array] = None) -> Optional[dict]:
+        """
+        Args:
+            entry: A visa information entry
+            signature: Its signature, if already computed
+
+        Returns:
+            Optional[dict]: The stored entry it duplicates, if any
+        """
+        partition = self.partitions.get(entry["country"])
+        if partition is None:
+            return None
+
+        category = canonical_visa_type(entry["visa_type"])
+        signature = signature if signature is not None else self.signature(entry)
+        for index in partition.by_category.get(category, []):
+            if partition.entries[index] is None:
+                continue
+            if signature_similarity(signature, partition.signatures[index]) >= self.similarity:
+                return partition.entries[index]
+
+        candidates = {index for band in self._bands(signature) for index in partition.buckets.get(band, [])}
+        for index in sorted(candidates):
+            if partition.entries[index] is None:
+                continue
+            if signature_similarity(signature, partition.signatures[index]) >= self.cross_type_similarity:
+                return partition.entries[index]
+        return None
+
+    def add(self, entry: dict, signature: Optional[array] = None) -> None:
+        """
+        Store an entry so later near-duplicates of it are found.
+
+        An entry whose visa type is already stored, e.g. a merged record read back
+        from the crawl journal, replaces the stored entry.
+
+        Args:
+            entry: A visa information entry
+            signature: Its signature, if already computed
+        """
+        partition = self._partition(entry["country"])
+        if entry["visa_type"] in partition.positions:
+            index = partition.positions[entry["visa_type"]]
+            partition.entries[index] = entry
+            partition.members[index] = [entry]
+            return
+
+        # A visa type found again after it was retracted is live again
+        self.retracted.discard((entry["country"], entry["visa_type"]))
+        index = len(partition.entries)
+        signature = signature if signature is not None else self.signature(entry)
+        partition.entries.append(entry)
+        partition.members.append([entry])
+        partition.positions[entry["visa_type"]] = index
+        partition.signatures.append(signature)
+        partition.by_category.setdefault(canonical_visa_type(entry["visa_type"]), []).append(index)
+        for band in self._bands(signature):
+            partition.buckets.setdefault(band, []).append(index)
+
+    def merge(self, kept: dict, duplicate: dict) -> dict:
+        """
+        Merge a near-duplicate into a stored entry, which is replaced by the result.
+
+        All members of the group are merged again in kept_order, so the result is the
+        same whichever of them arrived first.
+
+        Args:
+            kept: The stored entry returned by find
+            duplicate: The near-duplicate merged into it
+
+        Returns:
+            dict: The merged entry, under the visa type of the first member in kept_order;
+                if that is not the visa type of `kept`, `kept`'s is retracted
+        """
+        partition = self._partition(kept["country"])
+        index = partition.positions[kept["visa_type"]]
+        partition.members[index].append(duplicate)
+
+        members = sorted(partition.members[index], key=kept_order)
+        merged = members[0]
+        for member in members[1:]:
+            merged = merge_visa_info(merged, member)
+
+        if merged["visa_type"] != kept["visa_type"]:
+            del partition.positions[kept["visa_type"]]
+            partition.positions[merged["visa_type"]] = index
+            self.retracted.add((kept["country"], kept["visa_type"]))
+        partition.entries[index] = merged
+        return merged
+
+    def retract(self, country: str, visa_type: str) -> None:
+        """
+        Drop a stored entry whose visa type was taken over by a merged group, e.g. when
+        the state is rebuilt from the crawl journal.
+
+        Args:
+            country: The country of the entry
+            visa_type: Its visa type
+        """
+        self.retracted.add((country, visa_type))
+        partition = self.partitions.get(country)
+        if partition is not None and visa_type in partition.positions:
+            index = partition.positions.pop(visa_type)
+            partition.entries[index] = None
+            partition.members[index] = []
+
+    def show_usage(self) -> None:
+        """Print how many near-duplicates were merged."""
+        print("\n=== Deduplication ===")
+        print(f"{'Countries':<15} {len(self.partitions):>12,}")
+        print(f"{'Duplicates':<15} {self.duplicates:>12,}")
+        print(f"{'Superseded':<15} {self.superseded:>12,}")
+        print(f"{'Retracted':<15} {len(self.retracted):>12,}")
+        print(f"{'Evicted':<15} {self.evicted:>12,}")
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import re
+from typing import List, Optional
+
+from utils.instrumentation import UsageLog
+
+
+def hash_markdown(markdown: str) -> str:
+    """
+    Hash page markdown after normalizing whitespace, so re-rendering noise
+    (trailing spaces, blank lines) does not count as a content change.
+
+    Args:
+        markdown: The page markdown within the CSS selector
+
+    Returns:
+        str: Hex SHA-256 digest of the cleaned markdown
+    """
+    cleaned = "\n".join(line.strip() for line in markdown.splitlines() if line.strip())
+    cleaned = re.sub(r"[ \t]+", " ", cleaned)
+    return hashlib.sha256(cleaned.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Persistent on-disk cache of LLM extraction results.
+
+    Entries are keyed by URL plus a hash of the cleaned page markdown, so an
+    unchanged page reuses its previously extracted VisaInfo JSON without an LLM
+    call. The least recently used entries are evicted once the cache grows past
+    `max_bytes`.
+
+    Hits and misses are reported to the usage log of the LLM strategy, so they
+    show up next to the token usage they save (see instrumentation.show_llm_usage).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int, usage_log: UsageLog = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.usage_log = usage_log
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.sizes = {
+            entry.path: entry.stat().st_size
+            for entry in os.scandir(cache_dir)
+            if entry.is_file() and entry.name.endswith(".json")
+        }
+
+    def _path(self, url: str, markdown: str) -> str:
+        key = hashlib.sha256(f"{url}\n{hash_markdown(markdown)}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str, markdown: str) -> Optional[List[dict]]:
+        """
+        Look up the extraction result for a page.
+
+        Args:
+            url: The URL the markdown was fetched from
+            markdown: The page markdown within the CSS selector
+
+        Returns:
+            Optional[List[dict]]: The cached entries, or None on a miss
+        """
+        path = self._path(url, markdown)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            self._record_lookup(False)
+            return None
+
+        # Refresh the modification time so eviction drops the least recently used entries
+        os.utime(path)
+        self._record_lookup(True)
+        return entries
+
+    def _record_lookup(self, hit: bool) -> None:
+        if self.usage_log is not None:
+            self.usage_log.record_cache_lookup(hit)
+
+    def put(self, url: str, markdown: str, entries: List[dict]) -> None:
+        """
+        Store the extraction result for a page and evict old entries if needed.
+
+        Args:
+            url: The URL the markdown was fetched from
+            markdown: The page markdown within the CSS selector
+            entries: The entries extracted by the LLM
+        """
+        path = self._path(url, markdown)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entries, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self.sizes[path] = os.path.getsize(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        total = sum(self.sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        by_age = sorted(self.sizes, key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self.sizes.pop(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.evictions += 1
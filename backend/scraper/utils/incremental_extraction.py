@@ -0,0 +1,145 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+\S", re.MULTILINE)
+
+
+def split_markdown_sections(markdown: str) -> List[str]:
+    """
+    Split page markdown into stable sections at headings.
+
+    The page is split at the shallowest heading level that occurs more than once,
+    which on multi-visa pages is usually one section per visa type. Text before the
+    first heading becomes its own section.
+
+    Args:
+        markdown: The page markdown within the CSS selector
+
+    Returns:
+        List[str]: The non-empty sections in page order
+    """
+    levels = [len(match.group(1)) for match in HEADING_PATTERN.finditer(markdown)]
+    split_levels = sorted(level for level in set(levels) if levels.count(level) > 1)
+    if not split_levels:
+        return [markdown] if markdown.strip() else []
+
+    split_pattern = re.compile(rf"^#{{{split_levels[0]}}}\s+\S", re.MULTILINE)
+    starts = [0] + [match.start() for match in split_pattern.finditer(markdown)]
+    ends = starts[1:] + [len(markdown)]
+
+    return [markdown[start:end] for start, end in zip(starts, ends) if markdown[start:end].strip()]
+
+
+def merge_section_entries(section_entries: List[List[dict]], previous_records: List[dict]) -> List[dict]:
+    """
+    Merge the entries extracted from each section into one record per visa type.
+
+    Non-empty fields of later sections override earlier ones and requirement lists
+    are combined. Fields a re-extracted section did not mention are filled in from
+    the previous run's record for the same visa type.
+
+    Args:
+        section_entries: Entries extracted per section, in page order
+        previous_records: The merged records of the previous run for the same URL
+
+    Returns:
+        List[dict]: One record per visa type, in order of first appearance
+    """
+    def visa_type_key(entry: dict) -> str:
+        return str(entry.get("visa_type") or "").strip().lower()
+
+    records: Dict[str, dict] = {}
+    for entries in section_entries:
+        for entry in entries:
+            record = records.setdefault(visa_type_key(entry), {})
+            for key, value in entry.items():
+                if not value:
+                    record.setdefault(key, value)
+                elif key == "requirements" and isinstance(record.get(key), list) and isinstance(value, list):
+                    record[key] = record[key] + [req for req in value if req not in record[key]]
+                else:
+                    record[key] = value
+
+    previous = {visa_type_key(record): record for record in previous_records}
+    for key, record in records.items():
+        for field, value in previous.get(key, {}).items():
+            if value and not record.get(field):
+                record[field] = value
+
+    return list(records.values())
+
+
+class SectionStore:
+    """
+    Persists the entries extracted from every markdown section of a URL, keyed by
+    section hash, so only changed sections are sent to the LLM on the next run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reused_sections = 0
+        self.extracted_sections = 0
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                self.pages = json.load(file)
+        except (OSError, json.JSONDecodeError):
+            self.pages = {}
+
+    def section_entries(self, url: str, section_hash: str) -> Optional[List[dict]]:
+        """
+        Args:
+            url: The source URL
+            section_hash: Hash of the section markdown
+
+        Returns:
+            Optional[List[dict]]: Entries extracted from an identical section last run, or None
+        """
+        page = self.pages.get(url)
+        if page and section_hash in page["sections"]:
+            return [dict(entry) for entry in page["sections"][section_hash]]
+        return None
+
+    def previous_records(self, url: str) -> List[dict]:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            List[dict]: The merged records stored for the URL last run
+        """
+        page = self.pages.get(url)
+        return [dict(record) for record in page["records"]] if page else []
+
+    def update(self, url: str, sections: Dict[str, List[dict]], records: List[dict]) -> None:
+        """
+        Replace the stored sections and merged records of a URL.
+
+        Args:
+            url: The source URL
+            sections: Entries per section hash for the sections currently on the page
+            records: The merged records for the page
+        """
+        self.pages[url] = {
+            "sections": sections,
+            "records": [dict(record) for record in records],
+        }
+        self.save()
+
+    def save(self) -> None:
+        """Write the stored sections to disk."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.pages, file, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def show_usage(self) -> None:
+        """Print how many sections were reused instead of re-extracted."""
+        print("\n=== Incremental Extraction ===")
+        print(f"{'Reused':<15} {self.reused_sections:>12,}")
+        print(f"{'Re-extracted':<15} {self.extracted_sections:>12,}")
+
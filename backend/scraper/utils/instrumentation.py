@@ -0,0 +1,262 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from crawl4ai import LLMExtractionStrategy
+
+# Country whose work is currently running; copied into worker threads by asyncio.to_thread
+current_country: contextvars.ContextVar[str] = contextvars.ContextVar("current_country", default="unknown")
+
+COUNTERS = [
+    "markdown_bytes",
+    "tokens_saved",
+    "prompt_tokens",
+    "completion_tokens",
+    "llm_calls",
+    "cache_hits",
+    "cache_misses",
+    "entries",
+]
+
+
+class UsageLog(list):
+    """
+    List of LLM token usages that also reports every appended usage to a callback.
+
+    LLMExtractionStrategy appends one usage per LLM request to `self.usages`, so
+    replacing that list is the least intrusive way to attribute tokens. Lookups in
+    the extraction cache, which decide whether a request is made at all, are
+    counted here as well.
+    """
+
+    def __init__(self, usages, on_append, on_cache_lookup=None):
+        super().__init__(usages)
+        self.on_append = on_append
+        self.on_cache_lookup = on_cache_lookup
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def append(self, usage) -> None:
+        super().append(usage)
+        self.on_append(usage)
+
+    def record_cache_lookup(self, hit: bool) -> None:
+        """
+        Count an extraction cache lookup.
+
+        Args:
+            hit: True if the cached entries were used instead of an LLM request
+        """
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        if self.on_cache_lookup:
+            self.on_cache_lookup(hit)
+
+
+class PipelineMetrics:
+    """
+    Collects wall time per pipeline stage together with markdown size, LLM token
+    usage and entry counts, per country, and writes them as a JSON run report or
+    in Prometheus text format.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.countries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def _country(self, country: str) -> dict:
+        if country not in self.countries:
+            self.countries[country] = {"stages": {}, **{counter: 0 for counter in COUNTERS}}
+        return self.countries[country]
+
+    def record_stage(self, country: str, stage: str, seconds: float) -> None:
+        """
+        Add wall time to a stage of a country.
+
+        Args:
+            country: The country the work belongs to
+            stage: The pipeline stage (e.g. fetch, extract, process, write)
+            seconds: Elapsed wall time
+        """
+        with self._lock:
+            stages = self._country(country)["stages"]
+            stats = stages.setdefault(stage, {"seconds": 0.0, "calls": 0})
+            stats["seconds"] += seconds
+            stats["calls"] += 1
+
+    def add(self, country: str, **counters: int) -> None:
+        """
+        Increase counters (see COUNTERS) of a country.
+
+        Args:
+            country: The country the counters belong to
+            **counters: Counter names and the amounts to add
+        """
+        with self._lock:
+            stats = self._country(country)
+            for counter, amount in counters.items():
+                stats[counter] += amount
+
+    @contextmanager
+    def stage(self, country: str, stage: str):
+        """
+        Time a block of work as one stage of a country.
+
+        LLM usage recorded inside the block is attributed to the country.
+
+        Args:
+            country: The country the work belongs to
+            stage: The pipeline stage
+        """
+        token = current_country.set(country)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(country, stage, time.perf_counter() - started)
+            current_country.reset(token)
+
+    def track_llm_usage(self, llm_strategy: "LLMExtractionStrategy") -> UsageLog:
+        """
+        Attribute the token usage of every LLM request, and every extraction cache
+        lookup reported to the returned log, to the current country.
+
+        Args:
+            llm_strategy: The LLM extraction strategy to track
+
+        Returns:
+            UsageLog: The usage log installed on the strategy
+        """
+        def record_usage(usage):
+            self.add(
+                current_country.get(),
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                llm_calls=1,
+            )
+
+        def record_cache_lookup(hit):
+            self.add(current_country.get(), **{"cache_hits" if hit else "cache_misses": 1})
+
+        llm_strategy.usages = UsageLog(llm_strategy.usages, record_usage, record_cache_lookup)
+        return llm_strategy.usages
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict: The run report with per-country and total statistics
+        """
+        totals = {"stages": {}, **{counter: 0 for counter in COUNTERS}}
+        with self._lock:
+            for stats in self.countries.values():
+                for counter in COUNTERS:
+                    totals[counter] += stats[counter]
+                for stage, stage_stats in stats["stages"].items():
+                    total_stage = totals["stages"].setdefault(stage, {"seconds": 0.0, "calls": 0})
+                    total_stage["seconds"] += stage_stats["seconds"]
+                    total_stage["calls"] += stage_stats["calls"]
+
+            return {
+                "started_at": self.started_at.isoformat(),
+                "elapsed_seconds": time.perf_counter() - self.started,
+                "totals": totals,
+                "countries": json.loads(json.dumps(self.countries)),
+            }
+
+    def write_report(self, report_dir: str) -> str:
+        """
+        Write the run report as a timestamped JSON file so runs can be compared.
+
+        Args:
+            report_dir: Directory for run reports
+
+        Returns:
+            str: Path of the written report
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        filename = os.path.join(report_dir, f"run_{self.started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2, ensure_ascii=False)
+        print(f"Saved run report to '{filename}'.")
+        return filename
+
+    def write_prometheus(self, filename: str) -> None:
+        """
+        Write the per-country metrics in Prometheus text exposition format,
+        e.g. for the node_exporter textfile collector.
+
+        Args:
+            filename: Name of the metrics file to write
+        """
+        report = self.report()
+        lines = [
+            "# HELP visa_crawl_stage_seconds Wall time spent per crawl stage.",
+            "# TYPE visa_crawl_stage_seconds gauge",
+        ]
+        for country, stats in report["countries"].items():
+            for stage, stage_stats in stats["stages"].items():
+                lines.append(f'visa_crawl_stage_seconds{{country="{country}",stage="{stage}"}} {stage_stats["seconds"]:.6f}')
+        for counter in COUNTERS:
+            lines.append(f"# HELP visa_crawl_{counter} Crawl {counter.replace('_', ' ')} per country.")
+            lines.append(f"# TYPE visa_crawl_{counter} gauge")
+            for country, stats in report["countries"].items():
+                lines.append(f'visa_crawl_{counter}{{country="{country}"}} {stats[counter]}')
+        lines.append("# HELP visa_crawl_elapsed_seconds Wall time of the whole crawl.")
+        lines.append("# TYPE visa_crawl_elapsed_seconds gauge")
+        lines.append(f"visa_crawl_elapsed_seconds {report['elapsed_seconds']:.6f}")
+
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(tmp_filename, filename)
+        print(f"Saved Prometheus metrics to '{filename}'.")
+
+
+@contextmanager
+def timed_stage(metrics: Optional[PipelineMetrics], country: str, stage: str):
+    """
+    Time a stage when metrics are being collected. The country is always made
+    current, so code inside the stage (e.g. LLM dispatch) knows whose work it runs.
+
+    Args:
+        metrics: Optional metrics collector
+        country: The country the work belongs to
+        stage: The pipeline stage
+    """
+    if metrics:
+        with metrics.stage(country, stage):
+            yield
+        return
+
+    token = current_country.set(country)
+    try:
+        yield
+    finally:
+        current_country.reset(token)
+
+
+def show_llm_usage(llm_strategy: "LLMExtractionStrategy") -> None:
+    """
+    Print the token usage of the LLM strategy, followed by the extraction cache
+    lookups in its usage log, i.e. how many requests the cache answered.
+
+    Args:
+        llm_strategy: The LLM extraction strategy
+    """
+    llm_strategy.show_usage()
+    usages = llm_strategy.usages
+    if isinstance(usages, UsageLog):
+        print("\n=== Extraction Cache ===")
+        print(f"{'Hits':<15} {usages.cache_hits:>12,}")
+        print(f"{'Misses':<15} {usages.cache_misses:>12,}")
@@ -0,0 +1,348 @@
+import asyncio
+import json
+import random
+import time
+from typing import List, Optional, Set
+
+from crawl4ai import LLMExtractionStrategy
+from crawl4ai.models import TokenUsage
+from crawl4ai.prompts import (
+    PROMPT_EXTRACT_BLOCKS,
+    PROMPT_EXTRACT_BLOCKS_WITH_INSTRUCTION,
+    PROMPT_EXTRACT_SCHEMA_WITH_INSTRUCTION,
+)
+from crawl4ai.utils import (
+    escape_json_string,
+    extract_xml_data,
+    sanitize_html,
+    sanitize_input_encode,
+    split_and_parse_json_objects,
+)
+
+from utils.instrumentation import current_country
+from utils.markdown_pruning import estimate_tokens
+
+# Field the LLM sets on every entry of a packed request to the id of its source document
+SOURCE_DOCUMENT_FIELD = "source_document"
+PACKED_INSTRUCTION = (
+    "The content below holds several source documents, each starting with a "
+    '"# Source document <id>" header. Extract the entries of every document and set '
+    f'the "{SOURCE_DOCUMENT_FIELD}" field of every entry to the id of the document it '
+    "was extracted from."
+)
+
+
+def error_block(message: str) -> dict:
+    """
+    Args:
+        message: Why the extraction failed
+
+    Returns:
+        dict: An error block in the format LLMExtractionStrategy uses
+    """
+    return {"index": 0, "error": True, "tags": ["error"], "content": message}
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Args:
+        error: Exception raised by the provider call
+
+    Returns:
+        bool: True for HTTP 429 / litellm RateLimitError
+    """
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Args:
+        error: A rate limit error
+
+    Returns:
+        Optional[float]: The delay requested by the provider's Retry-After header, if any
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def packed_schema(schema: dict) -> dict:
+    """
+    Args:
+        schema: JSON schema of an extracted entry
+
+    Returns:
+        dict: The schema with the required source document id added
+    """
+    return {
+        **schema,
+        "properties": {
+            **schema.get("properties", {}),
+            SOURCE_DOCUMENT_FIELD: {"type": "string", "description": "Id of the source document, e.g. D1"},
+        },
+        "required": [*schema.get("required", []), SOURCE_DOCUMENT_FIELD],
+    }
+
+
+def country_matches(block: dict, country: str) -> bool:
+    """
+    Args:
+        block: An entry extracted from a packed request
+        country: The country of the chunk its source document id points to
+
+    Returns:
+        bool: False if the entry names a different country
+    """
+    named = str(block.get("country") or "").replace("-", " ").strip().lower()
+    return not named or named == country.replace("-", " ").strip().lower()
+
+
+class PendingChunk:
+    """A small chunk waiting to be packed into a shared LLM request."""
+
+    def __init__(self, country: str, url: str, text: str, future: asyncio.Future):
+        self.country = country
+        self.url = url
+        self.text = text
+        self.future = future
+        self.tokens = estimate_tokens(text)
+
+
+class LLMDispatcher:
+    """
+    Async dispatch layer between the pipeline and the LLM provider.
+
+    - At most `max_in_flight` requests run at once.
+    - Rate limit errors (HTTP 429) are retried with exponential backoff and full
+      jitter, honouring Retry-After. The backoff pauses all requests, so the
+      dispatcher slows down as a whole instead of every request hitting the limit.
+    - Chunks smaller than half of `pack_tokens` are held for up to `pack_wait`
+      seconds and packed with other chunks into one request. Every chunk is sent
+      under a document id, and the LLM tags each entry with it, which routes the
+      entries back to their chunks. A chunk is extracted again on its own when
+      it got no entries, when an entry tagged with it names another country, or
+      when the response has entries that carry no known id.
+
+    With an LLMExtractionStrategy, requests go straight to litellm's async API
+    using the strategy's prompt, schema and token usage log. Other strategies
+    (e.g. the benchmark fake) are run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        llm_strategy: LLMExtractionStrategy,
+        max_in_flight: int = 4,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        pack_tokens: int = 0,
+        pack_wait: float = 0.5,
+    ):
+        self.llm_strategy = llm_strategy
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pack_tokens = pack_tokens
+        self.pack_wait = pack_wait
+
+        self.requests = 0
+        self.retries = 0
+        self.failed = 0
+        self.packed_requests = 0
+        self.packed_chunks = 0
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._resume_at = 0.0
+        self._pending: List[PendingChunk] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, url: str, text: str) -> List[dict]:
+        """
+        Extract one chunk, packing it with other small chunks when possible.
+
+        Args:
+            url: The URL the chunk was taken from
+            text: The markdown chunk
+
+        Returns:
+            List[dict]: The extracted blocks
+        """
+        if not self.pack_tokens or estimate_tokens(text) > self.pack_tokens // 2:
+            return await self.request(url, text)
+
+        chunk = PendingChunk(current_country.get(), url, text, asyncio.get_running_loop().create_future())
+        self._pending.append(chunk)
+        if sum(pending.tokens for pending in self._pending) >= self.pack_tokens:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.pack_wait, self._flush)
+        return await chunk.future
+
+    def _flush(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+
+        # Pack greedily
+        packs: List[List[PendingChunk]] = []
+        for chunk in pending:
+            for pack in packs:
+                if sum(packed.tokens for packed in pack) + chunk.tokens <= self.pack_tokens:
+                    pack.append(chunk)
+                    break
+            else:
+                packs.append([chunk])
+
+        for pack in packs:
+            task = asyncio.create_task(self._run_pack(pack))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_pack(self, pack: List[PendingChunk]) -> None:
+        try:
+            if len(pack) == 1:
+                pack[0].future.set_result(await self.request(pack[0].url, pack[0].text))
+                return
+
+            self.packed_requests += 1
+            self.packed_chunks += len(pack)
+            by_id = {f"D{n}": chunk for n, chunk in enumerate(pack, 1)}
+            packed_text = "\n\n".join(
+                f"# Source document {block_id}: visa information for "
+                f"{chunk.country.replace('-', ' ').title()} ({chunk.url})\n\n{chunk.text}"
+                for block_id, chunk in by_id.items()
+            )
+            blocks = await self.request(" ".join(chunk.url for chunk in pack), packed_text, packed=True)
+
+            routed = {id(chunk): [] for chunk in pack}
+            suspect = set()
+            for block in blocks:
+                chunk = by_id.get(str(block.pop(SOURCE_DOCUMENT_FIELD, None) or "").strip())
+                if chunk is None:
+                    # Error blocks and entries of unknown origin may belong to any chunk
+                    suspect = set(routed)
+                elif not country_matches(block, chunk.country):
+                    suspect.add(id(chunk))
+                else:
+                    routed[id(chunk)].append(block)
+
+            # Chunks with missing or doubtful entries are extracted alone
+            retry = [chunk for chunk in pack if id(chunk) in suspect or not routed[id(chunk)]]
+            retried = await asyncio.gather(*(self.request(chunk.url, chunk.text) for chunk in retry))
+            for chunk, blocks in zip(retry, retried):
+                routed[id(chunk)] = blocks
+            for chunk in pack:
+                chunk.future.set_result(routed[id(chunk)])
+        except Exception as e:
+            for chunk in pack:
+                if not chunk.future.done():
+                    chunk.future.set_exception(e)
+
+    async def request(self, url: str, text: str, packed: bool = False) -> List[dict]:
+        """
+        Send one extraction request, retrying rate limit errors with backoff.
+
+        Args:
+            url: The URL the text was taken from, or the URLs of a packed request
+            text: The markdown to extract from
+            packed: The text holds several source documents, whose ids the entries get
+
+        Returns:
+            List[dict]: The extracted blocks, or an error block once retries are exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            # Wait out a backoff triggered by any request
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with self._in_flight:
+                self.requests += 1
+                try:
+                    return await self._complete(url, text, packed)
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == self.max_retries:
+                        self.failed += 1
+                        print(f"LLM request for {url} failed: {e}")
+                        return [error_block(str(e))]
+                    error = e
+
+            self.retries += 1
+            backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            backoff = max(backoff, retry_after_seconds(error) or 0.0)
+            self._resume_at = max(self._resume_at, time.monotonic() + backoff)
+            print(f"Rate limited by the LLM provider, retrying {url} in {backoff:.1f}s")
+
+        return [error_block("Rate limit retries exhausted")]
+
+    async def _complete(self, url: str, text: str, packed: bool = False) -> List[dict]:
+        strategy = self.llm_strategy
+        if not isinstance(strategy, LLMExtractionStrategy):
+            return await asyncio.to_thread(strategy.run, url, [text])
+
+        from litellm import acompletion
+
+        # Same prompt as LLMExtractionStrategy.extract
+        variable_values = {
+            "URL": url,
+            "HTML": escape_json_string(sanitize_html(sanitize_input_encode(text))),
+        }
+        instruction = strategy.instruction
+        schema = strategy.schema
+        if packed:
+            instruction = f"{instruction}\n\n{PACKED_INSTRUCTION}" if instruction else PACKED_INSTRUCTION
+            if schema:
+                schema = packed_schema(schema)
+        prompt = PROMPT_EXTRACT_BLOCKS
+        if instruction:
+            variable_values["REQUEST"] = instruction
+            prompt = PROMPT_EXTRACT_BLOCKS_WITH_INSTRUCTION
+        if strategy.extract_type == "schema" and schema:
+            variable_values["SCHEMA"] = json.dumps(schema, indent=2)
+            prompt = PROMPT_EXTRACT_SCHEMA_WITH_INSTRUCTION
+        for variable, value in variable_values.items():
+            prompt = prompt.replace("{" + variable + "}", value)
+
+        response = await acompletion(
+            model=strategy.provider,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.01,
+            api_key=strategy.api_token,
+            base_url=strategy.api_base or strategy.base_url,
+            **(strategy.extra_args or {}),
+        )
+
+        usage = TokenUsage(
+            completion_tokens=response.usage.completion_tokens,
+            prompt_tokens=response.usage.prompt_tokens,
+            total_tokens=response.usage.total_tokens,
+        )
+        strategy.usages.append(usage)
+        strategy.total_usage.completion_tokens += usage.completion_tokens
+        strategy.total_usage.prompt_tokens += usage.prompt_tokens
+        strategy.total_usage.total_tokens += usage.total_tokens
+
+        content = response.choices[0].message.content
+        try:
+            blocks = json.loads(extract_xml_data(["blocks"], content)["blocks"])
+            for block in blocks:
+                block["error"] = False
+        except Exception:
+            blocks, unparsed = split_and_parse_json_objects(content)
+            if unparsed:
+                blocks.append(error_block(unparsed))
+        return blocks
+
+    def show_usage(self) -> None:
+        """Print request, retry and packing statistics."""
+        print("\n=== LLM Dispatch ===")
+        print(f"{'Requests':<15} {self.requests:>12,}")
+        print(f"{'Retries':<15} {self.retries:>12,}")
+        print(f"{'Failed':<15} {self.failed:>12,}")
+        print(f"{'Packed':<15} {self.packed_requests:>12,}")
+        print(f"{'Packed chunks':<15} {self.packed_chunks:>12,}")
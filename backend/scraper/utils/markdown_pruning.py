@@ -0,0 +1,203 @@
+import math
+import re
+from typing import Dict, List, Tuple
+
+from utils.incremental_extraction import HEADING_PATTERN, split_markdown_sections
+
+# Same estimate crawl4ai's LLMExtractionStrategy uses when merging chunks
+WORD_TOKEN_RATE = 1.3
+
+# Words that mark a section as relevant for visa extraction
+VISA_KEYWORDS = re.compile(
+    r"\b(visas?|passports?|fees?|applica\w*|processing|valid\w*|stay|entry|entries|embass\w*|"
+    r"consulat\w*|requirements?|documents?|insurance|permit|residence|schengen)\b",
+    re.IGNORECASE,
+)
+
+# Short blocks matching these are site chrome rather than page content
+BOILERPLATE_PATTERNS = re.compile(
+    r"cookie|skip to (main )?content|all rights reserved|copyright|©|share (on|this)|follow us|"
+    r"newsletter|subscribe|back to top|print (this )?page|accept all|privacy policy|accessibility statement",
+    re.IGNORECASE,
+)
+BOILERPLATE_MAX_CHARS = 300
+
+LINK_PATTERN = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Args:
+        text: Text about to be sent to the LLM
+
+    Returns:
+        int: Approximate number of tokens of the text
+    """
+    return math.ceil(len(text.split()) * WORD_TOKEN_RATE)
+
+
+def is_boilerplate_block(block: str) -> bool:
+    """
+    Check if a markdown block is navigation, a banner or other site chrome.
+
+    Args:
+        block: A markdown block (text between blank lines)
+
+    Returns:
+        bool: True if the block carries no page content
+    """
+    if HEADING_PATTERN.match(block):
+        return False
+
+    # Image-only blocks and link lists (menus, breadcrumbs) have little text of their own
+    without_images = IMAGE_PATTERN.sub("", block)
+    links = LINK_PATTERN.findall(without_images)
+    text = re.sub(r"[\s*|>•\-–]+", " ", LINK_PATTERN.sub("", without_images)).strip()
+    if not text and (links or without_images != block):
+        return True
+    if len(links) >= 3 and len(text) < sum(len(link) for link in links):
+        return True
+
+    return len(block) <= BOILERPLATE_MAX_CHARS and bool(BOILERPLATE_PATTERNS.search(block))
+
+
+def split_blocks(markdown: str) -> List[str]:
+    """
+    Args:
+        markdown: Page markdown
+
+    Returns:
+        List[str]: The non-empty blocks between blank lines
+    """
+    return [block.strip("\n") for block in re.split(r"\n\s*\n", markdown) if block.strip()]
+
+
+def split_oversized(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text that exceeds the token budget at line, then word boundaries.
+
+    Args:
+        text: The text to split
+        max_tokens: Token budget per piece
+
+    Returns:
+        List[str]: Pieces within the budget
+    """
+    pieces, current = [], []
+    units = text.split("\n") if len(text.split("\n")) > 1 else text.split(" ")
+    separator = "\n" if len(text.split("\n")) > 1 else " "
+    for unit in units:
+        if estimate_tokens(unit) > max_tokens and separator == "\n":
+            if current:
+                pieces.append(separator.join(current))
+                current = []
+            pieces.extend(split_oversized(unit, max_tokens))
+            continue
+        if current and estimate_tokens(separator.join(current + [unit])) > max_tokens:
+            pieces.append(separator.join(current))
+            current = []
+        current.append(unit)
+    if current:
+        pieces.append(separator.join(current))
+    return pieces
+
+
+class MarkdownPruner:
+    """
+    Shrinks page markdown before LLM extraction.
+
+    Boilerplate blocks (navigation, cookie banners, footers, images) are removed,
+    sections without visa keywords are dropped, and the remaining markdown is split
+    into chunks of at most `max_chunk_tokens` so they can be extracted in parallel.
+    """
+
+    def __init__(self, max_chunk_tokens: int = 1500):
+        self.max_chunk_tokens = max_chunk_tokens
+        self.pages: Dict[str, Tuple[int, int]] = {}
+
+    def prune(self, url: str, markdown: str) -> str:
+        """
+        Remove boilerplate and sections unrelated to visas.
+
+        Args:
+            url: The URL the markdown was fetched from
+            markdown: The page markdown within the CSS selector
+
+        Returns:
+            str: The pruned markdown, or the original if nothing relevant was recognised
+        """
+        content = "\n\n".join(block for block in split_blocks(markdown) if not is_boilerplate_block(block))
+        sections = split_markdown_sections(content)
+        relevant = [section for section in sections if VISA_KEYWORDS.search(section)]
+        pruned = "".join(relevant).strip() if relevant else content.strip()
+        if not pruned:
+            pruned = markdown
+
+        tokens_before, tokens_after = estimate_tokens(markdown), estimate_tokens(pruned)
+        self.pages[url] = (tokens_before, tokens_after)
+        print(f"Pruned {url}: {tokens_before:,} -> {tokens_after:,} tokens ({tokens_before - tokens_after:,} saved)")
+        return pruned
+
+    def chunk(self, markdown: str) -> List[str]:
+        """
+        Split markdown into chunks under the token budget.
+
+        Whole sections are packed together while they fit. A section larger than the
+        budget is split at blocks, and every piece repeats the section heading so the
+        LLM still knows which visa type it describes.
+
+        Args:
+            markdown: The (pruned) page markdown
+
+        Returns:
+            List[str]: The chunks, in page order
+        """
+        chunks: List[str] = []
+        # Whether the last chunk holds whole sections and may take another one
+        packable = False
+        for section in split_markdown_sections(markdown):
+            section = section.strip()
+            if estimate_tokens(section) <= self.max_chunk_tokens:
+                if packable and estimate_tokens(f"{chunks[-1]}\n\n{section}") <= self.max_chunk_tokens:
+                    chunks[-1] = f"{chunks[-1]}\n\n{section}"
+                else:
+                    chunks.append(section)
+                packable = True
+                continue
+
+            blocks = split_blocks(section)
+            heading = blocks.pop(0) if HEADING_PATTERN.match(blocks[0]) else ""
+            budget = max(1, self.max_chunk_tokens - estimate_tokens(heading))
+            current: List[str] = []
+            for block in blocks:
+                for piece in split_oversized(block, budget) if estimate_tokens(block) > budget else [block]:
+                    if current and estimate_tokens("\n\n".join(current + [piece])) > budget:
+                        chunks.append("\n\n".join(([heading] if heading else []) + current))
+                        current = []
+                    current.append(piece)
+            if current:
+                chunks.append("\n\n".join(([heading] if heading else []) + current))
+            packable = False
+        return chunks
+
+    def tokens_saved(self, url: str) -> int:
+        """
+        Args:
+            url: A pruned URL
+
+        Returns:
+            int: Estimated prompt tokens pruning removed from the page
+        """
+        tokens_before, tokens_after = self.pages.get(url, (0, 0))
+        return tokens_before - tokens_after
+
+    def show_usage(self) -> None:
+        """Print how many prompt tokens pruning saved."""
+        tokens_before = sum(before for before, _ in self.pages.values())
+        tokens_after = sum(after for _, after in self.pages.values())
+        print("\n=== Markdown Pruning ===")
+        print(f"{'Pages':<15} {len(self.pages):>12,}")
+        print(f"{'Tokens before':<15} {tokens_before:>12,}")
+        print(f"{'Tokens after':<15} {tokens_after:>12,}")
+        print(f"{'Tokens saved':<15} {tokens_before - tokens_after:>12,}")
@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from utils.markdown_pruning import MarkdownPruner
+from utils.validation import VisaInfoValidator
+
+# Per-worker state, built once by the pool initializer
+_validator: VisaInfoValidator = None
+
+
+def _init_worker(required_keys: List[str]) -> None:
+    global _validator
+    _validator = VisaInfoValidator(required_keys)
+
+
+def _validate(entries: List[dict]) -> Tuple[List[dict], List[Tuple[dict, List[str]]]]:
+    visas, rejects = _validator.check(entries)
+    return [visa.model_dump() for visa in visas], rejects
+
+
+def _prune(max_chunk_tokens: int, url: str, markdown: str) -> Tuple[str, Tuple[int, int]]:
+    pruner = MarkdownPruner(max_chunk_tokens)
+    pruned = pruner.prune(url, markdown)
+    return pruned, pruner.pages[url]
+
+
+class PostProcessPool:
+    """
+    Runs the CPU-bound steps between fetching and writing in worker processes.
+
+    Markdown pruning and the coercion and validation of extracted entries are
+    plain Python and would otherwise run on the event loop, holding up page
+    fetches and LLM requests while they do. Here the event loop only hands the
+    markdown or entries to a worker and awaits the result, so post-processing
+    spreads over `workers` cores.
+
+    State stays in the main process: rejects are recorded by the caller's
+    validator, pruning statistics by its pruner, and deduplication (which needs
+    every earlier entry) runs on the results as before. Workers are spawned
+    rather than forked, since the crawler process runs browser and event loop
+    threads.
+    """
+
+    def __init__(self, workers: int, required_keys: List[str]):
+        self.workers = workers
+        self.tasks = 0
+        self.executor = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(required_keys,),
+        )
+
+    async def validate(self, entries: List[dict], country: str, validator: VisaInfoValidator) -> List[dict]:
+        """
+        Coerce and validate entries in a worker.
+
+        Args:
+            entries: Raw entries, with the country already set
+            country: The country the entries belong to, recorded with rejects
+            validator: The main process validator that records rejects and counts
+
+        Returns:
+            List[dict]: The valid, complete entries as VisaInfo dumps
+        """
+        self.tasks += 1
+        valid, rejects = await asyncio.get_running_loop().run_in_executor(self.executor, _validate, entries)
+        for entry, reasons in rejects:
+            validator.reject(entry, reasons, country)
+        validator.validated += len(valid)
+        return valid
+
+    async def prune(self, markdown_pruner: MarkdownPruner, url: str, markdown: str) -> str:
+        """
+        Prune markdown in a worker.
+
+        Args:
+            markdown_pruner: The main process pruner that keeps the statistics
+            url: The URL the markdown was fetched from
+            markdown: The page markdown
+
+        Returns:
+            str: The pruned markdown
+        """
+        self.tasks += 1
+        pruned, tokens = await asyncio.get_running_loop().run_in_executor(
+            self.executor, _prune, markdown_pruner.max_chunk_tokens, url, markdown
+        )
+        markdown_pruner.pages[url] = tokens
+        return pruned
+
+    def close(self) -> None:
+        """Shut the worker processes down."""
+        self.executor.shutdown()
+
+    def show_usage(self) -> None:
+        """Print how much work went to the worker processes."""
+        print("\n=== Post-processing Workers ===")
+        print(f"{'Workers':<15} {self.workers:>12,}")
+        print(f"{'Tasks':<15} {self.tasks:>12,}")
@@ -0,0 +1,167 @@
+import asyncio
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+from utils.source_store import SourceStore
+
+VALIDATOR_HEADERS = {
+    "etag": "ETag",
+    "last_modified": "Last-Modified",
+    "content_length": "Content-Length",
+}
+
+# Validators that identify a version of the page; Content-Length alone does not
+STRONG_VALIDATORS = ["etag", "last_modified"]
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def request_validators(url: str, previous: Dict[str, str], timeout: float) -> Optional[Dict[str, str]]:
+    """
+    Send a conditional HEAD request for a source URL.
+
+    Args:
+        url: The source URL
+        previous: Validators stored from the last successful crawl
+        timeout: Request timeout in seconds
+
+    Returns:
+        Optional[Dict[str, str]]: The validators reported by the server, or None
+            if the server answered 304 Not Modified
+    """
+    headers = {"User-Agent": USER_AGENT}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+
+    request = urllib.request.Request(url, method="HEAD", headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return {
+                key: response.headers[header]
+                for key, header in VALIDATOR_HEADERS.items()
+                if response.headers.get(header)
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+
+
+def validators_match(previous: Dict[str, str], current: Dict[str, str]) -> bool:
+    """
+    Compare the validators of two responses for servers that ignore conditional
+    headers on HEAD.
+
+    Args:
+        previous: Validators stored from the last successful crawl
+        current: Validators of the current response
+
+    Returns:
+        bool: True if an ETag or Last-Modified is reported by both and every such
+            pair is equal. A different Content-Length always counts as a change,
+            but an equal one proves nothing, since edits often keep the length.
+    """
+    shared = [key for key in STRONG_VALIDATORS if previous.get(key) and current.get(key)]
+    if not shared or any(previous[key] != current[key] for key in shared):
+        return False
+    return not (
+        previous.get("content_length")
+        and current.get("content_length")
+        and previous["content_length"] != current["content_length"]
+    )
+
+
+class SourceRevalidator:
+    """
+    Decides with cheap conditional HTTP requests whether a source page changed
+    since the last crawl, so the headless browser only renders changed pages.
+
+    Validators (ETag, Last-Modified, Content-Length) and the entries extracted
+    from each URL are kept in the SourceStore, so an unchanged page can be
+    answered from the previous run. Only pages with an ETag or Last-Modified can
+    be skipped; Content-Length is used only to detect a change.
+    """
+
+    def __init__(self, store: SourceStore, timeout: float = 10):
+        self.store = store
+        self.timeout = timeout
+        self.pending: Dict[str, Dict[str, str]] = {}
+        self.unchanged = 0
+        self.changed = 0
+
+    def _stored(self, url: str) -> Optional[dict]:
+        # Only a source committed with validators can be answered from its entries
+        stored = self.store.get(url)
+        return stored if stored and stored["validators"] else None
+
+    async def has_changed(self, url: str) -> bool:
+        """
+        Check whether a source URL changed since its validators were last committed.
+
+        Any failure of the pre-check (network error, servers rejecting HEAD) counts
+        as a change, so the page is rendered as usual.
+
+        Args:
+            url: The source URL
+
+        Returns:
+            bool: False only if the server confirms the page is unchanged
+        """
+        stored = self._stored(url)
+        previous = stored["validators"] if stored else {}
+
+        try:
+            validators = await asyncio.to_thread(request_validators, url, previous, self.timeout)
+        except Exception as e:
+            print(f"Revalidation failed for {url}: {e}")
+            self.changed += 1
+            return True
+
+        if validators is None:
+            # 304 Not Modified; without stored entries there is nothing to answer with
+            changed = not stored
+        else:
+            self.pending[url] = validators
+            # Some servers ignore conditional headers on HEAD, so compare the validators too
+            changed = not (stored and validators_match(previous, validators))
+
+        if changed:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+        return changed
+
+    def previous_entries(self, url: str) -> List[dict]:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            List[dict]: The entries extracted from the URL in the last committed crawl
+        """
+        stored = self._stored(url)
+        return stored["entries"] if stored else []
+
+    def commit(self, url: str, entries: List[dict]) -> None:
+        """
+        Record the validators of a successfully crawled URL together with its entries.
+
+        Args:
+            url: The source URL
+            entries: The entries extracted from the page
+        """
+        validators = self.pending.pop(url, {})
+        if not any(validators.get(key) for key in STRONG_VALIDATORS):
+            # Without an ETag or Last-Modified the next run could never skip the page
+            self.store.update(url, validators=None)
+        else:
+            self.store.update(url, validators=validators, entries=entries)
+
+    def show_usage(self) -> None:
+        """Print how many sources were skipped because they were unchanged."""
+        print("\n=== Source Revalidation ===")
+        print(f"{'Unchanged':<15} {self.unchanged:>12,}")
+        print(f"{'Changed':<15} {self.changed:>12,}")
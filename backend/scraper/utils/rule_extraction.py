@@ -0,0 +1,291 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from utils.incremental_extraction import HEADING_PATTERN, split_markdown_sections
+
+CURRENCY = r"(?:EUR|€|PLN|zł|USD|US\$|\$|GBP|£|euros?)"
+AMOUNT_PATTERN = re.compile(
+    rf"{CURRENCY}\s?\d[\d.,]*(?:\s?{CURRENCY})?|\d[\d.,]*\s?{CURRENCY}",
+    re.IGNORECASE,
+)
+DURATION_PATTERN = re.compile(
+    r"(?:up to |at least |maximum of |within )?\d+\s*(?:(?:to|-|–)\s*\d+\s*)?"
+    r"(?:working |calendar |business )?(?:days?|weeks?|months?|years?)",
+    re.IGNORECASE,
+)
+ENTRY_PATTERN = re.compile(r"\b(single|double|multiple)[- ]entr(?:y|ies)\b|\b(transit)\b", re.IGNORECASE)
+URL_PATTERN = re.compile(r"https?://[^\s)\]>\"']+")
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+\.)\s+(.+)$", re.MULTILINE)
+SENTENCE_PATTERN = re.compile(r"(?<=[.;!?])\s+|\n+")
+LINK_TEXT_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+
+# Keywords that tie a duration or amount in the same sentence to a field
+FIELD_KEYWORDS = {
+    "fees": re.compile(r"\b(fees?|costs?|price|charges?|payable)\b", re.IGNORECASE),
+    "processing_time": re.compile(r"\b(processing|processed|decision|considered|examin\w*)\b", re.IGNORECASE),
+    "validity": re.compile(r"\b(validity|valid for|is valid|are valid)\b", re.IGNORECASE),
+    "allowed_stay": re.compile(r"\b(stay|remain)\b", re.IGNORECASE),
+}
+EMBASSY_URL_PATTERN = re.compile(r"embass|consulat|gov\.|visa", re.IGNORECASE)
+MARKUP_PATTERN = re.compile(r"[#*_>`|~=-]+")
+
+# Sections with less text than this below their heading (page titles, separators)
+# are not worth an LLM request
+MIN_SECTION_BODY_CHARS = 20
+
+
+def sentences(text: str) -> List[str]:
+    """
+    Args:
+        text: Markdown text
+
+    Returns:
+        List[str]: The sentences and lines of the text
+    """
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.split(text) if sentence.strip()]
+
+
+def match_keyword_value(text: str, field: str, pattern: re.Pattern) -> Tuple[Optional[str], float]:
+    """
+    Find a value for a field, preferring values in sentences that name the field.
+
+    Args:
+        text: Section markdown
+        field: Key of FIELD_KEYWORDS
+        pattern: Pattern of the value (amount or duration)
+
+    Returns:
+        Tuple[Optional[str], float]: The value and its confidence
+    """
+    values = []
+    for sentence in sentences(text):
+        if FIELD_KEYWORDS[field].search(sentence):
+            values += [match.group(0).strip().rstrip(".,") for match in pattern.finditer(sentence)]
+    if values:
+        # Conflicting values in the same section are left to the LLM
+        return values[0], 0.9 if len(set(values)) == 1 else 0.5
+    return None, 0.0
+
+
+def match_fees(text: str) -> Tuple[Optional[str], float]:
+    """
+    Args:
+        text: Section markdown
+
+    Returns:
+        Tuple[Optional[str], float]: The visa fee and its confidence
+    """
+    for sentence in sentences(text):
+        if FIELD_KEYWORDS["fees"].search(sentence) and re.search(r"free of charge|no fee", sentence, re.IGNORECASE):
+            return "Free of charge", 0.8
+    value, confidence = match_keyword_value(text, "fees", AMOUNT_PATTERN)
+    if value is None:
+        amounts = {match.group(0).strip().rstrip(".,") for match in AMOUNT_PATTERN.finditer(text)}
+        if len(amounts) == 1:
+            return amounts.pop(), 0.5
+    return value, confidence
+
+
+def match_entry_type(text: str) -> Tuple[Optional[str], float]:
+    """
+    Args:
+        text: Section markdown
+
+    Returns:
+        Tuple[Optional[str], float]: The entry type and its confidence
+    """
+    types = {(match.group(1) or match.group(2)).lower() for match in ENTRY_PATTERN.finditer(text)}
+    if not types:
+        return None, 0.0
+    entry_type = sorted(types)[0]
+    entry_type = "Transit" if entry_type == "transit" else f"{entry_type.title()}-entry"
+    return entry_type, 0.9 if len(types) == 1 else 0.5
+
+
+def match_embassy_link(text: str) -> Tuple[Optional[str], float]:
+    """
+    Args:
+        text: Section markdown
+
+    Returns:
+        Tuple[Optional[str], float]: The embassy or visa information URL and its confidence
+    """
+    urls = [url.rstrip(".,;") for url in URL_PATTERN.findall(text)]
+    for url in urls:
+        if EMBASSY_URL_PATTERN.search(url):
+            return url, 0.8
+    return (urls[0], 0.5) if urls else (None, 0.0)
+
+
+def section_body(section: str) -> str:
+    """
+    Args:
+        section: Section markdown, usually starting with a heading
+
+    Returns:
+        str: The text below the heading, without markdown markup or link targets
+    """
+    section = section.strip()
+    if HEADING_PATTERN.match(section):
+        section = section.split("\n", 1)[1] if "\n" in section else ""
+    return " ".join(MARKUP_PATTERN.sub(" ", LINK_TEXT_PATTERN.sub(r"\1", section)).split())
+
+
+def match_visa_type(section: str) -> Tuple[Optional[str], float]:
+    """
+    Args:
+        section: Section markdown, usually starting with a heading
+
+    Returns:
+        Tuple[Optional[str], float]: The visa type named by the heading and its confidence
+    """
+    heading = HEADING_PATTERN.match(section.lstrip())
+    if not heading:
+        return None, 0.0
+    title = section.lstrip().split("\n", 1)[0].lstrip("#").strip()
+    title = LINK_TEXT_PATTERN.sub(r"\1", title).strip(" *_")
+    return title, 0.9 if re.search(r"\bvisa\b", title, re.IGNORECASE) else 0.5
+
+
+def match_requirements(section: str) -> Tuple[Optional[List[str]], float]:
+    """
+    Args:
+        section: Section markdown
+
+    Returns:
+        Tuple[Optional[List[str]], float]: The bullet list items and their confidence
+    """
+    items = [LINK_TEXT_PATTERN.sub(r"\1", item).strip() for item in BULLET_PATTERN.findall(section)]
+    items = [item for item in items if item]
+    if not items:
+        return None, 0.0
+    return items, 0.8 if len(items) > 1 else 0.5
+
+
+class RuleExtractor:
+    """
+    Deterministic fast path run before the LLM.
+
+    Every markdown section (usually one per visa type) is matched against rules
+    for the fields that follow predictable patterns: currency amounts, "N to M
+    weeks" durations, entry types, URLs and requirement bullet lists. Every field
+    gets a confidence score, and sections whose required fields all reach
+    `confidence_threshold` need no LLM request. Every other section with body text
+    is sent to the LLM, even if no rule matched it, and its answers fill the
+    fields the rules were unsure about.
+    """
+
+    def __init__(self, required_keys: List[str], confidence_threshold: float = 0.8):
+        # The country is taken from the crawl job, not from the page
+        self.required_keys = [key for key in required_keys if key != "country"]
+        self.confidence_threshold = confidence_threshold
+        self.rule_sections = 0
+        self.llm_sections = 0
+        self.rule_pages = 0
+
+    def match_section(self, section: str) -> Tuple[dict, Dict[str, float]]:
+        """
+        Apply all rules to a section.
+
+        Args:
+            section: Section markdown
+
+        Returns:
+            Tuple[dict, Dict[str, float]]: The entry and the confidence of every field
+        """
+        matches = {
+            "visa_type": match_visa_type(section),
+            "requirements": match_requirements(section),
+            "processing_time": match_keyword_value(section, "processing_time", DURATION_PATTERN),
+            "validity": match_keyword_value(section, "validity", DURATION_PATTERN),
+            "fees": match_fees(section),
+            "entry_type": match_entry_type(section),
+            "allowed_stay": match_keyword_value(section, "allowed_stay", DURATION_PATTERN),
+            "embassy_link": match_embassy_link(section),
+        }
+        entry = {"country": "", "notes": ""}
+        entry.update({field: value if value is not None else "" for field, (value, _) in matches.items()})
+        return entry, {field: confidence for field, (_, confidence) in matches.items()}
+
+    def is_confident(self, confidence: Dict[str, float]) -> bool:
+        """
+        Args:
+            confidence: Confidence per field, as returned by match_section
+
+        Returns:
+            bool: True if every required field reached the confidence threshold
+        """
+        return all(confidence.get(key, 0.0) >= self.confidence_threshold for key in self.required_keys)
+
+    def extract(self, markdown: str) -> Tuple[List[dict], List[Tuple[dict, Dict[str, float]]], str]:
+        """
+        Run the rules on every section of a page.
+
+        Args:
+            markdown: The page markdown
+
+        Returns:
+            Tuple[List[dict], List[Tuple[dict, Dict[str, float]]], str]: The confident
+                entries, the partial entries with their confidences, and the markdown
+                still to be sent to the LLM (empty if the rules covered the page)
+        """
+        confident, partial, pending = [], [], []
+        for section in split_markdown_sections(markdown):
+            entry, confidence = self.match_section(section)
+            if self.is_confident(confidence):
+                confident.append(entry)
+            elif len(section_body(section)) >= MIN_SECTION_BODY_CHARS:
+                # Prose the rules cannot read still describes a visa type, so the LLM gets it
+                partial.append((entry, confidence))
+                pending.append(section)
+
+        if not confident:
+            # Nothing recognisable: let the LLM read the whole page
+            partial, pending = [], [markdown]
+
+        self.rule_sections += len(confident)
+        self.llm_sections += len(pending)
+        if not pending:
+            self.rule_pages += 1
+        return confident, partial, "\n\n".join(section.strip() for section in pending)
+
+    def merge(self, partial: List[Tuple[dict, Dict[str, float]]], llm_entries: List[dict]) -> List[dict]:
+        """
+        Combine LLM entries with the partial rule matches of the same visa type.
+
+        Fields the rules filled confidently are kept; every other field is taken
+        from the LLM entry.
+
+        Args:
+            partial: Partial entries and confidences returned by extract
+            llm_entries: Entries (and error blocks) the LLM extracted from the pending markdown
+
+        Returns:
+            List[dict]: The merged entries, including the LLM's error blocks
+        """
+        def visa_type_key(entry: dict) -> str:
+            return str(entry.get("visa_type") or "").strip().lower()
+
+        rule_matches = {visa_type_key(entry): (entry, confidence) for entry, confidence in partial}
+        merged = []
+        for llm_entry in llm_entries:
+            if llm_entry.get("error"):
+                merged.append(llm_entry)
+                continue
+            rule_entry, confidence = rule_matches.get(visa_type_key(llm_entry), ({}, {}))
+            merged.append({
+                **llm_entry,
+                **{
+                    field: value
+                    for field, value in rule_entry.items()
+                    if confidence.get(field, 0.0) >= self.confidence_threshold
+                },
+            })
+        return merged
+
+    def show_usage(self) -> None:
+        """Print how much of the extraction the rules handled without the LLM."""
+        print("\n=== Rule Extraction ===")
+        print(f"{'Rule sections':<15} {self.rule_sections:>12,}")
+        print(f"{'LLM sections':<15} {self.llm_sections:>12,}")
+        print(f"{'Rule-only pages':<15} {self.rule_pages:>12,}")
@@ -1,29 +1,50 @@
-import json
+import asyncio
 import os
-from typing import List, Set, Tuple
+from typing import List, Optional, Set
 
 from crawl4ai import (
     AsyncWebCrawler,
     BrowserConfig,
     CacheMode,
     CrawlerRunConfig,
+    CrawlResult,
     LLMExtractionStrategy,
 )
+from crawl4ai.chunking_strategy import RegexChunking
 
 from models.visa_info import VisaInfo
-from utils.data_utils import is_complete_visa_info, is_duplicate_visa_info
+from utils.browser_pool import BrowserContextPool
+from utils.crawl_scheduler import HostRateLimiter
+from utils.data_utils import is_duplicate_visa_info
+from utils.dedup import VisaDedupIndex
+from utils.extraction_cache import ExtractionCache, hash_markdown
+from utils.incremental_extraction import SectionStore, merge_section_entries, split_markdown_sections
+from utils.instrumentation import PipelineMetrics, timed_stage
+from utils.llm_dispatch import LLMDispatcher
+from utils.markdown_pruning import MarkdownPruner
+from utils.process_pool import PostProcessPool
+from utils.revalidation import SourceRevalidator
+from utils.rule_extraction import RuleExtractor
+from utils.source_registry import SourceRegistry, get_country_url
+from utils.validation import VisaInfoValidator
+from utils.visa_urls import visa_types_hint
 
 
-def get_browser_config() -> BrowserConfig:
+def get_browser_config(js_heap_mb: int = None) -> BrowserConfig:
     """
     Returns the browser configuration for the crawler.
 
+    Args:
+        js_heap_mb: Optional cap on the JavaScript heap of each renderer process
+
     Returns:
         BrowserConfig: The configuration settings for the browser.
     """
     return BrowserConfig(
         browser_type="chromium",
         headless=True,  # Run in headless mode for server deployment
+        light_mode=True,  # Disable background networking, sync and other unused features
+        extra_args=[f"--js-flags=--max-old-space-size={js_heap_mb}"] if js_heap_mb else [],
         verbose=True,
     )
 
@@ -61,90 +82,607 @@ Additional Notes: Any extra details about visa extensions, work permissions, or
     )
 
 
-async def fetch_and_process_country(
-    crawler: AsyncWebCrawler,
-    country: str,
-    base_url: str,
-    css_selector: str,
+class CrawlContext:
+    """
+    Everything the crawl jobs of a run share: the crawler, the LLM strategy, the
+    dedup state and the optional pipeline components. Components left as None are
+    skipped.
+    """
+
+    def __init__(
+        self,
+        crawler: AsyncWebCrawler,
+        llm_strategy: LLMExtractionStrategy,
+        required_keys: List[str],
+        seen_entries: Set[tuple] = None,
+        css_selector: str = None,
+        session_id: str = None,
+        extraction_cache: ExtractionCache = None,
+        source_revalidator: SourceRevalidator = None,
+        section_store: SectionStore = None,
+        metrics: PipelineMetrics = None,
+        browser_pool: BrowserContextPool = None,
+        markdown_pruner: MarkdownPruner = None,
+        rule_extractor: RuleExtractor = None,
+        llm_dispatcher: LLMDispatcher = None,
+        validator: VisaInfoValidator = None,
+        dedup_index: VisaDedupIndex = None,
+        post_process_pool: PostProcessPool = None,
+        source_registry: SourceRegistry = None,
+        rate_limiter: HostRateLimiter = None,
+    ):
+        """
+        Args:
+            crawler: The web crawler instance
+            llm_strategy: The LLM extraction strategy
+            required_keys: List of required keys in the visa information
+            seen_entries: Set of (country, visa_type) entries that have already been seen
+            css_selector: The CSS selector to target the content
+            session_id: Optional session identifier, suffixed with the country
+            extraction_cache: Optional cache of extraction results for unchanged pages
+            source_revalidator: Optional HTTP pre-check skipping the browser for unchanged pages
+            section_store: Optional per-section store; only changed sections are re-extracted
+            metrics: Optional collector of per-stage timings, markdown size and entry counts
+            browser_pool: Optional pool of warm browser contexts shared across countries
+            markdown_pruner: Optional pruner shrinking the markdown before extraction
+            rule_extractor: Optional rule-based fast path; the LLM only gets what it cannot fill
+            llm_dispatcher: Optional LLM dispatch layer shared by all countries
+            validator: Optional bulk validator recording rejected entries
+            dedup_index: Optional index merging near-duplicate visa types
+            post_process_pool: Optional worker processes for pruning and validation
+            source_registry: Optional per-source selectors, hints and re-crawl schedule
+            rate_limiter: Optional per-host rate limit, taken before every request to a source
+        """
+        self.crawler = crawler
+        self.llm_strategy = llm_strategy
+        self.required_keys = required_keys
+        self.seen_entries = set() if seen_entries is None else seen_entries
+        self.css_selector = css_selector
+        self.session_id = session_id
+        self.extraction_cache = extraction_cache
+        self.source_revalidator = source_revalidator
+        self.section_store = section_store
+        self.metrics = metrics
+        self.browser_pool = browser_pool
+        self.markdown_pruner = markdown_pruner
+        self.rule_extractor = rule_extractor
+        self.llm_dispatcher = llm_dispatcher
+        self.validator = validator
+        self.dedup_index = dedup_index
+        self.post_process_pool = post_process_pool
+        self.source_registry = source_registry
+        self.rate_limiter = rate_limiter
+
+    async def wait_for_host(self, url: str) -> None:
+        """
+        Wait for the rate limit of the host of a source, right before a request to it.
+
+        Args:
+            url: The URL about to be requested
+        """
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(url)
+
+    def selector(self, url: str) -> str:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            str: The CSS selector of the source, from the registry if there is one
+        """
+        return self.source_registry.selector(url) if self.source_registry else self.css_selector
+
+    def hints(self, url: str, visa_types: List[str] = None) -> Optional[str]:
+        """
+        Args:
+            url: The source URL
+            visa_types: Optional visa types the page is known to cover
+
+        Returns:
+            Optional[str]: Extraction hints of the source and its visa types, if any
+        """
+        hints = [self.source_registry.hints(url) if self.source_registry else None, visa_types_hint(visa_types)]
+        return " ".join(hint for hint in hints if hint) or None
+
+
+async def extract_markdown(
     llm_strategy: LLMExtractionStrategy,
-    session_id: str,
-    required_keys: List[str],
-    seen_entries: Set[tuple],
-    country_sources: dict = None,
+    url: str,
+    markdown: str,
+    llm_dispatcher: LLMDispatcher = None,
+    hints: str = None,
 ) -> List[dict]:
     """
-    Fetches and processes visa information for a specific country.
+    Sends markdown to the LLM.
+
+    With a dispatcher the markdown is one request (possibly packed with small chunks
+    of other countries); otherwise the strategy chunks it and runs in a worker thread.
 
     Args:
-        crawler: The web crawler instance
-        country: The country to fetch visa information for
-        base_url: The base URL of the website
-        css_selector: The CSS selector to target the content
         llm_strategy: The LLM extraction strategy
-        session_id: The session identifier
-        required_keys: List of required keys in the visa information
-        seen_entries: Set of entries that have already been seen
-        country_sources: Optional dictionary of country-specific URLs
+        url: The URL the markdown was fetched from
+        markdown: The markdown to extract from
+        llm_dispatcher: Optional dispatch layer with concurrency cap, backoff and packing
+        hints: Optional extraction hints of the source, sent ahead of the markdown
 
     Returns:
-        List[dict]: A list of processed visa information entries
+        List[dict]: The extracted blocks, including error blocks
+    """
+    if hints:
+        markdown = f"Notes about this source: {hints}\n\n{markdown}"
+    if llm_dispatcher:
+        return await llm_dispatcher.submit(url, markdown)
+    return await asyncio.to_thread(llm_strategy.run, url, RegexChunking().chunk(markdown))
+
+
+async def extract_chunks(
+    llm_strategy: LLMExtractionStrategy,
+    url: str,
+    chunks: List[str],
+    llm_dispatcher: LLMDispatcher = None,
+    hints: str = None,
+) -> List[dict]:
+    """
+    Extracts every chunk with its own LLM request in parallel and merges the
+    entries of all chunks into one record per visa type.
+
+    Args:
+        llm_strategy: The LLM extraction strategy
+        url: The URL the chunks were taken from
+        chunks: Markdown chunks within the token budget
+        llm_dispatcher: Optional dispatch layer the requests are sent through
+        hints: Optional extraction hints of the source, sent with every chunk
+
+    Returns:
+        List[dict]: The merged entries, followed by the error blocks of failed chunks
+    """
+    extracted = await asyncio.gather(
+        *(extract_markdown(llm_strategy, url, chunk, llm_dispatcher, hints) for chunk in chunks)
+    )
+    chunk_entries = [[block for block in blocks if not block.get("error")] for blocks in extracted]
+    errors = [block for blocks in extracted for block in blocks if block.get("error")]
+    return merge_section_entries(chunk_entries, []) + errors
+
+
+async def extract_changed_sections(
+    llm_strategy: LLMExtractionStrategy,
+    url: str,
+    markdown: str,
+    section_store: SectionStore,
+    markdown_pruner: MarkdownPruner = None,
+    llm_dispatcher: LLMDispatcher = None,
+    hints: str = None,
+) -> List[dict]:
+    """
+    Sends only the markdown sections that changed since the last run to the LLM and
+    merges their entries into the previous records for the URL.
+
+    Args:
+        llm_strategy: The LLM extraction strategy
+        url: The URL the markdown was fetched from
+        markdown: The page markdown within the CSS selector
+        section_store: Entries extracted per section in previous runs
+        markdown_pruner: Optional pruner whose token budget is used to chunk changed sections
+        llm_dispatcher: Optional dispatch layer the requests are sent through
+        hints: Optional extraction hints of the source, sent with every section
+
+    Returns:
+        List[dict]: The merged entries, followed by an error block if any section failed
     """
-    # Determine the URL to crawl
-    if country_sources and country in country_sources:
-        url = country_sources[country]
+    sections = split_markdown_sections(markdown)
+    hashes = [hash_markdown(section) for section in sections]
+    cached_entries = [section_store.section_entries(url, section_hash) for section_hash in hashes]
+
+    changed = {
+        section_hash: section
+        for section_hash, section, entries in zip(hashes, sections, cached_entries)
+        if entries is None
+    }
+    if markdown_pruner:
+        extracted = await asyncio.gather(
+            *(
+                extract_chunks(llm_strategy, url, markdown_pruner.chunk(section), llm_dispatcher, hints)
+                for section in changed.values()
+            )
+        )
     else:
-        url = f"{base_url}/{country}"
+        extracted = await asyncio.gather(
+            *(extract_markdown(llm_strategy, url, section, llm_dispatcher, hints) for section in changed.values())
+        )
+    extracted_by_hash = dict(zip(changed, extracted))
+    failed = {section_hash for section_hash, blocks in extracted_by_hash.items() if any(block.get("error") for block in blocks)}
+
+    section_entries = [
+        entries if entries is not None else [block for block in extracted_by_hash[section_hash] if not block.get("error")]
+        for section_hash, entries in zip(hashes, cached_entries)
+    ]
+    records = merge_section_entries(section_entries, section_store.previous_records(url))
+
+    section_store.reused_sections += len(sections) - len(changed)
+    section_store.extracted_sections += len(changed)
+    # Failed sections are left out so they are extracted again next run
+    section_store.update(
+        url,
+        {
+            section_hash: entries
+            for section_hash, entries in zip(hashes, section_entries)
+            if section_hash not in failed
+        },
+        records,
+    )
+
+    if failed:
+        records.append({
+            "index": 0,
+            "error": True,
+            "tags": ["error"],
+            "content": f"Extraction failed for {len(failed)} of {len(sections)} sections",
+        })
+    return records
+
+
+async def extract_visa_info(context: CrawlContext, url: str, markdown: str, hints: str = None) -> List[dict]:
+    """
+    Runs the LLM extraction strategy on page markdown without blocking the event loop.
+
+    crawl4ai calls the (synchronous) extraction strategy inside `arun`, which stalls
+    every other crawl running on the same loop, so extraction is done in a worker thread.
+    With a rule extractor, only the sections the rules could not fill confidently
+    are sent to the LLM. Cached results, changed sections, pruner chunks and the
+    dispatcher are used when the context has them.
+
+    Args:
+        context: The crawl context
+        url: The URL the markdown was fetched from
+        markdown: The page markdown within the CSS selector
+        hints: Optional extraction hints of the source, sent with every LLM request
+
+    Returns:
+        List[dict]: The raw entries extracted by the rules and the LLM
+    """
+    llm_strategy, llm_dispatcher = context.llm_strategy, context.llm_dispatcher
+    extraction_cache, rule_extractor = context.extraction_cache, context.rule_extractor
+
+    # Hints change what the LLM returns, so cached results are keyed by them too
+    cache_markdown = f"{hints}\n\n{markdown}" if hints else markdown
+    if extraction_cache:
+        cached_data = extraction_cache.get(url, cache_markdown)
+        if cached_data is not None:
+            print(f"Reusing cached extraction for {url}")
+            return cached_data
+
+    rule_data, partial_data, llm_markdown = [], [], markdown
+    if rule_extractor:
+        rule_data, partial_data, llm_markdown = rule_extractor.extract(markdown)
+        if not llm_markdown:
+            print(f"Extracted {url} with rules only, skipping the LLM")
+
+    if not llm_markdown:
+        llm_data = []
+    elif context.section_store:
+        llm_data = await extract_changed_sections(
+            llm_strategy, url, llm_markdown, context.section_store, context.markdown_pruner, llm_dispatcher, hints
+        )
+    elif context.markdown_pruner:
+        llm_data = await extract_chunks(
+            llm_strategy, url, context.markdown_pruner.chunk(llm_markdown), llm_dispatcher, hints
+        )
+    else:
+        llm_data = await extract_markdown(llm_strategy, url, llm_markdown, llm_dispatcher, hints)
+
+    if rule_extractor:
+        llm_data = rule_extractor.merge(partial_data, llm_data)
+    extracted_data = rule_data + llm_data
+
+    # Failed LLM calls come back as error blocks; never cache those
+    if extraction_cache and not any(block.get("error") for block in extracted_data):
+        extraction_cache.put(url, cache_markdown, extracted_data)
+
+    return extracted_data
+
+
+async def prepare_markdown(context: CrawlContext, url: str, markdown: str, country: str) -> str:
+    """
+    Records the markdown size and prunes boilerplate before extraction.
+
+    Args:
+        context: The crawl context; pruning is skipped without a markdown pruner
+        url: The URL the markdown was fetched from
+        markdown: The page markdown within the CSS selector
+        country: The country the page belongs to
+
+    Returns:
+        str: The markdown to extract from
+    """
+    metrics, markdown_pruner = context.metrics, context.markdown_pruner
+    if metrics:
+        metrics.add(country, markdown_bytes=len(markdown.encode("utf-8")))
+    if not markdown_pruner:
+        return markdown
+
+    with timed_stage(metrics, country, "prune"):
+        if context.post_process_pool:
+            markdown = await context.post_process_pool.prune(markdown_pruner, url, markdown)
+        else:
+            markdown = markdown_pruner.prune(url, markdown)
+    if metrics:
+        metrics.add(country, tokens_saved=markdown_pruner.tokens_saved(url))
+    return markdown
+
+
+async def fetch_page(
+    crawler: AsyncWebCrawler,
+    url: str,
+    css_selector: str,
+    session_id: str = None,
+    browser_pool: BrowserContextPool = None,
+) -> CrawlResult:
+    """
+    Fetches a page and converts the selected content to markdown.
+
+    Args:
+        crawler: The web crawler instance
+        url: The URL to fetch
+        css_selector: The CSS selector to target the content
+        session_id: Optional session identifier, reusing its browser context
+        browser_pool: Optional pool of warm browser contexts; overrides session_id
 
-    print(f"Loading visa information for {country.upper()}...")
+    Returns:
+        CrawlResult: The crawl result of the page
+    """
+    if browser_pool:
+        async with browser_pool.session(url) as pool_session_id:
+            return await fetch_page(crawler, url, css_selector, pool_session_id)
 
-    # Fetch page content with the extraction strategy
-    result = await crawler.arun(
+    return await crawler.arun(
         url=url,
         config=CrawlerRunConfig(
             cache_mode=CacheMode.BYPASS,
-            extraction_strategy=llm_strategy,
             css_selector=css_selector,
-            session_id=f"{session_id}_{country}",
+            session_id=session_id,
         ),
     )
 
-    if not (result.success and result.extracted_content):
-        print(f"Error fetching visa information for {country}: {result.error_message}")
-        return []
 
-    # Parse extracted content
-    try:
-        extracted_data = json.loads(result.extracted_content)
-    except json.JSONDecodeError:
-        print(f"Error parsing JSON for {country}.")
-        return []
+async def fetch_and_process_country(
+    context: CrawlContext,
+    country: str,
+    base_url: str,
+    country_sources: dict = None,
+) -> Optional[List[dict]]:
+    """
+    Fetches and processes visa information for a specific country.
+
+    Args:
+        context: The crawl context shared by all countries
+        country: The country to fetch visa information for
+        base_url: The base URL of the website
+        country_sources: Optional dictionary of country-specific URLs
+
+    Returns:
+        Optional[List[dict]]: A list of processed visa information entries, or None
+            if the page could not be fetched or its extraction failed
+    """
+    url = get_country_url(country, base_url, country_sources)
+    return await fetch_and_process_url(context, country, url, f"{context.session_id}_{country}")
+
+
+async def fetch_and_process_job(context: CrawlContext, job: dict) -> Optional[List[dict]]:
+    """
+    Fetches and processes one visa URL job (see utils.visa_urls.build_visa_url_jobs).
+
+    Every job is a distinct URL, so each page is fetched and extracted only once
+    per run. The visa types the page covers are sent to the LLM as a hint.
+    Countries have several jobs, which may run at the same time, so no
+    per-country session is shared.
+
+    Args:
+        context: The crawl context shared by all jobs
+        job: A job of the form {"country", "url", "visa_types"}
+
+    Returns:
+        Optional[List[dict]]: A list of processed visa information entries, or None
+            if the page could not be fetched or its extraction failed
+    """
+    return await fetch_and_process_url(context, job["country"], job["url"], visa_types=job["visa_types"])
+
+
+async def fetch_and_process_url(
+    context: CrawlContext,
+    country: str,
+    url: str,
+    session_id: str = None,
+    visa_types: List[str] = None,
+) -> Optional[List[dict]]:
+    """
+    Fetches a source page, extracts its visa information and processes the entries.
+
+    Sources that are not due for a re-crawl, or whose validators show they are
+    unchanged, are answered from their entries of the last crawl instead.
+
+    Args:
+        context: The crawl context
+        country: The country the page belongs to
+        url: The URL of the page
+        session_id: Optional browser session identifier, unused with a browser pool
+        visa_types: Optional visa types the page covers, passed to the LLM as a hint
+
+    Returns:
+        Optional[List[dict]]: A list of processed visa information entries, which may
+            be empty, or None if the page could not be fetched or its extraction failed
+    """
+    source_revalidator, source_registry, metrics = context.source_revalidator, context.source_registry, context.metrics
+
+    # Sources that rarely change are only crawled when their re-crawl interval has passed
+    if source_registry and not source_registry.is_due(url):
+        print(f"Source {url} for {country.upper()} not due for a re-crawl, reusing previous entries.")
+        return await process_and_count_entries(context, source_registry.previous_entries(url), country)
+
+    if source_revalidator:
+        await context.wait_for_host(url)
+        with timed_stage(metrics, country, "revalidate"):
+            changed = await source_revalidator.has_changed(url)
+        if not changed:
+            print(f"Source {url} for {country.upper()} unchanged since last crawl, reusing previous entries.")
+            previous_data = source_revalidator.previous_entries(url)
+            if source_registry:
+                source_registry.commit(url, previous_data)
+            return await process_and_count_entries(context, previous_data, country)
+
+    print(f"Loading visa information for {country.upper()} from {url}...")
+
+    # Fetch page content (navigation and markdown conversion)
+    await context.wait_for_host(url)
+    with timed_stage(metrics, country, "fetch"):
+        result = await fetch_page(context.crawler, url, context.selector(url), session_id, context.browser_pool)
+
+    if not (result.success and result.markdown):
+        print(f"Error fetching visa information for {country} from {url}: {result.error_message}")
+        return None
+
+    markdown = await prepare_markdown(context, url, result.markdown, country)
+
+    # Extract visa information from the page content
+    with timed_stage(metrics, country, "extract"):
+        extracted_data = await extract_visa_info(context, url, markdown, context.hints(url, visa_types))
 
+    # A failed LLM request (or chunk) leaves the page incomplete: the job fails, so the
+    # entries stored for it are kept and --resume extracts it again
+    errors = [block for block in extracted_data if block.get("error")]
+    if errors:
+        print(f"Error extracting visa information for {country} from {url}: {errors[0].get('content', '')}")
+        return None
+
+    if source_revalidator:
+        source_revalidator.commit(url, extracted_data)
+    if source_registry:
+        source_registry.commit(url, extracted_data)
+
+    return await process_and_count_entries(context, extracted_data, country)
+
+
+async def process_and_count_entries(context: CrawlContext, extracted_data: List[dict], country: str) -> List[dict]:
+    """
+    Validates extracted entries, then deduplicates and counts the kept ones.
+
+    Args:
+        context: The crawl context
+        extracted_data: Raw entries returned by the LLM extraction
+        country: The country the entries belong to
+
+    Returns:
+        List[dict]: A list of processed visa information entries
+    """
+    entries = await validate_visa_entries(context, extracted_data, country)
+    return dedup_and_count_entries(context, entries, country)
+
+
+async def validate_visa_entries(context: CrawlContext, extracted_data: List[dict], country: str) -> List[dict]:
+    """
+    Sets the country of extracted entries and validates them as the "validate" stage.
+
+    Args:
+        context: The crawl context; without a validator a silent one is used
+        extracted_data: Raw entries returned by the LLM extraction
+        country: The country the entries belong to
+
+    Returns:
+        List[dict]: The valid, complete entries
+    """
     if not extracted_data:
         print(f"No visa information found for {country}.")
         return []
 
-    # Process visa information
-    complete_entries = []
-    for entry in extracted_data:
-        # Ensure the country field is set
-        entry["country"] = country.replace("-", " ").title()
+    # Ensure the country field is set
+    country_name = country.replace("-", " ").title()
+    extracted_data = [{**entry, "country": country_name} for entry in extracted_data]
 
-        # Convert requirements to a list if it's a string
-        if isinstance(entry.get("requirements"), str):
-            entry["requirements"] = [req.strip() for req in entry["requirements"].split(",")]
+    # Coerce and validate the whole batch at once; incomplete entries are rejected
+    validator = context.validator or VisaInfoValidator(context.required_keys)
+    with timed_stage(context.metrics, country, "validate"):
+        if context.post_process_pool:
+            return await context.post_process_pool.validate(extracted_data, country, validator)
+        return [visa.model_dump() for visa in validator.validate(extracted_data, country)]
 
-        if not is_complete_visa_info(entry, required_keys):
-            print(f"Incomplete visa information for {country}, visa type: {entry.get('visa_type', 'Unknown')}")
-            continue
 
+def dedup_and_count_entries(context: CrawlContext, entries: List[dict], country: str) -> List[dict]:
+    """
+    Runs dedup_visa_entries as the "process" stage and counts the kept entries.
+
+    Args:
+        context: The crawl context holding the dedup state
+        entries: Valid entries of a page
+        country: The country the entries belong to
+
+    Returns:
+        List[dict]: A list of processed visa information entries
+    """
+    with timed_stage(context.metrics, country, "process"):
+        complete_entries = dedup_visa_entries(entries, country, context.seen_entries, context.dedup_index)
+
+    if context.metrics:
+        context.metrics.add(country, entries=len(complete_entries))
+    return complete_entries
+
+
+def dedup_visa_entries(
+    entries: List[dict],
+    country: str,
+    seen_entries: Set[tuple],
+    dedup_index: VisaDedupIndex = None,
+) -> List[dict]:
+    """
+    Keeps the previously unseen entries of a page.
+
+    With a dedup index, near-duplicates of earlier entries (e.g. "Student" and
+    "National D Student Visa") are merged into the entry they duplicate. When that
+    entry came from an earlier page, which is already written, the merged record
+    is returned and supersedes it (the last record wins). The merged record takes
+    the visa type of the group's shortest-named member, which may retract the one
+    already written (see VisaDedupIndex.retracted).
+
+    Args:
+        entries: Valid entries of a page
+        country: The country the entries belong to
+        seen_entries: Set of entries that have already been seen
+        dedup_index: Optional index merging near-duplicate visa types
+
+    Returns:
+        List[dict]: A list of processed visa information entries
+    """
+    complete_entries = []
+    positions = {}
+    for entry in entries:
         entry_key = (entry["country"], entry["visa_type"])
         if is_duplicate_visa_info(entry["country"], entry["visa_type"], seen_entries):
             print(f"Duplicate visa information for {country}, visa type: {entry['visa_type']}. Skipping.")
             continue
 
+        if dedup_index:
+            signature = dedup_index.signature(entry)
+            kept = dedup_index.find(entry, signature)
+            if kept is not None:
+                dedup_index.duplicates += 1
+                seen_entries.add(entry_key)
+                print(f"Near-duplicate visa information for {country}: {entry['visa_type']} merged into {kept['visa_type']}.")
+                kept_key = (kept["country"], kept["visa_type"])
+                merged = dedup_index.merge(kept, entry)
+                merged_key = (merged["country"], merged["visa_type"])
+                if kept_key in positions:
+                    positions[merged_key] = positions.pop(kept_key)
+                    complete_entries[positions[merged_key]] = merged
+                else:
+                    dedup_index.superseded += 1
+                    positions[merged_key] = len(complete_entries)
+                    complete_entries.append(merged)
+                continue
+            dedup_index.add(entry, signature)
+
         # Add entry to the list
         seen_entries.add(entry_key)
+        positions[entry_key] = len(complete_entries)
         complete_entries.append(entry)
 
     print(f"Extracted {len(complete_entries)} visa entries for {country}.")
-    return complete_entries
\ No newline at end of file
+    return complete_entries
@@ -0,0 +1,261 @@
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from utils.changeset import field_hash
+from utils.source_store import SourceStore
+from utils.visa_urls import build_visa_url_jobs
+
+
+def get_country_url(country: str, base_url: str, country_sources: dict = None) -> str:
+    """
+    Determines the URL to crawl for a country.
+
+    Args:
+        country: The country to crawl
+        base_url: The base URL of the website
+        country_sources: Optional dictionary of country-specific URLs
+
+    Returns:
+        str: The country-specific source if one is configured, otherwise base_url/country.
+    """
+    if country_sources and country in country_sources:
+        return country_sources[country]
+    return f"{base_url}/{country}"
+
+
+def known_sources(countries: List[str], base_url: str, country_sources: dict = None) -> List[dict]:
+    """
+    List every source a crawl can visit, in either mode.
+
+    Args:
+        countries: Countries crawled in "countries" mode
+        base_url: The base URL of the website
+        country_sources: Optional dictionary of country-specific URLs
+
+    Returns:
+        List[dict]: Sources of the form {"country", "url", "visa_types"}, one per distinct URL
+    """
+    sources = {}
+    for country in countries:
+        url = get_country_url(country, base_url, country_sources)
+        sources.setdefault(url, {"country": country, "url": url, "visa_types": []})
+    for job in build_visa_url_jobs():
+        sources.setdefault(job["url"], {**job, "visa_types": []})["visa_types"] = job["visa_types"]
+    return list(sources.values())
+
+
+def entries_fingerprint(entries: List[dict]) -> str:
+    """
+    Args:
+        entries: Entries extracted from a source
+
+    Returns:
+        str: A hash of the entries that does not depend on their order
+    """
+    return field_hash(sorted(entries, key=lambda entry: json.dumps(entry, sort_keys=True, default=str)))
+
+
+class SourceRegistry:
+    """
+    Per-source settings and change history, and the re-crawl schedule derived from it.
+
+    Settings come from `source_settings` (config.SOURCE_SETTINGS), keyed by URL or
+    host, a URL entry overriding its host: the CSS selector of the visa content and
+    extraction hints prepended to every LLM request for the page. Sources without
+    settings use `css_selector`.
+
+    Every successful crawl of a source is recorded with whether its extracted
+    entries changed. The re-crawl interval is halved when they did and multiplied by
+    `backoff` when they did not, within [min_interval, max_interval] seconds, so pages
+    that change often are refreshed every run and static ones only now and then.
+
+    Skipping sources on that schedule is opt-in (`schedule`, see --adaptive-schedule):
+    a skipped page is answered from its entries of the last crawl, so its changes
+    wait for its next due crawl. New sources, and sources whose last crawl failed,
+    are always due. The history is kept in the SourceStore.
+    """
+
+    def __init__(
+        self,
+        store: SourceStore,
+        css_selector: str,
+        source_settings: Dict[str, dict] = None,
+        min_interval: float = 12 * 3600,
+        max_interval: float = 30 * 24 * 3600,
+        backoff: float = 2.0,
+        history_length: int = 20,
+        schedule: bool = False,
+    ):
+        self.store = store
+        self.css_selector = css_selector
+        self.source_settings = source_settings or {}
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.history_length = history_length
+        self.schedule = schedule
+        self.skipped = 0
+        self.changed = 0
+        self.unchanged = 0
+
+    def _stored(self, url: str) -> Optional[dict]:
+        # A source the registry has recorded, and not only the revalidator
+        stored = self.store.get(url)
+        return stored if stored and stored["fingerprint"] else None
+
+    def settings(self, url: str) -> dict:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            dict: The settings of the source, its host's settings overridden by its own
+        """
+        return {**self.source_settings.get(urlparse(url).netloc, {}), **self.source_settings.get(url, {})}
+
+    def selector(self, url: str) -> str:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            str: The CSS selector of the visa content on the page
+        """
+        return self.settings(url).get("css_selector") or self.css_selector
+
+    def hints(self, url: str) -> Optional[str]:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            Optional[str]: Extraction hints for the LLM, if any
+        """
+        return self.settings(url).get("hints")
+
+    def next_crawl(self, url: str) -> float:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            float: Unix time from which the source is due; 0 if it was never crawled
+        """
+        stored = self._stored(url)
+        return stored["checked_at"] + stored["interval"] if stored else 0.0
+
+    def is_due(self, url: str, now: float = None) -> bool:
+        """
+        Check whether a source should be crawled, counting the sources that are skipped.
+
+        Args:
+            url: The source URL
+            now: Unix time to check against, defaults to the current time
+
+        Returns:
+            bool: True if the schedule is off, the source is new or its interval has passed
+        """
+        if not self.schedule or (now or time.time()) >= self.next_crawl(url):
+            return True
+        self.skipped += 1
+        return False
+
+    def previous_entries(self, url: str) -> List[dict]:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            List[dict]: The entries extracted from the source in its last recorded crawl
+        """
+        stored = self._stored(url)
+        return stored["entries"] if stored else []
+
+    def change_rate(self, url: str) -> Optional[float]:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            Optional[float]: Share of the recorded crawls that found changed entries,
+                or None if the source was crawled fewer than twice
+        """
+        stored = self._stored(url)
+        history = stored["history"][1:] if stored else []
+        return sum(check["changed"] for check in history) / len(history) if history else None
+
+    def commit(self, url: str, entries: List[dict], now: float = None) -> bool:
+        """
+        Record a successful crawl of a source and adapt its re-crawl interval.
+
+        Args:
+            url: The source URL
+            entries: The entries extracted from the page
+            now: Unix time of the crawl, defaults to the current time
+
+        Returns:
+            bool: True if the entries differ from the last crawl (or it is the first)
+        """
+        now = now or time.time()
+        fingerprint = entries_fingerprint(entries)
+        stored = self._stored(url)
+        changed = not stored or stored["fingerprint"] != fingerprint
+
+        if not stored:
+            interval = self.min_interval
+        elif changed:
+            interval = max(self.min_interval, stored["interval"] / 2)
+        else:
+            interval = min(self.max_interval, stored["interval"] * self.backoff)
+        history = (stored["history"] if stored else []) + [{"checked_at": now, "changed": changed}]
+
+        if changed:
+            self.changed += 1
+        else:
+            self.unchanged += 1
+        self.store.update(
+            url,
+            fingerprint=fingerprint,
+            checked_at=now,
+            interval=interval,
+            history=history[-self.history_length:],
+            entries=entries,
+        )
+        return changed
+
+    def show_schedule(self, sources: List[dict]) -> None:
+        """
+        Print the settings and schedule of sources.
+
+        Args:
+            sources: Sources as returned by known_sources
+        """
+        print(f"{'Country':<12} {'Changed':>8} {'Interval':>9} {'Next crawl':<17} {'Selector':<26} URL")
+        for source in sources:
+            url = source["url"]
+            stored = self._stored(url)
+            rate = self.change_rate(url)
+            next_crawl = self.next_crawl(url)
+            if not self.schedule:
+                next_label = "every run"
+            elif next_crawl:
+                next_label = datetime.fromtimestamp(next_crawl).strftime("%Y-%m-%d %H:%M")
+            else:
+                next_label = "now"
+            print(
+                f"{source['country']:<12} "
+                f"{'-' if rate is None else f'{rate:.0%}':>8} "
+                f"{stored['interval'] / 3600 if stored else 0:>8.0f}h "
+                f"{next_label:<17} "
+                f"{self.selector(url):<26} {url}"
+            )
+
+    def show_usage(self) -> None:
+        """Print how many sources were skipped, changed or unchanged."""
+        print("\n=== Source Schedule ===")
+        print(f"{'Skipped':<15} {self.skipped:>12,}")
+        print(f"{'Changed':<15} {self.changed:>12,}")
+        print(f"{'Unchanged':<15} {self.unchanged:>12,}")
@@ -0,0 +1,96 @@
+import json
+import os
+import pathlib
+import sqlite3
+from typing import Optional
+
+# Columns holding JSON; the others are stored as they are
+JSON_COLUMNS = ["entries", "validators", "history"]
+SOURCE_COLUMNS = ["entries", "validators", "fingerprint", "checked_at", "interval", "history"]
+
+
+class SourceStore:
+    """
+    Per-URL state of crawled sources, shared by SourceRevalidator and SourceRegistry.
+
+    One SQLite row per URL holds the entries of its last successful crawl, the
+    validators of that response, and the change history and re-crawl interval of
+    the adaptive schedule. Every commit upserts the columns it owns in that single
+    row, so recording a page costs the same however many sources are known.
+
+    A read-only store (e.g. for `cli.py sources`) never creates the database, and
+    reads as empty if it does not exist yet.
+    """
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.conn = None
+        if read_only:
+            if os.path.exists(path):
+                self.conn = sqlite3.connect(f"{pathlib.Path(os.path.abspath(path)).as_uri()}?mode=ro", uri=True)
+            return
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS sources (
+                    url TEXT PRIMARY KEY,
+                    entries TEXT,
+                    validators TEXT,
+                    fingerprint TEXT,
+                    checked_at REAL,
+                    interval REAL,
+                    history TEXT
+                ) WITHOUT ROWID
+            ''')
+
+    def get(self, url: str) -> Optional[dict]:
+        """
+        Args:
+            url: The source URL
+
+        Returns:
+            Optional[dict]: The stored columns of the source, JSON decoded, or None if
+                it was never recorded
+        """
+        if self.conn is None:
+            return None
+        row = self.conn.execute(
+            f"SELECT {', '.join(SOURCE_COLUMNS)} FROM sources WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        source = dict(zip(SOURCE_COLUMNS, row))
+        for column in JSON_COLUMNS:
+            if source[column] is not None:
+                source[column] = json.loads(source[column])
+        return source
+
+    def update(self, url: str, **columns) -> None:
+        """
+        Upsert some columns of a source, leaving the others as they are.
+
+        Args:
+            url: The source URL
+            **columns: Values of SOURCE_COLUMNS; JSON columns are encoded, None clears a column
+        """
+        names = list(columns)
+        values = [
+            json.dumps(value, ensure_ascii=False, default=str) if name in JSON_COLUMNS and value is not None else value
+            for name, value in columns.items()
+        ]
+        with self.conn:
+            self.conn.execute(
+                f"INSERT INTO sources (url, {', '.join(names)}) VALUES (?, {', '.join('?' for _ in names)}) "
+                f"ON CONFLICT(url) DO UPDATE SET {', '.join(f'{name} = excluded.{name}' for name in names)}",
+                [url, *values],
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,195 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from models.visa_info import VisaInfo
+
+# Separators of requirements the LLM returned as one string, strongest first
+REQUIREMENT_SEPARATORS = [re.compile(r"\s*\n\s*"), re.compile(r"\s*;\s*"), re.compile(r"\s*,\s*")]
+BULLET_PREFIX = re.compile(r"^\s*(?:[-*+•]|\d+[.)])\s+")
+# Markdown emphasis, heading markers and trailing colons around visa type names
+VISA_TYPE_MARKUP = re.compile(r"^[\s#*_:]+|[\s#*_:]+$")
+VISA_TYPE_SUFFIX = re.compile(r"\s+visas?$", re.IGNORECASE)
+
+# Looked up once; VisaInfo.model_fields is a property
+VISA_INFO_FIELDS = frozenset(VisaInfo.model_fields)
+
+# Fields the LLM leaves out or sets to null when a page does not mention them
+OPTIONAL_FIELDS = ["embassy_link", "notes"]
+
+
+@lru_cache(maxsize=None)
+def visa_info_list_adapter() -> TypeAdapter:
+    """
+    Returns:
+        TypeAdapter: Validator of List[VisaInfo], built once per process
+    """
+    return TypeAdapter(List[VisaInfo])
+
+
+def split_requirements(requirements: str) -> List[str]:
+    """
+    Split requirements the LLM returned as a single string.
+
+    Args:
+        requirements: The requirements text
+
+    Returns:
+        List[str]: One item per line, or per semicolon or comma if the text is a single line
+    """
+    for separator in REQUIREMENT_SEPARATORS:
+        items = [BULLET_PREFIX.sub("", item).strip() for item in separator.split(requirements.strip())]
+        items = [item for item in items if item]
+        if len(items) > 1:
+            return items
+    return items
+
+
+def normalize_visa_type(visa_type: str) -> str:
+    """
+    Args:
+        visa_type: The visa type as extracted, e.g. "**Student Visa:**"
+
+    Returns:
+        str: The visa type without markup, extra whitespace or a trailing "visa", e.g. "Student"
+    """
+    visa_type = VISA_TYPE_MARKUP.sub("", " ".join(visa_type.split()))
+    return VISA_TYPE_SUFFIX.sub("", visa_type) or visa_type
+
+
+def coerce_visa_info(entry: dict) -> dict:
+    """
+    Fix the shape mistakes the LLM commonly makes before validation.
+
+    Args:
+        entry: Raw entry returned by the extraction
+
+    Returns:
+        dict: A copy with string requirements split into a list, null optional fields
+            set to empty strings, numbers turned into strings and the visa type normalized
+    """
+    entry = {key: value for key, value in entry.items() if key in VISA_INFO_FIELDS}
+    for field in OPTIONAL_FIELDS:
+        if entry.get(field) is None:
+            entry[field] = ""
+    for field, value in entry.items():
+        if type(value) in (int, float):
+            entry[field] = str(value)
+
+    requirements = entry.get("requirements")
+    if isinstance(requirements, str):
+        entry["requirements"] = split_requirements(requirements)
+    elif isinstance(requirements, list):
+        items = [item.strip() if isinstance(item, str) else str(item).strip() for item in requirements if item is not None]
+        entry["requirements"] = [item for item in items if item]
+
+    if isinstance(entry.get("visa_type"), str):
+        entry["visa_type"] = normalize_visa_type(entry["visa_type"])
+    return entry
+
+
+class VisaInfoValidator:
+    """
+    Validates extracted entries in batches with a TypeAdapter(List[VisaInfo]).
+
+    The LLM's common shape mistakes are coerced first. Invalid entries are picked
+    out of the error locations of the batch, and entries that fail validation or
+    miss a required field are appended with their reasons to `reject_path` (JSONL)
+    instead of being dropped silently.
+    """
+
+    def __init__(self, required_keys: List[str], reject_path: Optional[str] = None):
+        self.required_keys = required_keys
+        self.reject_path = reject_path
+        self.validated = 0
+        self.rejected = 0
+        self.reject_file = None
+        if reject_path:
+            os.makedirs(os.path.dirname(reject_path) or ".", exist_ok=True)
+            self.reject_file = open(reject_path, "w", encoding="utf-8")
+
+    def validate(self, entries: List[dict], country: str = "") -> List[VisaInfo]:
+        """
+        Coerce and validate a batch of entries.
+
+        Args:
+            entries: Raw entries returned by the extraction
+            country: The country the entries belong to, recorded with rejects
+
+        Returns:
+            List[VisaInfo]: The valid, complete entries in their original order
+        """
+        visas, rejects = self.check(entries)
+        for entry, reasons in rejects:
+            self.reject(entry, reasons, country)
+        self.validated += len(visas)
+        return visas
+
+    def check(self, entries: List[dict]) -> Tuple[List[VisaInfo], List[Tuple[dict, List[str]]]]:
+        """
+        Coerce and validate a batch of entries without recording anything.
+
+        Args:
+            entries: Raw entries returned by the extraction
+
+        Returns:
+            Tuple[List[VisaInfo], List[Tuple[dict, List[str]]]]: The valid, complete entries
+                in their original order, and the raw rejected entries with their reasons
+        """
+        coerced = [coerce_visa_info(entry) for entry in entries]
+        reasons = {}
+        for index, (entry, raw_entry) in enumerate(zip(coerced, entries)):
+            if raw_entry.get("error"):
+                reasons[index] = [f"extraction error: {raw_entry.get('content', '')}"]
+                continue
+            missing = [f"{key}: missing or empty" for key in self.required_keys if not entry.get(key)]
+            if missing:
+                reasons[index] = missing
+
+        candidates = [index for index in range(len(coerced)) if index not in reasons]
+        adapter = visa_info_list_adapter()
+        try:
+            visas = adapter.validate_python([coerced[index] for index in candidates])
+        except ValidationError as e:
+            for error in e.errors(include_url=False):
+                index = candidates[error["loc"][0]]
+                field = ".".join(str(part) for part in error["loc"][1:])
+                reasons.setdefault(index, []).append(f"{field}: {error['msg']}")
+            candidates = [index for index in candidates if index not in reasons]
+            visas = adapter.validate_python([coerced[index] for index in candidates])
+
+        rejects = [(entries[index], reasons[index]) for index in sorted(set(range(len(entries))) - set(candidates))]
+        return visas, rejects
+
+    def reject(self, entry: dict, reasons: List[str], country: str = "") -> None:
+        """
+        Record an entry that could not be validated.
+
+        Args:
+            entry: The raw entry
+            reasons: Why it was rejected, one per failing field
+            country: The country the entry belongs to
+        """
+        self.rejected += 1
+        print(f"Rejected visa information for {country}, visa type: {entry.get('visa_type', 'Unknown')}: {'; '.join(reasons)}")
+        if self.reject_file:
+            record = {"country": country, "reasons": reasons, "entry": entry}
+            self.reject_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self.reject_file.flush()
+
+    def close(self) -> None:
+        """Close the reject file."""
+        if self.reject_file:
+            self.reject_file.close()
+
+    def show_usage(self) -> None:
+        """Print how many entries passed validation."""
+        print("\n=== Validation ===")
+        print(f"{'Valid':<15} {self.validated:>12,}")
+        print(f"{'Rejected':<15} {self.rejected:>12,}")
+        if self.rejected and self.reject_path:
+            print(f"Rejected entries written to '{self.reject_path}'.")
@@ -1,34 +1,82 @@
+from typing import List
+
 official_visa_urls = [
     {
+        "country": "poland",
         "student": "https://www.gov.pl/web/pakistan-en/d-type-national-visa",
         "work": "https://www.gov.pl/web/pakistan-en/d-type-national-visa",
         "tourist": "https://www.gov.pl/web/pakistan-en/c-type-schengen-visa",
        
     },
     {
-        
+        "country": "germany",
         "student": "https://www.auswaertiges-amt.de/en/visa-service/study",
         "work": "https://www.auswaertiges-amt.de/en/visa-service/employment",
         "tourist": "https://www.auswaertiges-amt.de/en/visa-service/schengen-visa",
         
     },
     {
-      
+        "country": "sweden",
         "student": "https://www.migrationsverket.se/English/Private-individuals/Studying-and-researching-in-Sweden/Higher-education.html",
         "work": "https://www.migrationsverket.se/English/Private-individuals/Working-in-Sweden/Employed.html",
         "tourist": "https://www.swedenabroad.se/en/about-sweden-non-swedish-citizens/going-to-sweden/visiting-sweden/",
        
     },
     {
+        "country": "hungary",
         "student": "https://enterhungary.gov.hu/en/visa-application-student",
         "work": "https://enterhungary.gov.hu/en/visa-application-work",
         "tourist": "https://enterhungary.gov.hu/en/visa-application-tourism",
     },
     {
-        
+        "country": "lithuania",
         "student": "https://www.migracija.lt/en/-/student-visa-national-visa-d-?redirect=%2Fen%2Fvisas",
         "work": "https://www.migracija.lt/en/-/work-visa-national-visa-d-?redirect=%2Fen%2Fvisas",
         "tourist": "https://www.migracija.lt/en/-/short-stay-visa-schengen-visa-c-?redirect=%2Fen%2Fvisas",
       
     }
-]
\ No newline at end of file
+]
+
+
+def build_visa_url_jobs(visa_urls: List[dict] = None) -> List[dict]:
+    """
+    Expand the official visa URL table into crawl jobs, one per distinct URL.
+
+    Several visa types of a country can share one page (e.g. Poland's student and
+    work visas), so identical URLs are merged into a single job listing every visa
+    type they cover.
+
+    Args:
+        visa_urls: Table of {"country": ..., <visa_type>: <url>} dictionaries,
+            defaults to official_visa_urls
+
+    Returns:
+        List[dict]: Jobs of the form {"country", "url", "visa_types"} in table order
+    """
+    if visa_urls is None:
+        visa_urls = official_visa_urls
+
+    jobs = {}
+    for country_urls in visa_urls:
+        country = country_urls["country"]
+        for visa_type, url in country_urls.items():
+            if visa_type == "country":
+                continue
+            if url not in jobs:
+                jobs[url] = {"country": country, "url": url, "visa_types": []}
+            jobs[url]["visa_types"].append(visa_type)
+
+    return list(jobs.values())
+
+
+def visa_types_hint(visa_types: List[str]) -> str:
+    """
+    Args:
+        visa_types: The visa types a page covers, as listed in its job
+
+    Returns:
+        str: An extraction hint naming them, or "" without visa types
+    """
+    if not visa_types:
+        return ""
+    return f"This page covers these visa types: {', '.join(visa_types)}. Extract an entry for each of them."